@@ -0,0 +1,88 @@
+import threading
+
+import cv2
+
+YOLO_INPUT_SIZE = 640
+
+
+class AdaptiveEncoder:
+    """JPEG quality and crop scale driven by round-trip time and detection confidence.
+
+    An AIMD loop: a round trip slower than ``target_rtt_ms`` cuts quality by
+    ``decrease``, then (once quality is at its floor) the crop scale; a fast round
+    trip (below ``headroom`` x target) adds back scale first, then quality, in small
+    steps. If the server's mean detection confidence falls under ``min_conf`` the
+    crops are clearly too degraded, so quality/scale are raised and load can't
+    lower them until confidence recovers. Independently, no crop is sent larger than
+    the YOLO input size since the model would only shrink it again.
+
+    A ``target_rtt_ms`` of 0 disables adaptation: crops go out at ``max_quality``
+    and full scale (still capped at the model input size).
+    """
+
+    def __init__(self, target_rtt_ms=150.0, min_quality=40, max_quality=95, min_scale=0.5,
+                 decrease=0.8, quality_step=2, scale_step=0.05, headroom=0.6, min_conf=0.5,
+                 max_side=YOLO_INPUT_SIZE):
+        self.target_rtt = target_rtt_ms / 1000.0
+        self.min_quality, self.max_quality = min_quality, max_quality
+        self.min_scale = min_scale
+        self.decrease = decrease
+        self.quality_step = quality_step
+        self.scale_step = scale_step
+        self.headroom = headroom
+        self.min_conf = min_conf
+        self.max_side = max_side
+        self.quality = float(max_quality)
+        self.scale = 1.0
+        self._lock = threading.Lock()
+
+    def observe(self, rtt, confidence=None):
+        """Feeds one response: ``rtt`` in seconds, ``confidence`` the server's mean (or None)."""
+        if self.target_rtt <= 0 or rtt is None:
+            return
+        with self._lock:
+            if confidence is not None and confidence < self.min_conf:
+                self._increase()
+            elif rtt > self.target_rtt:
+                self._decrease()
+            elif rtt < self.target_rtt * self.headroom:
+                self._increase()
+
+    def _decrease(self):
+        if self.quality > self.min_quality:
+            self.quality = max(self.min_quality, self.quality * self.decrease)
+        else:
+            self.scale = max(self.min_scale, self.scale * self.decrease)
+
+    def _increase(self):
+        if self.scale < 1.0:
+            self.scale = min(1.0, self.scale + self.scale_step)
+        else:
+            self.quality = min(self.max_quality, self.quality + self.quality_step)
+
+    def settings(self):
+        """Current (quality, scale) for a frame."""
+        with self._lock:
+            return int(round(self.quality)), self.scale
+
+    def scale_for(self, shape, scale):
+        """Scale for a crop of ``shape``: the loop's scale, capped at the model input size."""
+        longest = max(shape[0], shape[1])
+        return min(scale, self.max_side / longest) if longest else scale
+
+    def encode(self, crop, quality, scale):
+        if scale < 1.0:
+            h, w = crop.shape[:2]
+            size = (max(1, int(round(w * scale))), max(1, int(round(h * scale))))
+            crop = cv2.resize(crop, size, interpolation=cv2.INTER_AREA)
+        _, buffer = cv2.imencode('.jpg', crop, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        return buffer
+
+
+def rescale_boxes(boxes, scale):
+    """Maps (n, 6) [x1, y1, x2, y2, conf, cls] boxes on a crop resized by ``scale`` back to full size."""
+    if scale == 1.0 or len(boxes) == 0:
+        return boxes
+    boxes = boxes.copy()
+    boxes[:, :4] /= scale
+    return boxes
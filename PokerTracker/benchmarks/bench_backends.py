@@ -0,0 +1,79 @@
+"""Crops/sec of the card model on each inference backend, at several batch sizes.
+
+Backends that cannot load here (no CUDA, onnxruntime or openvino installed,
+missing weights) are reported as skipped.
+
+Run from the repository root:
+    python PokerTracker/benchmarks/bench_backends.py --players 8
+"""
+import argparse
+import time
+
+from bench_utils import VIDEOS, PROJECT_ROOT, load_frames, load_zones, all_slots, write_results
+import inference_backend
+
+MODEL_PATH = PROJECT_ROOT / "models" / "yolov8s_playing_cards.pt"
+CONFIGS = [
+    ("torch", "cuda", False),
+    ("torch", "cpu", False),
+    ("onnx", "cpu", False),
+    ("onnx", "cpu", True),
+    ("openvino", "cpu", False),
+    ("openvino", "cpu", True),
+]
+
+
+def crops_from(frames, slots):
+    crops = []
+    for img in frames:
+        for rect, *_ in slots:
+            x, y, w, h = [int(v) for v in rect]
+            crop = img[y:y+h, x:x+w]
+            if crop.size > 0:
+                crops.append(crop)
+    return crops
+
+
+def crops_per_second(detector, crops, batch, seconds):
+    done, start = 0, time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for i in range(0, len(crops), batch):
+            detector.predict(crops[i:i + batch], conf=0.4)
+            done += len(crops[i:i + batch])
+    return done / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--video', default=str(VIDEOS[0]))
+    parser.add_argument('--players', type=int, default=None, help='synthetic player zones (default: saved zones)')
+    parser.add_argument('--frames', type=int, default=10)
+    parser.add_argument('--batches', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--seconds', type=float, default=5.0, help='Time spent per batch size')
+    parser.add_argument('--model', default=str(MODEL_PATH))
+    args = parser.parse_args()
+
+    frames = load_frames(args.video, args.frames)
+    players, flop = load_zones(frames[0].shape, args.players)
+    crops = crops_from(frames, all_slots(players, flop))
+
+    results = {"crops": len(crops), "backends": {}}
+    for backend, device, int8 in CONFIGS:
+        name = f"{backend}-{device}{'-int8' if int8 else ''}"
+        try:
+            start = time.perf_counter()
+            detector = inference_backend.load_detector(args.model, backend, device, int8)
+            load_s = time.perf_counter() - start
+        except Exception as e:
+            print(f"{name:>18}: skipped ({e})")
+            results["backends"][name] = {"skipped": str(e)}
+            continue
+        rates = {batch: crops_per_second(detector, crops, batch, args.seconds) for batch in args.batches}
+        results["backends"][name] = {"load_and_warmup_s": load_s, "crops_per_sec": rates}
+        print(f"{name:>18}: " + ", ".join(f"batch {b}: {r:.1f} crops/s" for b, r in rates.items()))
+
+    print(f"Results written to {write_results('backends', results)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Chip detection throughput: one detector call per zone (the old chipstream loop) vs ChipEngine batching.
+
+For 2, 6 and 10 synthetic players on frames of the test videos, reports
+zones/sec for
+  - sequential: detector.predict([roi]) per zone, as sahi get_prediction did
+  - batched: every zone of the frame in one ChipEngine.detect call
+  - batched + sliced: the same with --slice-size tiles and merging
+Uses the chip model when it loads; otherwise a stub detector with a fixed
+per-call overhead plus a per-image cost, which is what batching amortizes.
+
+Run from the repository root:
+    python PokerTracker/benchmarks/bench_chips.py --backend onnx
+    python PokerTracker/benchmarks/bench_chips.py --backend stub --stub-call-ms 8 --stub-image-ms 2
+"""
+import argparse
+import time
+
+
+from bench_utils import VIDEOS, PROJECT_ROOT, load_frames, synthetic_zones, write_results
+import chip_engine
+import inference_backend
+
+MODEL_PATH = PROJECT_ROOT / "chips" / "best5.pt"
+PLAYER_COUNTS = (2, 6, 10)
+
+
+def player_rois(img, players):
+    rois = []
+    for hand in players:
+        for x, y, w, h in hand:
+            rois.append(img[int(y):int(y+h), int(x):int(x+w)])
+    return rois
+
+
+def zones_per_sec(frames, players, detect):
+    zones, start = 0, time.perf_counter()
+    for img in frames:
+        rois = player_rois(img, players)
+        detect(rois)
+        zones += len(rois)
+    return zones / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--frames', type=int, default=20)
+    parser.add_argument('--device', default='auto')
+    parser.add_argument('--backend', choices=inference_backend.BACKENDS, default='auto')
+    parser.add_argument('--int8', action='store_true')
+    parser.add_argument('--model', default=str(MODEL_PATH))
+    parser.add_argument('--slice-size', type=int, default=160, help='Tile size for the sliced run')
+    parser.add_argument('--overlap', type=float, default=0.2)
+    parser.add_argument('--stub-call-ms', type=float, default=8.0, help='Stub detector cost per predict call')
+    parser.add_argument('--stub-image-ms', type=float, default=2.0, help='Stub detector cost per image')
+    args = parser.parse_args()
+
+    if args.backend == "stub":
+        detector = inference_backend.StubDetector(args.stub_call_ms, args.stub_image_ms)
+    else:
+        try:
+            detector = inference_backend.load_detector(args.model, args.backend, args.device, args.int8)
+        except Exception as e:
+            print(f"Chip model unavailable ({e}); using the stub detector")
+            detector = inference_backend.StubDetector(args.stub_call_ms, args.stub_image_ms)
+
+    batched = chip_engine.ChipEngine(detector)
+    sliced = chip_engine.ChipEngine(detector, slice_size=args.slice_size, overlap=args.overlap)
+    modes = {
+        "sequential": lambda rois: [batched.detect([roi])[0] for roi in rois],
+        "batched": batched.detect,
+        "batched_sliced": sliced.detect,
+    }
+
+    frames = [f for video in VIDEOS for f in load_frames(video, args.frames // len(VIDEOS), stride=5)]
+    results = {"backend": detector.backend, "slice_size": args.slice_size, "overlap": args.overlap,
+               "stub_ms": [args.stub_call_ms, args.stub_image_ms] if detector.backend == "stub" else None,
+               "players": {}}
+    for n_players in PLAYER_COUNTS:
+        players, _ = synthetic_zones(frames[0].shape, n_players)
+        tiles = len(sliced.tiles(player_rois(frames[0], players)))
+        stats = {name: zones_per_sec(frames, players, detect) for name, detect in modes.items()}
+        stats["tiles_per_frame_sliced"] = tiles
+        results["players"][n_players] = stats
+        print(f"{n_players:2d} players: " + ", ".join(f"{name} {stats[name]:.0f} zones/s" for name in modes)
+              + f" ({tiles} tiles/frame sliced)")
+    results["speedup_batched"] = {n: s["batched"] / s["sequential"] for n, s in results["players"].items()}
+    print("Batched vs sequential: " + ", ".join(f"{n}p x{v:.1f}" for n, v in results["speedup_batched"].items()))
+    print(f"Results written to {write_results('bench_chips', results)}")
+
+
+if __name__ == "__main__":
+    main()
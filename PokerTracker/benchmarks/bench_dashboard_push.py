@@ -0,0 +1,97 @@
+"""Load test for the dashboard push endpoint: many /events subscribers, one producer.
+
+Run from the repository root:
+    python PokerTracker/benchmarks/bench_dashboard_push.py --viewers 100 --rate 30
+"""
+import argparse
+import http.client
+import json
+import socket
+import threading
+import time
+
+import numpy as np
+
+from bench_utils import PROJECT_ROOT, write_results
+import dashboard
+import game_state
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def subscriber(port, latencies, stop, ready):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    conn.request("GET", "/events")
+    response = conn.getresponse()
+    ready.release()
+    event = None
+    while not stop.is_set():
+        line = response.fp.readline()
+        if not line:
+            break
+        line = line.decode().strip()
+        if line.startswith("event:"):
+            event = line[6:].strip()
+        elif line.startswith("data:") and event == "diff":
+            sections = json.loads(line[5:])["sections"]
+            flop = sections.get("flop_cards", {}).get("set", {})
+            if "0" in flop:
+                latencies.append(time.time() - flop["0"]["ts"])
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--viewers', type=int, default=100)
+    parser.add_argument('--rate', type=float, default=30.0, help='state updates per second')
+    parser.add_argument('--seconds', type=float, default=5.0)
+    args = parser.parse_args()
+
+    store = game_state.GameStateStore(player_cards={}, flop_cards={}, winner={})
+    port = free_port()
+    threading.Thread(target=dashboard.serve_dashboard, args=(store, port, str(PROJECT_ROOT)), daemon=True).start()
+    time.sleep(0.3)
+
+    stop = threading.Event()
+    ready = threading.Semaphore(0)
+    per_viewer = [[] for _ in range(args.viewers)]
+    threads = [threading.Thread(target=subscriber, args=(port, lat, stop, ready), daemon=True) for lat in per_viewer]
+    for t in threads:
+        t.start()
+    for _ in threads:
+        ready.acquire()
+
+    cpu_start = time.process_time()
+    updates = 0
+    end = time.time() + args.seconds
+    while time.time() < end:
+        store.update(flop_cards={"0": {"name": "AS", "conf": 0.9, "ts": time.time()}})
+        updates += 1
+        time.sleep(1.0 / args.rate)
+    time.sleep(0.5)
+    cpu = time.process_time() - cpu_start
+    stop.set()
+
+    latencies = np.array([l for lat in per_viewer for l in lat]) * 1000
+    results = {
+        "viewers": args.viewers,
+        "updates": updates,
+        "events_delivered": int(latencies.size),
+        "delivery_ratio": float(latencies.size / max(updates * args.viewers, 1)),
+        "latency_ms_p50": float(np.percentile(latencies, 50)) if latencies.size else None,
+        "latency_ms_p95": float(np.percentile(latencies, 95)) if latencies.size else None,
+        "latency_ms_max": float(latencies.max()) if latencies.size else None,
+        "process_cpu_seconds": cpu,
+        "polling_file_reads_per_second_equivalent": 3 * args.viewers,
+    }
+    for k, v in results.items():
+        print(f"{k}: {v}")
+    print(f"Results written to {write_results('dashboard_push', results)}")
+
+
+if __name__ == "__main__":
+    main()
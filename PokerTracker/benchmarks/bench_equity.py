@@ -0,0 +1,55 @@
+"""Hands evaluated per second by the equity engine on each street.
+
+Run from the repository root:
+    python PokerTracker/benchmarks/bench_equity.py --players 2 6 10
+"""
+import argparse
+import time
+
+import numpy as np
+
+from bench_utils import write_results
+import cards
+import equity
+
+BOARD_SIZES = {"preflop": 0, "flop": 3, "turn": 4}
+
+
+def deal(rng, n_players, board_size):
+    deck = rng.permutation(52)
+    names = [cards.CARD_NAMES[c] for c in deck]
+    hands = {f"p{i}": (names[2 * i], names[2 * i + 1]) for i in range(n_players)}
+    return names[2 * n_players:2 * n_players + board_size], hands
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--players', type=int, nargs='+', default=[2, 6, 10])
+    parser.add_argument('--samples', type=int, default=5000, help='Monte Carlo samples per spot')
+    parser.add_argument('--workers', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    results = []
+    for n_players in args.players:
+        for street, board_size in BOARD_SIZES.items():
+            calc = equity.EquityCalculator(budget_ms=60000, max_samples=args.samples,
+                                           workers=args.workers, parallel_min_players=2)
+            board, hands = deal(rng, n_players, board_size)
+            start = time.perf_counter()
+            res = calc.compute(board, hands)
+            elapsed = time.perf_counter() - start
+            calc.close()
+            samples = next(iter(res.values()))["samples"]
+            row = {"players": n_players, "street": street, "samples": samples,
+                   "exact": next(iter(res.values()))["exact"], "seconds": elapsed,
+                   "hands_per_second": samples * n_players / elapsed}
+            results.append(row)
+            print(f"{n_players:>2} players {street:>7}: {samples:>6} boards "
+                  f"({'exact' if row['exact'] else 'MC'}) in {elapsed * 1000:8.1f} ms "
+                  f"-> {row['hands_per_second']:10.0f} hands/s")
+    print(f"Results written to {write_results('equity', results)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Compares per-crop detection with mosaic mode (crops packed into shared canvases).
+
+Accuracy is reported as agreement with per-crop mode, which is what the server
+runs today: the share of slots whose top class matches, and the mean IoU of the
+matching top boxes. Without ultralytics (or the model weights) only the packing
+statistics are printed.
+
+Run from the repository root:
+    python PokerTracker/benchmarks/bench_mosaic.py --players 8 --backend onnx
+"""
+import argparse
+import time
+
+import numpy as np
+
+from bench_utils import VIDEOS, PROJECT_ROOT, load_frames, load_zones, all_slots, write_results
+import inference_backend
+import mosaic
+
+MODEL_PATH = PROJECT_ROOT / "models" / "yolov8s_playing_cards.pt"
+
+
+def slot_crops(img, slots):
+    crops = []
+    for rect, *_ in slots:
+        x, y, w, h = [int(v) for v in rect]
+        crop = img[y:y+h, x:x+w]
+        if crop.size > 0:
+            crops.append(crop)
+    return crops
+
+
+def box_iou(a, b):
+    ix = max(0.0, min(a[2], b[2]) - max(a[0], b[0]))
+    iy = max(0.0, min(a[3], b[3]) - max(a[1], b[1]))
+    inter = ix * iy
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def top_box(boxes):
+    return boxes[np.argmax(boxes[:, 4])] if len(boxes) else None
+
+
+def compare(reference, candidate):
+    """(slots whose top class agrees, IoUs of agreeing top boxes)."""
+    agree, ious = 0, []
+    for ref, cand in zip(reference, candidate):
+        r, c = top_box(ref), top_box(cand)
+        if r is None and c is None:
+            agree += 1
+        elif r is not None and c is not None and int(r[5]) == int(c[5]):
+            agree += 1
+            ious.append(box_iou(r, c))
+    return agree, ious
+
+
+def packing_stats(frames, slots, canvas_size):
+    canvases, fill = [], []
+    for img in frames:
+        crops = slot_crops(img, slots)
+        placements, n = mosaic.shelf_pack([(c.shape[1], c.shape[0]) for c in crops], canvas_size)
+        canvases.append(n)
+        fill.append(sum(p.w * p.h for p in placements) / (n * canvas_size * canvas_size))
+    return {"crops_per_frame": len(slot_crops(frames[0], slots)),
+            "canvases_per_frame": float(np.mean(canvases)),
+            "canvas_fill": float(np.mean(fill))}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--players', type=int, default=None, help='synthetic player zones (default: saved zones)')
+    parser.add_argument('--frames', type=int, default=30)
+    parser.add_argument('--canvas', type=int, default=640)
+    parser.add_argument('--device', default='auto')
+    parser.add_argument('--backend', choices=inference_backend.BACKENDS, default='auto')
+    parser.add_argument('--model', default=str(MODEL_PATH))
+    args = parser.parse_args()
+
+    results = {"canvas": args.canvas, "videos": {}}
+    model = None
+    try:
+        model = inference_backend.load_detector(args.model, args.backend, args.device)
+    except Exception as e:
+        print(f"Detector unavailable ({e}); reporting packing only")
+
+    for video in VIDEOS:
+        frames = load_frames(video, args.frames)
+        players, flop = load_zones(frames[0].shape, args.players)
+        slots = all_slots(players, flop)
+        stats = packing_stats(frames, slots, args.canvas)
+        print(f"{video.name}: {stats['crops_per_frame']} crops -> {stats['canvases_per_frame']:.1f} canvases "
+              f"({stats['canvas_fill']:.0%} filled)")
+
+        if model is not None:
+            def per_crop(crops):
+                return model.predict(crops, conf=0.4)
+
+            def per_canvas(canvases):
+                return model.predict(canvases, conf=0.4, imgsz=args.canvas)
+
+            per_crop(slot_crops(frames[0], slots))  # warm-up
+            crop_ms, mosaic_ms, agree, ious, total = [], [], 0, [], 0
+            for img in frames:
+                crops = slot_crops(img, slots)
+                start = time.perf_counter()
+                reference = per_crop(crops)
+                crop_ms.append((time.perf_counter() - start) * 1000)
+                start = time.perf_counter()
+                candidate = mosaic.detect(crops, per_canvas, args.canvas)
+                mosaic_ms.append((time.perf_counter() - start) * 1000)
+                a, i = compare(reference, candidate)
+                agree, ious, total = agree + a, ious + i, total + len(crops)
+            stats.update({
+                "per_crop_ms": {"mean": float(np.mean(crop_ms)), "p95": float(np.percentile(crop_ms, 95))},
+                "mosaic_ms": {"mean": float(np.mean(mosaic_ms)), "p95": float(np.percentile(mosaic_ms, 95))},
+                "top_class_agreement": agree / total,
+                "mean_iou": float(np.mean(ious)) if ious else None,
+            })
+            print(f"  per-crop {stats['per_crop_ms']['mean']:.1f} ms/frame, mosaic {stats['mosaic_ms']['mean']:.1f} ms/frame, "
+                  f"agreement {stats['top_class_agreement']:.1%}, IoU {stats['mean_iou'] or 0:.2f}")
+        results["videos"][video.name] = stats
+
+    print(f"Results written to {write_results('mosaic', results)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Card tracking on the test videos: label flicker, ID switches and detector calls saved.
+
+Every slot of every frame is cropped as the client would. The runs are:
+  - untracked: the detector on every slot of every frame (what the server did)
+  - tracked, --detect-every N: the detector on a tracked slot every N-th frame,
+    with CardTracker propagating the tracks in between
+For each run it reports detector calls (and the share saved), label changes
+of the top card per slot from frame to frame (flicker seen by the dashboard),
+tracks started and label switches inside a track (ID switches).
+Uses the face model when it loads; otherwise the stub detector with fake
+cards, whose class follows the crop brightness and so flickers with noise.
+Stub label changes and ID switches say nothing about real cards; only the
+detector calls saved are meaningful without the model.
+
+Run from the repository root:
+    python PokerTracker/benchmarks/bench_tracker.py --backend onnx --frames 300
+    python PokerTracker/benchmarks/bench_tracker.py --backend stub --every 1 2 3 5
+"""
+import argparse
+import time
+
+from bench_utils import VIDEOS, load_frames, load_zones, all_slots, write_results
+import card_tracker
+import inference_backend
+import inference_workers
+
+
+def slot_crops(img, slots):
+    return [img[int(y):int(y+h), int(x):int(x+w)] for (x, y, w, h), _, _, _ in slots]
+
+
+def top_label(boxes):
+    return int(boxes[boxes[:, 4].argmax(), 5]) if len(boxes) else None
+
+
+def run(frames, fps, slots, detector, conf, detect_every):
+    """Counts for one pass over ``frames``; ``detect_every`` 0 means no tracker."""
+    tracker = card_tracker.CardTracker(detect_every) if detect_every else None
+    keys = list(range(len(slots)))
+    last_labels = [None] * len(slots)
+    calls = label_changes = 0
+    start = time.perf_counter()
+    for idx, img in enumerate(frames):
+        t = idx / fps
+        crops = slot_crops(img, slots)
+        due = [k for k in keys if tracker is None or tracker.due(k)]
+        results = dict(zip(due, detector.predict([crops[k] for k in due], conf=conf))) if due else {}
+        calls += len(due)
+        for k in keys:
+            if tracker is None:
+                face = results[k]
+            elif k in results:
+                face, _ = tracker.update(k, results[k], inference_backend.EMPTY_BOXES, t)
+            else:
+                face, _ = tracker.propagate(k, t)
+            label = top_label(face)
+            if idx and label != last_labels[k]:
+                label_changes += 1
+            last_labels[k] = label
+    stats = {"detector_calls": calls, "label_changes": label_changes,
+             "ms_per_frame": (time.perf_counter() - start) * 1000 / len(frames)}
+    if tracker is not None:
+        stats.update(tracker.stats())
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--frames', type=int, default=150, help='Frames per video')
+    parser.add_argument('--stride', type=int, default=1)
+    parser.add_argument('--every', type=int, nargs='+', default=[1, 2, 3, 5], help='--detect-every values to try')
+    parser.add_argument('--device', default='auto')
+    parser.add_argument('--backend', choices=inference_backend.BACKENDS, default='auto')
+    parser.add_argument('--int8', action='store_true')
+    parser.add_argument('--conf', type=float, default=0.4)
+    parser.add_argument('--fps', type=float, default=30.0)
+    args = parser.parse_args()
+
+    if args.backend == "stub":
+        detector = inference_backend.StubDetector(fake_cards=True)
+    else:
+        try:
+            detector = inference_backend.load_detector(inference_workers.FACE_WEIGHTS, args.backend, args.device,
+                                                       args.int8)
+        except Exception as e:
+            print(f"Card model unavailable ({e}); using the stub detector with fake cards")
+            detector = inference_backend.StubDetector(fake_cards=True)
+
+    if detector.backend == "stub":
+        print("Stub detector: label changes and ID switches below are not real card results")
+    results = {"backend": detector.backend, "frames_per_video": args.frames, "stride": args.stride, "videos": {}}
+    for video in VIDEOS:
+        frames = load_frames(video, args.frames, stride=args.stride)
+        players, flop = load_zones(frames[0].shape)
+        slots = all_slots(players, flop)
+        fps = args.fps / args.stride
+        runs = {"untracked": run(frames, fps, slots, detector, args.conf, 0)}
+        for n in args.every:
+            runs[f"every_{n}"] = run(frames, fps, slots, detector, args.conf, n)
+        baseline = runs["untracked"]["detector_calls"]
+        for stats in runs.values():
+            stats["calls_saved"] = 1 - stats["detector_calls"] / max(baseline, 1)
+        results["videos"][video.name] = runs
+        print(f"{video.name}: {len(frames)} frames, {len(slots)} slots")
+        for name, s in runs.items():
+            tracks = f", {s['tracks_created']} tracks, {s['label_switches']} ID switches" if "tracks_created" in s else ""
+            print(f"  {name:10s} {s['detector_calls']:5d} detector calls ({s['calls_saved']:.0%} saved), "
+                  f"{s['label_changes']:4d} label changes{tracks}, {s['ms_per_frame']:.2f} ms/frame")
+    print(f"Results written to {write_results('bench_tracker', results)}")
+
+
+if __name__ == "__main__":
+    main()
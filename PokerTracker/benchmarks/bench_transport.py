@@ -0,0 +1,73 @@
+"""Compares bytes-on-wire and server decode time for the JSON/base64 and binary transports.
+
+Run from the repository root:
+    python PokerTracker/benchmarks/bench_transport.py --players 8
+"""
+import argparse
+import base64
+import json
+
+import cv2
+import numpy as np
+
+from bench_utils import VIDEOS, load_frames, load_zones, all_slots, timed
+import frame_codec
+
+
+def build_frame(img, slots):
+    buffers, sanitized = [], []
+    for (rect, label, p_idx, c_idx) in slots:
+        x, y, w, h = [int(v) for v in rect]
+        crop = img[y:y+h, x:x+w]
+        if crop.size > 0:
+            buffers.append(cv2.imencode('.jpg', crop)[1])
+            sanitized.append({"rect": [x, y, w, h], "label": label, "p_idx": p_idx, "c_idx": c_idx})
+    return {"client_id": "bench", "slots": sanitized}, buffers
+
+
+def json_body(header, buffers):
+    payload = dict(header, crops=[base64.b64encode(b).decode('utf-8') for b in buffers])
+    return json.dumps(payload).encode('utf-8')
+
+
+def decode_json(body):
+    data = json.loads(body)
+    return [cv2.imdecode(np.frombuffer(base64.b64decode(c), np.uint8), cv2.IMREAD_COLOR)
+            for c in data['crops']]
+
+
+def decode_binary(body):
+    _, views = frame_codec.decode_frame(body)
+    return frame_codec.decode_crops(views)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--video', default=str(VIDEOS[0]))
+    parser.add_argument('--players', type=int, default=None, help='synthetic player zones (default: saved zones)')
+    parser.add_argument('--frames', type=int, default=30)
+    args = parser.parse_args()
+
+    frames = load_frames(args.video, args.frames)
+    players, flop = load_zones(frames[0].shape, args.players)
+    slots = all_slots(players, flop)
+
+    totals = {"json": [0, 0.0], "binary": [0, 0.0]}
+    for img in frames:
+        header, buffers = build_frame(img, slots)
+        for name, encode, decode in [("json", json_body, decode_json),
+                                     ("binary", frame_codec.encode_frame, decode_binary)]:
+            body = encode(header, buffers)
+            _, secs = timed(decode, body, repeat=5)
+            totals[name][0] += len(body)
+            totals[name][1] += secs
+
+    n = len(frames)
+    print(f"{len(slots)} slots/frame over {n} frames")
+    for name, (size, secs) in totals.items():
+        print(f"{name:>6}: {size / n / 1024:8.1f} KiB/frame  decode {secs / n * 1000:6.2f} ms/frame")
+    print(f"binary saves {100 * (1 - totals['binary'][0] / totals['json'][0]):.1f}% of wire bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import os
+import sys
+import json
+import time
+from pathlib import Path
+
+import cv2
+
+SCRIPT_DIR = Path(__file__).parent.absolute()
+PROJECT_ROOT = SCRIPT_DIR.parent
+TEST_BASE_DIR = PROJECT_ROOT.parent
+DATA_DIR = PROJECT_ROOT / "data"
+VIDEOS = [TEST_BASE_DIR / "Testvideo2.mp4", TEST_BASE_DIR / "Testvideo3.mp4"]
+
+sys.path.insert(0, str(PROJECT_ROOT))
+
+
+def load_frames(video=VIDEOS[0], count=30, stride=5):
+    """Reads ``count`` flipped frames from a test video, ``stride`` frames apart."""
+    cap = cv2.VideoCapture(str(video))
+    frames = []
+    idx = 0
+    while len(frames) < count:
+        success, img = cap.read()
+        if not success:
+            break
+        if idx % stride == 0:
+            frames.append(cv2.flip(img, -1))
+        idx += 1
+    cap.release()
+    if not frames:
+        raise FileNotFoundError(f"Could not read frames from {video}")
+    return frames
+
+
+def synthetic_zones(frame_shape, n_players=8, flop_size=5):
+    """Lays out player boxes along the bottom edge and flop slots across the middle."""
+    h, w = frame_shape[:2]
+    pw, ph = w // (n_players + 1), h // 4
+    players = [[[int(i * w / n_players), h - ph - 10, pw, ph]] for i in range(n_players)]
+    fw, fh = w // 10, h // 5
+    flop = [[int(w / 4 + i * (fw + 10)), h // 2 - fh // 2, fw, fh] for i in range(flop_size)]
+    return players, flop
+
+
+def load_zones(frame_shape, n_players=None, p_path="p_slots", f_path="f_slots"):
+    """Uses the saved zone files when present, otherwise synthetic zones."""
+    p_file = DATA_DIR / f"{p_path}.json"
+    f_file = DATA_DIR / f"{f_path}.json"
+    if n_players is None and p_file.exists() and f_file.exists():
+        with open(p_file) as f:
+            players = json.load(f)
+        with open(f_file) as f:
+            flop = json.load(f)
+        return players, flop
+    return synthetic_zones(frame_shape, n_players or 8)
+
+
+def all_slots(players, flop_slots):
+    p_slots = [(card, 'player', p_idx, c_idx) for p_idx, hand in enumerate(players) for c_idx, card in enumerate(hand)]
+    f_slots = [(card, 'flop', 0, f_idx) for f_idx, card in enumerate(flop_slots)]
+    return p_slots + f_slots
+
+
+def timed(fn, *a, repeat=1, **kw):
+    """Returns (result of last call, mean seconds per call)."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn(*a, **kw)
+    return result, (time.perf_counter() - start) / repeat
+
+
+def write_results(name, results):
+    out_dir = SCRIPT_DIR / "results"
+    os.makedirs(out_dir, exist_ok=True)
+    path = out_dir / f"{name}_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    with open(path, "w") as f:
+        json.dump(results, f, indent=4)
+    return path
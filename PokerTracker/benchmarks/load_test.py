@@ -0,0 +1,147 @@
+"""Load test: many simulated clients replaying the test videos against a running server.
+
+Each client gets its own client_id, replays Testvideo2/3.mp4 with synthetic
+zones and keeps one frame in flight (closed loop) at up to --fps. Crops are
+JPEG encoded once up front so the load generator itself stays cheap. Reports
+server throughput and round-trip percentiles.
+
+Start a server first, e.g. with stub models and 4 inference workers:
+    python PokerTracker/server.py --backend stub --stub-ms 3 --workers 4
+then run from the repository root:
+    python PokerTracker/benchmarks/load_test.py --clients 16 --seconds 20
+"""
+import argparse
+import threading
+import time
+
+import cv2
+import numpy as np
+import requests
+
+from bench_utils import VIDEOS, load_frames, synthetic_zones, all_slots, write_results
+import frame_codec
+import frame_stream
+
+
+def encode_video(video, frames, players):
+    """Pre-encodes every slot crop of every frame: list of (slots, jpeg buffers)."""
+    images = load_frames(video, frames, stride=2)
+    p_zones, f_zones = synthetic_zones(images[0].shape, players)
+    encoded = []
+    for img in images:
+        slots, buffers = [], []
+        for (rect, label, p_idx, c_idx) in all_slots(p_zones, f_zones):
+            x, y, w, h = [int(v) for v in rect]
+            crop = img[y:y+h, x:x+w]
+            if crop.size > 0:
+                slots.append({"rect": [x, y, w, h], "label": label, "p_idx": p_idx, "c_idx": c_idx})
+                buffers.append(cv2.imencode('.jpg', crop)[1])
+        encoded.append((slots, buffers))
+    return encoded
+
+
+class SimulatedClient(threading.Thread):
+
+    def __init__(self, index, frames, args, deadline):
+        super().__init__(daemon=True)
+        self.client_id = f"load{index:03d}"
+        self.frames = frames
+        self.args = args
+        self.deadline = deadline
+        self.rtts = []
+        self.errors = 0
+
+    def run(self):
+        interval = 1.0 / self.args.fps if self.args.fps > 0 else 0.0
+        if self.args.transport == "stream":
+            stream = frame_stream.FrameStreamClient(self.args.host, self.args.stream_port, max_inflight=1)
+        else:
+            session = requests.Session()
+        frame_id = 0
+        while time.time() < self.deadline:
+            started = time.perf_counter()
+            slots, buffers = self.frames[frame_id % len(self.frames)]
+            frame_id += 1
+            body = frame_codec.encode_frame({"client_id": self.client_id, "frame_id": frame_id, "slots": slots},
+                                            buffers)
+            if self._send(stream if self.args.transport == "stream" else session, frame_id, body):
+                self.rtts.append(time.perf_counter() - started)
+            else:
+                self.errors += 1
+                time.sleep(0.05)
+            time.sleep(max(0.0, interval - (time.perf_counter() - started)))
+        if self.args.transport == "stream":
+            stream.close()
+
+    def _send(self, conn, frame_id, body):
+        if self.args.transport == "stream":
+            if not conn.submit(frame_id, body):
+                return False
+            end = time.time() + self.args.timeout
+            while time.time() < end:
+                latest = conn.latest()
+                if latest and latest.get("frame_id") == frame_id:
+                    return latest.get("status") != "error"
+                conn.wait_for_room(0.01)
+            return False
+        try:
+            response = conn.post(f"http://{self.args.host}:{self.args.http_port}/process_frame_bin", data=body,
+                                 headers={"Content-Type": frame_codec.CONTENT_TYPE}, timeout=self.args.timeout)
+            return response.status_code == 200
+        except requests.RequestException:
+            return False
+
+
+def percentiles(values):
+    if not values:
+        return {}
+    ms = np.array(values) * 1000
+    return {p: float(np.percentile(ms, int(p[1:]))) for p in ("p50", "p95", "p99")}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--players', type=int, default=4, help='Synthetic player zones per client')
+    parser.add_argument('--fps', type=float, default=15.0, help='Max frames/s per client (0 = as fast as possible)')
+    parser.add_argument('--seconds', type=float, default=20.0)
+    parser.add_argument('--frames', type=int, default=60, help='Frames loaded per video')
+    parser.add_argument('--transport', choices=['stream', 'binary'], default='stream')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--http-port', type=int, default=5000)
+    parser.add_argument('--stream-port', type=int, default=5001)
+    parser.add_argument('--timeout', type=float, default=5.0)
+    parser.add_argument('--label', default='', help='Free-form tag stored with the results (e.g. "workers=4")')
+    args = parser.parse_args()
+
+    videos = [encode_video(v, args.frames, args.players) for v in VIDEOS]
+    deadline = time.time() + args.seconds
+    clients = [SimulatedClient(i, videos[i % len(videos)], args, deadline) for i in range(args.clients)]
+    start = time.perf_counter()
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.join()
+    elapsed = time.perf_counter() - start
+
+    rtts = [r for c in clients for r in c.rtts]
+    crops_per_frame = np.mean([len(slots) for slots, _ in videos[0]])
+    results = {
+        "label": args.label,
+        "clients": args.clients,
+        "transport": args.transport,
+        "fps_target": args.fps,
+        "frames": len(rtts),
+        "errors": sum(c.errors for c in clients),
+        "frames_per_sec": len(rtts) / elapsed,
+        "crops_per_sec": len(rtts) * crops_per_frame / elapsed,
+        "per_client_fps": [len(c.rtts) / elapsed for c in clients],
+        "rtt_ms": percentiles(rtts),
+    }
+    print(f"{args.clients} clients: {results['frames_per_sec']:.1f} frames/s ({results['crops_per_sec']:.0f} crops/s), "
+          f"{results['errors']} errors, rtt {results['rtt_ms']}")
+    print(f"Results written to {write_results('load_test', results)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+"""End-to-end replay benchmark: real client pipelines replaying the test videos against a server.
+
+Starts server.py (by default with the stub detector, so it runs on CPU-only
+machines), then one headless client.py per --clients replaying
+Testvideo2/3.mp4 for --frames frames. While they run it follows the dashboard
+/events stream and samples CPU and memory of every process from /proc.
+Reports:
+  - frames/s answered across clients
+  - capture-to-response latency percentiles, measured inside each client
+  - dashboard latency: from the server receiving a frame to a viewer receiving
+    the state push for it
+  - CPU % and peak RSS for the server and the clients
+  - the server's rolling per-stage timings (/metrics/summary)
+
+Run from the repository root:
+    python PokerTracker/benchmarks/replay_benchmark.py --clients 2 --frames 300
+    python PokerTracker/benchmarks/replay_benchmark.py --backend onnx --label "onnx int8" -- --int8
+Arguments after ``--`` are passed to server.py.
+"""
+import argparse
+import http.client
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import cv2
+import numpy as np
+import requests
+
+from bench_utils import DATA_DIR, TEST_BASE_DIR, VIDEOS, synthetic_zones, write_results
+
+HTTP_PORT, DASHBOARD_PORT = 5000, 8000
+BENCH_ZONES = "bench_p_slots"
+CLK_TCK = os.sysconf("SC_CLK_TCK")
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+
+def percentiles(values):
+    if not len(values):
+        return {}
+    return {p: float(np.percentile(values, int(p[1:]))) for p in ("p50", "p95", "p99")}
+
+
+def prepare_zones(video, players):
+    """Writes synthetic zones for the benchmark clients; returns the zone files it created.
+
+    The server also loads the default p_slots/f_slots at startup, and clients
+    always read f_slots, so those are only written when missing.
+    """
+    cap = cv2.VideoCapture(str(video))
+    success, img = cap.read()
+    cap.release()
+    if not success:
+        raise FileNotFoundError(f"Could not read {video}")
+    p_zones, f_zones = synthetic_zones(img.shape, players)
+    created = []
+    for name, zones, overwrite in ((BENCH_ZONES, p_zones, True), ("p_slots", p_zones, False),
+                                   ("f_slots", f_zones, False)):
+        path = DATA_DIR / f"{name}.json"
+        if overwrite or not path.exists():
+            with open(path, "w") as f:
+                json.dump(zones, f, indent=4)
+            created.append(path)
+    return created
+
+
+def proc_sample(pid):
+    """(cpu seconds, rss bytes) of one process, or None once it has exited."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open(f"/proc/{pid}/statm") as f:
+            rss_pages = int(f.read().split()[1])
+    except (FileNotFoundError, ProcessLookupError, IndexError):
+        return None
+    # Fields after the command name start at index 3 (state), so utime/stime are 11/12.
+    return (int(fields[11]) + int(fields[12])) / CLK_TCK, rss_pages * PAGE_SIZE
+
+
+def child_pids(pid):
+    try:
+        tasks = os.listdir(f"/proc/{pid}/task")
+    except FileNotFoundError:
+        return []
+    children = []
+    for task in tasks:
+        try:
+            with open(f"/proc/{pid}/task/{task}/children") as f:
+                children += [int(c) for c in f.read().split()]
+        except FileNotFoundError:
+            pass
+    return children
+
+
+class ResourceSampler(threading.Thread):
+    """Samples CPU time and RSS of named processes every ``interval`` seconds.
+
+    Child processes (inference and equity workers) are sampled as ``<name>.<pid>``.
+    """
+
+    def __init__(self, processes, interval=0.5):
+        super().__init__(daemon=True)
+        self.processes = processes  # name -> pid
+        self.interval = interval
+        self.stop = threading.Event()
+        self.first, self.last, self.peak_rss = {}, {}, {}
+
+    def run(self):
+        while not self.stop.is_set():
+            now = time.perf_counter()
+            processes = dict(self.processes)
+            for name, pid in self.processes.items():
+                processes.update({f"{name}.{child}": child for child in child_pids(pid)})
+            for name, pid in processes.items():
+                sample = proc_sample(pid)
+                if sample is None:
+                    continue
+                self.first.setdefault(name, (now, sample[0]))
+                self.last[name] = (now, sample[0])
+                self.peak_rss[name] = max(self.peak_rss.get(name, 0), sample[1])
+            self.stop.wait(self.interval)
+
+    def summary(self):
+        out = {}
+        for name in self.last:
+            (t0, cpu0), (t1, cpu1) = self.first[name], self.last[name]
+            out[name] = {"cpu_percent": 100.0 * (cpu1 - cpu0) / (t1 - t0) if t1 > t0 else 0.0,
+                         "peak_rss_mb": self.peak_rss[name] / 2 ** 20}
+        return out
+
+
+def newest_ts(value):
+    """Largest 'ts' found anywhere in a nested state section."""
+    if isinstance(value, dict):
+        found = [value["ts"]] if isinstance(value.get("ts"), (int, float)) else []
+        found += [newest_ts(v) for v in value.values() if isinstance(v, dict)]
+        return max([t for t in found if t is not None], default=None)
+    return None
+
+
+def follow_dashboard(latencies, stop):
+    """Records push latency for every card update the dashboard sends to viewers."""
+    while not stop.is_set():
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", DASHBOARD_PORT, timeout=20)
+            conn.request("GET", "/events")
+            response = conn.getresponse()
+        except OSError:
+            time.sleep(0.2)
+            continue
+        event = None
+        while not stop.is_set():
+            line = response.fp.readline()
+            if not line:
+                break
+            line = line.decode().strip()
+            if line.startswith("event:"):
+                event = line[6:].strip()
+            elif line.startswith("data:") and event == "diff":
+                received = time.time()
+                sections = json.loads(line[5:])["sections"]
+                ts = [newest_ts(sections.get(name, {}).get("set")) for name in ("player_cards", "flop_cards")]
+                ts = [t for t in ts if t is not None]
+                if ts:
+                    latencies.append((received - max(ts)) * 1000)
+        conn.close()
+
+
+def wait_for_server(server, timeout):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"server.py exited with code {server.returncode}")
+        try:
+            requests.get(f"http://127.0.0.1:{HTTP_PORT}/scheduler_stats", timeout=1)
+            return
+        except requests.RequestException:
+            time.sleep(0.5)
+    raise TimeoutError(f"server.py not reachable after {timeout}s")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--clients', type=int, default=2)
+    parser.add_argument('--frames', type=int, default=300, help='Frames each client replays')
+    parser.add_argument('--players', type=int, default=4, help='Synthetic player zones per client')
+    parser.add_argument('--backend', default='stub', help='server.py --backend (stub needs no models)')
+    parser.add_argument('--stub-ms', type=float, default=3.0, help='Simulated per-crop time with the stub backend')
+    parser.add_argument('--workers', type=int, default=0, help='server.py --workers')
+    parser.add_argument('--transport', choices=['stream', 'binary', 'json'], default='stream')
+    parser.add_argument('--unpaced', action='store_true', help='Replay as fast as possible instead of in real time')
+    parser.add_argument('--startup-timeout', type=float, default=120.0)
+    parser.add_argument('--label', default='', help='Free-form tag stored with the results')
+    args, server_extra = parser.parse_known_args()
+    server_extra = [a for a in server_extra if a != "--"]
+
+    created = prepare_zones(VIDEOS[0], args.players)
+    server_cmd = [sys.executable, "PokerTracker/server.py", "--backend", args.backend,
+                  "--workers", str(args.workers)] + server_extra
+    if args.backend == "stub":
+        server_cmd += ["--stub-ms", str(args.stub_ms), "--stub-cards"]
+    stats_dir = tempfile.TemporaryDirectory()
+    # Flask logs every request to stderr; keep it out of the report but show it if startup fails.
+    server_log = open(os.path.join(stats_dir.name, "server.log"), "w+")
+    server = subprocess.Popen(server_cmd, cwd=TEST_BASE_DIR, stdout=server_log, stderr=subprocess.STDOUT)
+    stop = threading.Event()
+    dashboard_latencies = []
+    clients = []
+    try:
+        try:
+            wait_for_server(server, args.startup_timeout)
+        except (RuntimeError, TimeoutError):
+            server_log.seek(0)
+            print(server_log.read()[-4000:])
+            raise
+        threading.Thread(target=follow_dashboard, args=(dashboard_latencies, stop), daemon=True).start()
+        sampler = ResourceSampler({"server": server.pid})
+        sampler.start()
+
+        start = time.perf_counter()
+        for i in range(args.clients):
+            stats_file = os.path.join(stats_dir.name, f"client{i}.json")
+            cmd = [sys.executable, "PokerTracker/client.py", "--video", str(VIDEOS[i % len(VIDEOS)]),
+                   "-pz", BENCH_ZONES, "--headless", "--max-frames", str(args.frames),
+                   "--transport", args.transport, "--client-id", f"replay{i:02d}", "--stats-file", stats_file]
+            if args.unpaced:
+                cmd.append("--unpaced")
+            client = subprocess.Popen(cmd, cwd=TEST_BASE_DIR, stdout=subprocess.DEVNULL)
+            sampler.processes[f"client{i}"] = client.pid
+            clients.append((client, stats_file))
+        for client, _ in clients:
+            client.wait()
+        elapsed = time.perf_counter() - start
+        time.sleep(0.5)  # last dashboard pushes
+        sampler.stop.set()
+        stage_summary = requests.get(f"http://127.0.0.1:{HTTP_PORT}/metrics/summary", timeout=5).json()
+    finally:
+        stop.set()
+        server.terminate()
+        for client, _ in clients:
+            if client.poll() is None:
+                client.terminate()
+        server.wait(timeout=10)
+        server_log.close()
+        for path in created:
+            path.unlink()
+
+    client_stats = []
+    for client, stats_file in clients:
+        if client.returncode != 0 or not os.path.exists(stats_file):
+            raise RuntimeError(f"client exited with code {client.returncode} and no stats")
+        with open(stats_file) as f:
+            client_stats.append(json.load(f))
+    stats_dir.cleanup()
+
+    latencies = [l for s in client_stats for l in s["latency_ms"]]
+    responses = sum(s["responses"] for s in client_stats)
+    resources = sampler.summary()
+    results = {
+        "label": args.label,
+        "backend": args.backend,
+        "stub_ms": args.stub_ms if args.backend == "stub" else None,
+        "workers": args.workers,
+        "clients": args.clients,
+        "players": args.players,
+        "transport": args.transport,
+        "paced": not args.unpaced,
+        "server_args": server_extra,
+        "seconds": elapsed,
+        "frames_captured": sum(s["frames_captured"] for s in client_stats),
+        "frames_sent": sum(s["frames_sent"] for s in client_stats),
+        "responses": responses,
+        "frames_per_sec": responses / elapsed,
+        "per_client_fps": [s["responses"] / elapsed for s in client_stats],
+        "end_to_end_ms": percentiles(latencies),
+        "dashboard_ms": percentiles(dashboard_latencies),
+        "dashboard_pushes": len(dashboard_latencies),
+        "resources": resources,
+        "server_stages_ms": stage_summary,
+        "client_stages_ms": [s["stages"] for s in client_stats],
+    }
+    print(f"{args.clients} clients, {responses} frames in {elapsed:.1f}s: {results['frames_per_sec']:.1f} frames/s")
+    print(f"End-to-end latency (ms): {results['end_to_end_ms']}")
+    print(f"Dashboard latency (ms): {results['dashboard_ms']} over {len(dashboard_latencies)} pushes")
+    for name, r in resources.items():
+        print(f"{name}: {r['cpu_percent']:.0f}% CPU, peak RSS {r['peak_rss_mb']:.0f} MB")
+    print(f"Results written to {write_results('replay', results)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,93 +1,147 @@
 import json
-from treys import Card, Evaluator
+from collections import OrderedDict
+from treys import Evaluator
+import cards
+import hand_eval
+from game_state import write_json_atomic
 
-def format_card_for_treys(card_str):
-    rank = card_str[:-1].upper()
-    suit = card_str[-1].lower()
-    if rank == "10":
-        rank = "T"
-    return f"{rank}{suit}"
+NO_ACTIVE_CARDS = {
+    "winner_id": None,
+    "results": {},
+    "status": "No active cards"
+}
 
-def evaluate_winner():
-    evaluator = Evaluator()
-    output_path = 'PokerTracker/data/winner.json'
+class WinnerEvaluator:
+    """Long-lived winner calculator that only re-scores hands whose cards changed.
 
-    output_data = {
-        "winner_id": None,
-        "results": {},
-        "status": "No active cards"
-    }
-    
-    try:
-        with open('PokerTracker/data/flop_cards.json', 'r') as f:
-            flop_data = json.load(f)
-        with open('PokerTracker/data/player_cards.json', 'r') as f:
-            player_data = json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError) as e:
-        print(f"Error: {e}")
-        return
+    Scores are memoized per (board, hole cards) in a bounded LRU cache, so a
+    frame where nothing moved costs dictionary lookups only. ``evaluate``
+    also reports whether the result differs from the previous call so callers
+    can skip publishing identical winners.
+    """
 
-    board = [Card.new(format_card_for_treys(c['name'])) for c in flop_data.values()]
+    def __init__(self, cache_size=4096):
+        self.evaluator = Evaluator()
+        self.cache_size = cache_size
+        self._scores = OrderedDict()
+        self.last_output = None
+        self.hits = 0
+        self.misses = 0
 
-    if not board or not player_data:
-        with open(output_path, 'w') as out_file:
-            json.dump(output_data, out_file, indent=4)
-        return
-    
-    if not board:
-        return
+    def score(self, board, hole):
+        """(score, hand_type) for sorted tuples of board and hole card names."""
+        return self.score_many(board, [hole])[0]
+
+    def score_many(self, board, holes):
+        """(score, hand_type) per hole card tuple; cache misses are scored in one batch."""
+        results = [None] * len(holes)
+        missed = []
+        for i, hole in enumerate(holes):
+            key = (board, hole)
+            cached = self._scores.get(key)
+            if cached is not None:
+                self._scores.move_to_end(key)
+                self.hits += 1
+                results[i] = cached
+            else:
+                missed.append(i)
+        if not missed:
+            return results
+
+        self.misses += len(missed)
+        hands = [[cards.card_index(c) for c in board + holes[i]] for i in missed]
+        for i, score in zip(missed, hand_eval.evaluate(hands).tolist()):
+            hand_type = self.evaluator.class_to_string(self.evaluator.get_rank_class(score))
+            results[i] = self._scores[(board, holes[i])] = (score, hand_type)
+        while len(self._scores) > self.cache_size:
+            self._scores.popitem(last=False)
+        return results
+
+    def evaluate(self, flop_data, player_data):
+        """Returns (winner document, changed since the last call)."""
+        output = self._rank(flop_data, player_data)
+        changed = output != self.last_output
+        self.last_output = output
+        return output, changed
+
+    def _rank(self, flop_data, player_data):
+        board = tuple(sorted(c['name'] for c in flop_data.values()))
 
-    best_score = float('inf')
-    winner_key = None 
-    all_player_results = {}
+        # Hands are scored from the flop on (5 to 7 cards).
+        if len(board) < 3 or not player_data:
+            return dict(NO_ACTIVE_CARDS)
 
+        best_score = float('inf')
+        winner_key = None 
+        all_player_results = {}
 
-    for client_id, players in player_data.items():
-        for p_idx, cards_dict in players.items():
-            
-            has_down_cards = any(c['name'] == 'DN' for c in cards_dict.values())
-            if has_down_cards:
-                continue
+        complete = []
+        for client_id, players in player_data.items():
+            for p_idx, cards_dict in players.items():
+                
+                names = tuple(sorted(c['name'] for c in cards_dict.values()))
+                if 'DN' in names:
+                    continue
 
-            hand = [Card.new(format_card_for_treys(c['name'])) for c in cards_dict.values()]
-            
-            player_key = f"{client_id}_{p_idx}"
-            
-            if len(hand) < 2:
-                all_player_results[player_key] = {
+                player_key = f"{client_id}_{p_idx}"
+                
+                if len(names) < 2:
+                    all_player_results[player_key] = {
+                        "client_id": client_id,
+                        "player_index": str(p_idx),
+                        "hand_type": "Incomplete Hand",
+                        "is_winner": False
+                    }
+                    continue
+
+                result = all_player_results[player_key] = {
                     "client_id": client_id,
-                    "player_index": p_idx,
-                    "hand_type": "Incomplete Hand",
+                    "player_index": str(p_idx),
+                    "score": None,
+                    "hand_type": None,
                     "is_winner": False
                 }
-                continue
-            
-            score = evaluator.evaluate(board, hand)
-            hand_class = evaluator.get_rank_class(score)
-            hand_type = evaluator.class_to_string(hand_class)
-            
-            all_player_results[player_key] = {
-                "client_id": client_id,
-                "player_index": p_idx,
-                "score": score,
-                "hand_type": hand_type,
-                "is_winner": False
-            }
+                complete.append((player_key, names, result))
+
+        scores = self.score_many(board, [names for _, names, _ in complete]) if complete else []
+        for (player_key, _, result), (score, hand_type) in zip(complete, scores):
+            result["score"] = score
+            result["hand_type"] = hand_type
 
             if score < best_score:
                 best_score = score
                 winner_key = player_key
 
-    if winner_key:
-        all_player_results[winner_key]["is_winner"] = True
+        # Split pots: every player holding the best score wins.
+        for result in all_player_results.values():
+            if result.get("score") == best_score:
+                result["is_winner"] = True
+
+        return {
+            "winner_id": winner_key,
+            "results": all_player_results
+        }
+
+_evaluator = WinnerEvaluator()
+
+def compute_winner(flop_data, player_data):
+    """Ranks every complete hand against the board; returns the winner.json document."""
+    return _evaluator.evaluate(flop_data, player_data)[0]
+
+def evaluate_winner():
+    """File mode: reads the card snapshots from data/ and writes winner.json."""
+    output_path = 'PokerTracker/data/winner.json'
 
-    output_data = {
-        "winner_id": winner_key,
-        "results": all_player_results
-    }
+    try:
+        with open('PokerTracker/data/flop_cards.json', 'r') as f:
+            flop_data = json.load(f)
+        with open('PokerTracker/data/player_cards.json', 'r') as f:
+            player_data = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        print(f"Error: {e}")
+        return
 
-    with open(output_path, 'w') as out_file:
-        json.dump(output_data, out_file, indent=4)
+    write_json_atomic(output_path, compute_winner(flop_data, player_data))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,137 @@
+import confidence_fusion
+
+CARD_TIMEOUT_SECONDS = 2
+
+CLASS_NAMES = [
+    '10C', '10D', '10H', '10S', '2C', '2D', '2H', '2S', '3C', '3D',
+    '3H', '3S', '4C', '4D', '4H', '4S', '5C', '5D', '5H', '5S',
+    '6C', '6D', '6H', '6S', '7C', '7D', '7H', '7S', '8C', '8D',
+    '8H', '8S', '9C', '9D', '9H', '9S', 'AC', 'AD', 'AH', 'AS',
+    'JC', 'JD', 'JH', 'JS', 'KC', 'KD', 'KH', 'KS', 'QC', 'QD',
+    'QH', 'QS'
+]
+
+
+def slot_key(client_id, slot_data):
+    return (client_id, slot_data.get('label'), slot_data.get('p_idx', 0), slot_data.get('c_idx', 0))
+
+
+class CardState:
+    """Player hands and board cards built from per-slot detections.
+
+    ``player_cards`` is {client_id: {p_idx: {card_idx: {"name", "conf", "ts"}}}}
+    and ``flop_cards`` is {c_idx: {"name", "conf", "ts"}}, the layout written to
+    data/*.json. Each slot's card is decided by a ClassVotes accumulator over
+    its last ``fusion_frames`` frames, and its conf is the fused confidence.
+    With ``tracked`` detections the face boxes come from card_tracker and their
+    labels and confidences are used as they are (see ClassVotes.update_tracked).
+    Cards not seen again within ``timeout`` seconds of ``curr_t`` are dropped.
+    Used by the server and by offline.py.
+    """
+
+    def __init__(self, timeout=CARD_TIMEOUT_SECONDS, verbose=False, fusion_frames=confidence_fusion.FUSION_FRAMES,
+                 min_conf=confidence_fusion.DECIDE_CONF):
+        self.timeout = timeout
+        self.verbose = verbose
+        self.fusion_frames = fusion_frames
+        self.min_conf = min_conf
+        self.player_cards = {}
+        self.flop_cards = {}
+        # (client_id, label, p_idx, c_idx) -> True when the slot showed a card back last frame
+        self.slot_was_dn = {}
+        # (client_id, label, p_idx, c_idx) -> ClassVotes of the slot
+        self.slot_votes = {}
+        # ("player", client_id, p_idx, card_idx) or ("flop", c_idx) -> slot key the card was read from
+        self.entry_slots = {}
+
+    def votes_for(self, key, curr_t):
+        votes = self.slot_votes.get(key)
+        if votes is None:
+            votes = self.slot_votes[key] = confidence_fusion.ClassVotes(self.fusion_frames)
+        elif votes.t is not None and curr_t - votes.t >= self.timeout:
+            # A slot not seen for a while starts over rather than voting with stale frames.
+            votes.reset()
+        return votes
+
+    def apply(self, client_id, slots, detections, curr_t, tracked=False):
+        """Folds one frame of (face boxes, back boxes, skipped) per slot into the state.
+
+        ``detections[i]`` may be None for slots that were not inferred. Returns the
+        boxes to draw on the client, in frame coordinates.
+        """
+        return_detections = []
+        if client_id not in self.player_cards:
+            self.player_cards[client_id] = {}
+
+        for i, detection in enumerate(detections):
+            if detection is None:
+                continue
+            r, r_back, _ = detection
+
+            slot_data = slots[i]
+            rect = slot_data.get('rect', [0, 0, 0, 0])
+            label = slot_data.get('label', 'unknown')
+            p_idx = slot_data.get('p_idx', 0)
+            c_idx = slot_data.get('c_idx', 0)
+
+            roi_x, roi_y, roi_w, roi_h = [int(v) for v in rect]
+            key = slot_key(client_id, slot_data)
+            self.slot_was_dn[key] = len(r) == 0 and len(r_back) > 0
+            votes = self.votes_for(key, curr_t)
+            fused = votes.update_tracked(r, r_back, curr_t) if tracked else votes.update(r, r_back, curr_t)
+
+            if len(r) > 0:
+                for box in r:
+                    lx1, ly1, lx2, ly2 = [int(val) for val in box[:4]]
+                    return_detections.append({
+                        "bbox": [roi_x + lx1, roi_y + ly1, roi_x + lx2, roi_y + ly2],
+                        "label": f"{CLASS_NAMES[int(box[5])]} {fused[int(box[5])]:.2f}",
+                        "color": [0, 0, 255]
+                    })
+            elif len(r_back) > 0 and label == "player":
+                for box_back in r_back:
+                    blx1, bly1, blx2, bly2 = [int(val) for val in box_back[:4]]
+                    return_detections.append({
+                        "bbox": [roi_x + blx1, roi_y + bly1, roi_x + blx2, roi_y + bly2],
+                        "label": f"DN {fused[confidence_fusion.DN_CLASS]:.2f}",
+                        "color": [0, 255, 255]
+                    })
+            else:
+                # Nothing in view: the cards the slot had expire on their own.
+                continue
+
+            if label == "player":
+                hand = []
+                for cls, conf in votes.decide(2, self.min_conf):
+                    if cls == confidence_fusion.DN_CLASS:
+                        hand.extend([('DN', conf)] * votes.backs)
+                    else:
+                        hand.append((CLASS_NAMES[cls], conf))
+                if hand and p_idx not in self.player_cards[client_id]:
+                    self.player_cards[client_id][p_idx] = {}
+                for idx, (name, conf) in enumerate(hand[:2]):
+                    self.player_cards[client_id][p_idx][idx] = {'name': name, 'conf': conf, 'ts': curr_t}
+                    self.entry_slots[("player", client_id, p_idx, idx)] = key
+            elif label == "flop":
+                for cls, conf in votes.decide(1, self.min_conf, allow_dn=False):
+                    self.flop_cards[c_idx] = {'name': CLASS_NAMES[cls], 'conf': conf, 'ts': curr_t}
+                    self.entry_slots[("flop", c_idx)] = key
+            if self.verbose:
+                print(f"[VERBOSE] {label} slot {i}: {votes.decide(2, self.min_conf)}")
+
+        self.expire(curr_t)
+        return return_detections
+
+    def expire(self, curr_t):
+        """Drops cards older than the timeout, and players or clients left without cards."""
+        new_player_cards = {}
+        for cid, p_data in self.player_cards.items():
+            client_players = {}
+            for p_id, cards in p_data.items():
+                valid_cards = {c_idx: d for c_idx, d in cards.items() if curr_t - d['ts'] < self.timeout}
+                if valid_cards:
+                    client_players[p_id] = valid_cards
+            if client_players:
+                new_player_cards[cid] = client_players
+        self.player_cards = new_player_cards
+        self.flop_cards = {c_idx: d for c_idx, d in self.flop_cards.items() if curr_t - d['ts'] < self.timeout}
@@ -0,0 +1,189 @@
+import itertools
+
+import numpy as np
+
+import confidence_fusion
+
+EMPTY_BOXES = np.zeros((0, 6), dtype=np.float32)
+
+
+def iou_matrix(a, b):
+    """IoU of every box in ``a`` against every box in ``b`` ([x1, y1, x2, y2, ...] rows)."""
+    if not len(a) or not len(b):
+        return np.zeros((len(a), len(b)), dtype=np.float32)
+    ix1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    iy1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    ix2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    iy2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(ix2 - ix1, 0, None) * np.clip(iy2 - iy1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    return inter / np.maximum(area_a[:, None] + area_b[None, :] - inter, 1e-6)
+
+
+def greedy_match(ious, threshold):
+    """(row, col) pairs by descending IoU, each row and column used once."""
+    pairs, rows, cols = [], set(), set()
+    for flat in np.argsort(-ious, axis=None, kind="stable"):
+        r, c = divmod(int(flat), ious.shape[1])
+        if ious[r, c] < threshold:
+            break
+        if r not in rows and c not in cols:
+            pairs.append((r, c))
+            rows.add(r)
+            cols.add(c)
+    return pairs
+
+
+class Track:
+    """One card in a slot: an alpha-beta filtered box and ClassVotes over its detections.
+
+    The track's label is the class with the highest fused confidence over
+    roughly its last ``frames`` detections.
+    """
+
+    def __init__(self, track_id, box, t, frames):
+        self.id = track_id
+        self.pos = np.asarray(box[:4], dtype=np.float64)
+        self.vel = np.zeros(4)
+        self.t = t
+        self.votes = confidence_fusion.ClassVotes(frames)
+        self.hits = 0
+        self.misses = 0
+        self.label = None
+        self.label_switches = 0
+        self.vote(box)
+
+    def vote(self, box):
+        self.votes.update(box[None])
+        self.hits += 1
+        label = self.votes.top()
+        if self.label is not None and label != self.label:
+            self.label_switches += 1
+        self.label = label
+
+    def predict(self, t):
+        """Box at time ``t`` if the card keeps moving as it did."""
+        return self.pos + self.vel * max(t - self.t, 0.0)
+
+    def correct(self, box, t, alpha, beta):
+        dt = t - self.t
+        predicted = self.predict(t)
+        residual = np.asarray(box[:4], dtype=np.float64) - predicted
+        self.pos = predicted + alpha * residual
+        if dt > 0:
+            self.vel = self.vel + beta * residual / dt
+        self.t = t
+        self.misses = 0
+        self.vote(box)
+
+    @property
+    def conf(self):
+        return float(self.votes.fused[self.label])
+
+    def row(self, t):
+        return [*self.predict(t), self.conf, self.label]
+
+
+class SlotTracker:
+    """Card tracks of one slot, matched to each new set of detections by IoU.
+
+    Unmatched detections start tracks; a track missed by ``max_misses``
+    detector runs in a row ends. Between runs ``boxes`` propagates the tracks
+    with their filtered motion, so the slot keeps its cards without inference.
+    """
+
+    def __init__(self, ids, iou_threshold=0.3, alpha=0.6, beta=0.4, frames=confidence_fusion.FUSION_FRAMES,
+                 max_misses=2):
+        self.ids = ids
+        self.iou_threshold = iou_threshold
+        self.alpha = alpha
+        self.beta = beta
+        self.frames = frames
+        self.max_misses = max_misses
+        self.tracks = []
+        self.back = EMPTY_BOXES
+        self.since_detect = 0
+        self.created = 0
+
+    def update(self, face, t, back=EMPTY_BOXES):
+        self.since_detect = 0
+        self.back = back
+        predicted = np.array([tr.predict(t) for tr in self.tracks]).reshape(-1, 4)
+        matched_tracks, matched_boxes = set(), set()
+        for r, c in greedy_match(iou_matrix(predicted, face), self.iou_threshold):
+            self.tracks[r].correct(face[c], t, self.alpha, self.beta)
+            matched_tracks.add(r)
+            matched_boxes.add(c)
+        for r, track in enumerate(self.tracks):
+            if r not in matched_tracks:
+                track.misses += 1
+        self.tracks = [tr for tr in self.tracks if tr.misses <= self.max_misses]
+        for c, box in enumerate(face):
+            if c not in matched_boxes:
+                self.tracks.append(Track(next(self.ids), box, t, self.frames))
+                self.created += 1
+
+    def boxes(self, t):
+        """(n, 6) rows of the tracks seen by the last detector run, with their stable labels."""
+        rows = [tr.row(t) for tr in self.tracks if tr.misses == 0]
+        return np.array(rows, dtype=np.float32) if rows else EMPTY_BOXES
+
+    @property
+    def label_switches(self):
+        return sum(tr.label_switches for tr in self.tracks)
+
+
+class CardTracker:
+    """Slot trackers for every client, and the every-N-frames detection schedule.
+
+    With ``detect_every`` N, a slot that has live tracks is only sent to the
+    detector every N-th frame; ``due`` says whether this frame is one of them
+    and ``propagate`` stands in for the detector on the others. Slots without
+    tracks (empty or just appeared) are detected every frame.
+    """
+
+    def __init__(self, detect_every=1, **slot_args):
+        self.detect_every = max(1, detect_every)
+        self.slot_args = slot_args
+        self.slots = {}
+        self.ids = itertools.count()
+        self.detector_runs = 0
+        self.propagated = 0
+        self.ended_switches = 0
+
+    def slot(self, key):
+        tracker = self.slots.get(key)
+        if tracker is None:
+            tracker = self.slots[key] = SlotTracker(self.ids, **self.slot_args)
+        return tracker
+
+    def due(self, key):
+        tracker = self.slots.get(key)
+        if tracker is None or not tracker.tracks:
+            return True
+        return tracker.since_detect + 1 >= self.detect_every
+
+    def update(self, key, face, back, t):
+        """Folds a detector result into the slot; returns (tracked face boxes, back boxes)."""
+        tracker = self.slot(key)
+        before = {tr.id: tr.label_switches for tr in tracker.tracks}
+        tracker.update(face, t, back)
+        alive = {tr.id for tr in tracker.tracks}
+        self.ended_switches += sum(n for track_id, n in before.items() if track_id not in alive)
+        self.detector_runs += 1
+        return tracker.boxes(t), tracker.back
+
+    def propagate(self, key, t):
+        """(tracked face boxes, back boxes) for a frame the detector skipped."""
+        tracker = self.slot(key)
+        tracker.since_detect += 1
+        self.propagated += 1
+        return tracker.boxes(t), tracker.back
+
+    def stats(self):
+        """Detector runs, frames served from tracks, tracks started and label switches within tracks."""
+        return {"detector_runs": self.detector_runs,
+                "propagated": self.propagated,
+                "tracks_created": sum(s.created for s in self.slots.values()),
+                "label_switches": self.ended_switches + sum(s.label_switches for s in self.slots.values())}
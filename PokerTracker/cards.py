@@ -0,0 +1,22 @@
+from treys import Card
+
+# Compact card indices shared by the equity and hand evaluation code:
+# index = rank * 4 + suit, ranks 2..A -> 0..12, suits c, d, h, s -> 0..3.
+RANKS = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']
+SUITS = ['C', 'D', 'H', 'S']
+CARD_NAMES = [rank + suit for rank in RANKS for suit in SUITS]
+CARD_INDEX = {name: i for i, name in enumerate(CARD_NAMES)}
+
+
+def card_index(name):
+    """'10S' / 'AS' style detector label -> index 0..51."""
+    return CARD_INDEX[name.upper()]
+
+
+def treys_card(index):
+    """Index 0..51 -> treys integer card."""
+    rank, suit = RANKS[index // 4], SUITS[index % 4]
+    return Card.new(('T' if rank == '10' else rank) + suit.lower())
+
+
+TREYS_CARDS = [treys_card(i) for i in range(52)]
@@ -0,0 +1,38 @@
+import numpy as np
+
+EMPTY_BOXES = np.zeros((0, 6), dtype=np.float32)
+
+
+def run_cascade(items, run_face, run_back):
+    """Runs the card-face and card-back detectors as a two-stage cascade.
+
+    ``items`` is a list of ``(crop, back_first)`` pairs. Normally the face model
+    runs first and the back model only sees crops where it found nothing. Slots
+    flagged ``back_first`` (showed a card back last frame) run in the reverse
+    order. ``run_face``/``run_back`` take a list of crops and return one box
+    array per crop.
+
+    Returns one ``(face_boxes, back_boxes, skipped)`` tuple per item, where a
+    detector that did not run reports no boxes and ``skipped`` counts it.
+    """
+    face = [None] * len(items)
+    back = [None] * len(items)
+
+    def run(fn, out, idx):
+        if idx:
+            for i, boxes in zip(idx, fn([items[i][0] for i in idx])):
+                out[i] = boxes
+
+    face_idx = [i for i, (_, back_first) in enumerate(items) if not back_first]
+    back_idx = [i for i, (_, back_first) in enumerate(items) if back_first]
+
+    run(run_face, face, face_idx)
+    run(run_back, back, back_idx)
+    run(run_back, back, [i for i in face_idx if len(face[i]) == 0])
+    run(run_face, face, [i for i in back_idx if len(back[i]) == 0])
+
+    results = []
+    for f, b in zip(face, back):
+        skipped = (f is None) + (b is None)
+        results.append((EMPTY_BOXES if f is None else f, EMPTY_BOXES if b is None else b, skipped))
+    return results
@@ -0,0 +1,122 @@
+import json
+from collections import Counter, deque
+
+# Value of one chip per detector label. The usual casino colours; anything
+# else can be set with a JSON file (server.py --chip-values), and labels that
+# are numbers ("25") are worth that number.
+CHIP_VALUES = {"white": 1, "red": 5, "blue": 10, "green": 25, "black": 100, "purple": 500, "yellow": 1000}
+STACK_WINDOW = 15
+
+
+def load_chip_values(path=None):
+    """CHIP_VALUES, overridden by a {label: value} JSON file when ``path`` is given."""
+    values = dict(CHIP_VALUES)
+    if path:
+        with open(path) as f:
+            values.update({str(k).lower(): float(v) for k, v in json.load(f).items()})
+    return values
+
+
+def chip_value(label, values):
+    label = str(label).lower()
+    if label in values:
+        return values[label]
+    try:
+        return float(label)
+    except ValueError:
+        return 0
+
+
+class StackWindow:
+    """Chip counts per label averaged over the last ``window`` observations of one zone.
+
+    Keeps running sums, so adding an observation costs one pass over its labels
+    and the one that falls out of the window, whatever the window length.
+    """
+
+    def __init__(self, window=STACK_WINDOW):
+        self.window = window
+        self.history = deque()
+        self.sums = Counter()
+
+    def add(self, counts):
+        self.history.append(counts)
+        self.sums.update(counts)
+        if len(self.history) > self.window:
+            self.sums.subtract(self.history.popleft())
+            self.sums = +self.sums
+
+    @property
+    def full(self):
+        return len(self.history) >= self.window
+
+    def counts(self):
+        """Smoothed count per label; a chip seen in under half the window rounds away."""
+        n = max(len(self.history), 1)
+        smoothed = {label: int(total / n + 0.5) for label, total in self.sums.items()}
+        return {label: c for label, c in sorted(smoothed.items()) if c}
+
+
+class ChipAccounting:
+    """Per-player stacks and the pot from chip detections.
+
+    ``observe`` takes the detected_chips.json entries of one player zone.
+    Every player gets a StackWindow, and its smoothed counts give the stack
+    value. A player's baseline is their largest stack since the hand started
+    (``new_hand``). What they are below it counts as committed to the pot,
+    and the pot is the sum of those amounts. A stack only counts once its
+    window is full, so chips being placed do not show up as a bet.
+    """
+
+    def __init__(self, values=None, window=STACK_WINDOW, timeout=None):
+        self.values = values if values is not None else dict(CHIP_VALUES)
+        self.window = window
+        self.timeout = timeout
+        self.stacks = {}     # player key -> StackWindow
+        self.seen = {}       # player key -> last observation time
+        self.baselines = {}  # player key -> stack value the hand is measured from
+        self.pot = 0
+        self.pot_delta = 0
+
+    def observe(self, player, chips, curr_t=0.0):
+        stack = self.stacks.get(player)
+        if stack is None:
+            stack = self.stacks[player] = StackWindow(self.window)
+        stack.add(Counter(chip["label"] for chip in chips))
+        self.seen[player] = curr_t
+
+    def value(self, counts):
+        return sum(chip_value(label, self.values) * n for label, n in counts.items())
+
+    def expire(self, curr_t):
+        if self.timeout is None:
+            return
+        for player in [p for p, t in self.seen.items() if curr_t - t >= self.timeout]:
+            del self.stacks[player], self.seen[player]
+            self.baselines.pop(player, None)
+
+    def new_hand(self):
+        """Measures bets from the current stacks; call when the board is cleared."""
+        self.baselines = {p: self.value(s.counts()) for p, s in self.stacks.items() if s.full}
+
+    def state(self, curr_t=None):
+        """{"players": {player: {"counts", "value", "committed"}}, "pot", "pot_delta"}.
+
+        ``pot_delta`` is the last change of the pot, so it stays put between bets.
+        """
+        if curr_t is not None:
+            self.expire(curr_t)
+        players, pot = {}, 0
+        for player, stack in sorted(self.stacks.items()):
+            if not stack.full:
+                continue
+            counts = stack.counts()
+            value = self.value(counts)
+            baseline = max(self.baselines.get(player, value), value)
+            self.baselines[player] = baseline
+            committed = baseline - value
+            pot += committed
+            players[player] = {"counts": counts, "value": value, "committed": committed}
+        if pot != self.pot:
+            self.pot_delta, self.pot = pot - self.pot, pot
+        return {"players": players, "pot": pot, "pot_delta": self.pot_delta}
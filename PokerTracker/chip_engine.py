@@ -0,0 +1,134 @@
+import numpy as np
+
+CHIP_WEIGHTS = "PokerTracker/chips/best5.pt"
+EMPTY_BOXES = np.zeros((0, 6), dtype=np.float32)
+
+
+def slice_starts(length, size, step):
+    """Offsets of ``size``-long windows ``step`` apart covering ``length``; the last one ends flush."""
+    if length <= size:
+        return [0]
+    starts = list(range(0, length - size, step))
+    return starts + [length - size]
+
+
+def slice_rects(w, h, slice_size, overlap=0.2):
+    """(x, y, w, h) tiles of at most ``slice_size`` covering a w x h ROI, overlapping by ``overlap``."""
+    if not slice_size or (w <= slice_size and h <= slice_size):
+        return [(0, 0, w, h)]
+    step = max(1, int(slice_size * (1 - overlap)))
+    return [(x, y, min(slice_size, w), min(slice_size, h))
+            for y in slice_starts(h, slice_size, step) for x in slice_starts(w, slice_size, step)]
+
+
+def overlap_ratio(box, others, metric="ios"):
+    """Overlap of ``box`` with each row of ``others``: intersection over the smaller area or over the union."""
+    ix1 = np.maximum(box[0], others[:, 0])
+    iy1 = np.maximum(box[1], others[:, 1])
+    ix2 = np.minimum(box[2], others[:, 2])
+    iy2 = np.minimum(box[3], others[:, 3])
+    inter = np.clip(ix2 - ix1, 0, None) * np.clip(iy2 - iy1, 0, None)
+    area = (box[2] - box[0]) * (box[3] - box[1])
+    areas = (others[:, 2] - others[:, 0]) * (others[:, 3] - others[:, 1])
+    denom = np.minimum(area, areas) if metric == "ios" else area + areas - inter
+    return inter / np.maximum(denom, 1e-6)
+
+
+def merge_boxes(boxes, threshold=0.5, mode="nmm", metric="ios"):
+    """Greedy per-class merge of duplicate boxes, highest confidence first.
+
+    ``nms`` drops boxes overlapping a kept one; ``nmm`` (the SAHI default)
+    grows the kept box to their union instead, which rejoins chips cut in two
+    by a slice boundary.
+    """
+    if len(boxes) < 2:
+        return boxes
+    boxes = boxes[np.argsort(-boxes[:, 4], kind="stable")]
+    alive = np.ones(len(boxes), dtype=bool)
+    kept = []
+    for i in range(len(boxes)):
+        if not alive[i]:
+            continue
+        box = boxes[i].copy()
+        rest = np.flatnonzero(alive & (boxes[:, 5] == box[5]))
+        rest = rest[rest > i]
+        if len(rest):
+            dup = rest[overlap_ratio(box, boxes[rest], metric) >= threshold]
+            alive[dup] = False
+            if mode == "nmm" and len(dup):
+                box[0:2] = np.minimum(box[0:2], boxes[dup, 0:2].min(axis=0))
+                box[2:4] = np.maximum(box[2:4], boxes[dup, 2:4].max(axis=0))
+        kept.append(box)
+    return np.stack(kept)
+
+
+class ChipEngine:
+    """Chip detection for many zone ROIs with one detector call.
+
+    ``detect(rois)`` cuts each ROI into overlapping ``slice_size`` tiles (or
+    keeps it whole when ``slice_size`` is 0), sends the tiles of every ROI to
+    ``detector.predict`` together, shifts boxes back into ROI coordinates and,
+    for sliced ROIs, merges duplicates from overlapping tiles. It has the
+    ``run_batch`` shape, so an InferenceScheduler can batch zones across clients.
+    """
+
+    def __init__(self, detector, conf=0.5, slice_size=0, overlap=0.2, merge_threshold=0.5, merge_mode="nmm",
+                 imgsz=None):
+        self.detector = detector
+        self.conf = conf
+        self.slice_size = slice_size
+        self.overlap = overlap
+        self.merge_threshold = merge_threshold
+        self.merge_mode = merge_mode
+        self.imgsz = imgsz or slice_size or None
+
+    def tiles(self, rois):
+        """(roi index, x offset, y offset, tile view) for every tile of every ROI."""
+        tiles = []
+        for r, roi in enumerate(rois):
+            if roi is None or roi.size == 0:
+                continue
+            h, w = roi.shape[:2]
+            for x, y, tw, th in slice_rects(w, h, self.slice_size, self.overlap):
+                tiles.append((r, x, y, roi[y:y+th, x:x+tw]))
+        return tiles
+
+    def detect(self, rois):
+        """One (n, 6) [x1, y1, x2, y2, conf, cls] array per ROI, in ROI pixels."""
+        tiles = self.tiles(rois)
+        per_roi = [[] for _ in rois]
+        if tiles:
+            results = self.detector.predict([t[3] for t in tiles], conf=self.conf, imgsz=self.imgsz)
+            for (r, x, y, _), boxes in zip(tiles, results):
+                if len(boxes):
+                    boxes = boxes.copy()
+                    boxes[:, [0, 2]] += x
+                    boxes[:, [1, 3]] += y
+                    per_roi[r].append(boxes)
+        out = []
+        for r, found in enumerate(per_roi):
+            if not found:
+                out.append(EMPTY_BOXES)
+                continue
+            boxes = np.concatenate(found)
+            if len(found) > 1:
+                boxes = merge_boxes(boxes, self.merge_threshold, self.merge_mode)
+            out.append(boxes)
+        return out
+
+    __call__ = detect
+
+    def label(self, cls):
+        names = getattr(self.detector, "names", None) or {}
+        return names.get(int(cls), str(int(cls)))
+
+
+def chip_records(engine, boxes, rect, player_index, zone_index=0):
+    """chipstream's detected_chips.json entries for one zone; ``rect`` places ROI boxes in the frame."""
+    zx, zy = int(rect[0]), int(rect[1])
+    return [{"player_index": player_index,
+             "zone_index": zone_index,
+             "label": engine.label(b[5]),
+             "confidence": round(float(b[4]), 3),
+             "bbox": [int(b[0]) + zx, int(b[1]) + zy, int(b[2]) + zx, int(b[3]) + zy]}
+            for b in boxes]
@@ -1,29 +1,34 @@
 import cv2
-import json
 import time
-import os
-import numpy as np
 import select_zones
 import argparse
-from sahi import AutoDetectionModel
-from sahi.predict import get_prediction
-
+import inference_backend
+import chip_engine
+import game_state
 
+# Standalone chip viewer. The server runs the same engine on the player crops
+# clients already send (server.py --chips); use this to tune zones and slicing.
 parser = argparse.ArgumentParser()
 parser.add_argument('-z', '--setzones', action='store_true', help='Sets zones manually')
+parser.add_argument('--device', default='auto', help='Device for the chip model (auto, cuda, mps, cpu, ...)')
+parser.add_argument('--backend', choices=inference_backend.BACKENDS, default='auto')
+parser.add_argument('--int8', action='store_true', help='INT8-quantized model with the onnx/openvino backends')
+parser.add_argument('--weights', default=chip_engine.CHIP_WEIGHTS, help='Chip model weights')
+parser.add_argument('--conf', type=float, default=0.5, help='Chip confidence threshold')
+parser.add_argument('--slice-size', type=int, default=0, help='Cut zones into tiles of this size (0 = whole zone)')
+parser.add_argument('--overlap', type=float, default=0.2, help='Overlap ratio between neighbouring tiles')
+parser.add_argument('--video', type=str, help='Video file instead of the first camera')
 args = parser.parse_args()
 
 X, Y = 1920, 1080
-FLOP_HAND_SIZE = 5 
+FLOP_HAND_SIZE = 5
+OUTPUT_FILE = "PokerTracker/data/detected_chips.json"
 
-detection_model = AutoDetectionModel.from_pretrained(
-    model_type="ultralytics",
-    model_path="/home/evan/projects/hoyleed-senior-design/PokerTracker/chips/best5.pt",
-    confidence_threshold=0.5,
-    device="cuda" 
-)
+engine = chip_engine.ChipEngine(
+    inference_backend.load_detector(args.weights, args.backend, args.device, args.int8),
+    conf=args.conf, slice_size=args.slice_size, overlap=args.overlap)
 
-cap = cv2.VideoCapture(0)
+cap = cv2.VideoCapture(args.video if args.video else 0)
 cap.set(3, X)
 cap.set(4, Y)
 
@@ -32,59 +37,39 @@ if args.setzones:
 else:
     players, _ = select_zones.fetch_zones()
 
+zones = [(p_idx, z_idx, zone) for p_idx, hand_zones in enumerate(players) for z_idx, zone in enumerate(hand_zones)]
+
 print("Starting Zone-based Chip Detection. Press 'q' to quit.")
 
+last_detections = None
 while cap.isOpened():
     success, frame = cap.read()
     if not success:
         break
 
+    rois = [frame[int(zy):int(zy+zh), int(zx):int(zx+zw)] for _, _, (zx, zy, zw, zh) in zones]
     all_detections = []
-    current_time = time.strftime("%Y-%m-%d %H:%M:%S")
-
-    for p_idx, hand_zones in enumerate(players):
-        for z_idx, (zx, zy, zw, zh) in enumerate(hand_zones):
-            roi = frame[int(zy):int(zy+zh), int(zx):int(zx+zw)]
-            
-            if roi.size == 0:
-                continue
-
-
-            result = get_prediction(roi, detection_model)
-
-            for prediction in result.object_prediction_list:
-                bbox = prediction.bbox.to_xyxy() # [lx1, ly1, lx2, ly2] (local to crop)
-                label = prediction.category.name
-                score = prediction.score.value
-
-                gx1, gy1 = int(bbox[0] + zx), int(bbox[1] + zy)
-                gx2, gy2 = int(bbox[2] + zx), int(bbox[3] + zy)
-
-                chip_data = {
-                    "player_index": p_idx,
-                    "zone_index": z_idx,
-                    "label": label,
-                    "confidence": round(float(score), 3),
-                    "bbox": [gx1, gy1, gx2, gy2]
-                }
-                all_detections.append(chip_data)
-                
-
-                cv2.rectangle(frame, (gx1, gy1), (gx2, gy2), (0, 255, 0), 2)
-                cv2.putText(frame, f"P{p_idx+1}: {label}", (gx1, gy1-10), 
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
-
-        for (zx, zy, zw, zh) in hand_zones:
-            cv2.rectangle(frame, (int(zx), int(zy)), (int(zx+zw), int(zy+zh)), (0, 0, 255), 1)
+    # Every zone (and tile) of the frame goes through the model in one call.
+    for (p_idx, z_idx, zone), boxes in zip(zones, engine.detect(rois)):
+        all_detections.extend(chip_engine.chip_records(engine, boxes, zone, p_idx, z_idx))
+
+    for chip in all_detections:
+        gx1, gy1, gx2, gy2 = chip["bbox"]
+        cv2.rectangle(frame, (gx1, gy1), (gx2, gy2), (0, 255, 0), 2)
+        cv2.putText(frame, f"P{chip['player_index']+1}: {chip['label']}", (gx1, gy1-10),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
+    for _, _, (zx, zy, zw, zh) in zones:
+        cv2.rectangle(frame, (int(zx), int(zy)), (int(zx+zw), int(zy+zh)), (0, 0, 255), 1)
 
     cv2.imshow("Zone Chip Detection", frame)
 
-    output_file = "PokerTracker/data/detected_chips.json"
-    with open(output_file, "w") as f:
-        json.dump({"timestamp": current_time, "detections": all_detections}, f, indent=4)
+    if all_detections != last_detections:
+        last_detections = all_detections
+        game_state.write_json_atomic(OUTPUT_FILE, {"timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+                                                   "detections": all_detections})
 
     if cv2.waitKey(1) & 0xFF == ord("q"):
         break
 
 cap.release()
-cv2.destroyAllWindows()
\ No newline at end of file
+cv2.destroyAllWindows()
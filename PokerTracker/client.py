@@ -5,12 +5,24 @@ import requests
 import base64
 import argparse
 import select_zones
+import frame_codec
+import frame_stream
+import slot_change
 import uuid
+import os
+import json
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import pipeline
+import preprocess
+import adaptive_encoder
 
 SERVER_URL = "http://127.0.0.1:5000/process_frame" 
+SERVER_BIN_URL = "http://127.0.0.1:5000/process_frame_bin"
+STREAM_HOST, STREAM_PORT = "127.0.0.1", 5001
 X, Y = 1920, 1080
 FLOP_HAND_SIZE = 5
-CLIENT_ID = str(uuid.uuid4())[:8]
 
 parser = argparse.ArgumentParser()
 parser.add_argument('-v', '--verbose', action='store_true')
@@ -18,14 +30,28 @@ parser.add_argument('-z', '--setzones', action='store_true')
 parser.add_argument('-pz','--playerzone', type=str, help='name of custom player zone file')
 parser.add_argument('--video', type=str, help='Path to test video file')
 parser.add_argument('--loop', action='store_true', help='Loop the video')
+parser.add_argument('--transport', choices=['stream', 'binary', 'json'], default='stream',
+                    help='stream pipelines binary frames over one TCP connection, binary/json POST each frame')
+parser.add_argument('--inflight', type=int, default=2, help='Frames kept in flight with --transport stream')
+parser.add_argument('--change-threshold', type=float, default=4.0,
+                    help='Mean abs pixel diff below which a slot is sent as unchanged (0 disables)')
+parser.add_argument('--max-unchanged', type=int, default=30, help='Re-send a slot after this many unchanged frames')
+parser.add_argument('--clahe', choices=preprocess.CLAHE_MODES, default='slot',
+                    help='slot equalizes each changed crop on the encode pool, frame each group of '
+                         'neighbouring slots in one pass, server leaves it to the server, off disables it')
+parser.add_argument('--target-rtt-ms', type=float, default=150.0,
+                    help='Round trip above which JPEG quality and crop scale are lowered (0 disables)')
+parser.add_argument('--encode-workers', type=int, default=min(4, os.cpu_count() or 1),
+                    help='Threads used to preprocess and JPEG encode crops')
+parser.add_argument('--headless', action='store_true', help='Run without a preview window')
+parser.add_argument('--max-frames', type=int, default=0, help='Stop after capturing this many frames (0 = no limit)')
+parser.add_argument('--unpaced', action='store_true',
+                    help='Read video files as fast as the pipeline takes frames instead of in real time')
+parser.add_argument('--client-id', type=str, default=None, help='Client id sent to the server (default: random)')
+parser.add_argument('--stats-file', type=str, default=None,
+                    help='Write frame counts and capture-to-response latencies as JSON here on exit')
 args = parser.parse_args()
-
-def apply_clahe(img):
-    lab = cv2.cvtColor(img, cv2.COLOR_BGR2LAB)
-    l, a, b = cv2.split(lab)
-    clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
-    cl = clahe.apply(l)
-    return cv2.cvtColor(cv2.merge((cl,a,b)), cv2.COLOR_LAB2BGR)
+CLIENT_ID = args.client_id or str(uuid.uuid4())[:8]
 
 def open_first_available_camera():
     for index in range(10):
@@ -66,48 +92,87 @@ else:
     else:
          players, flop_slots = select_zones.fetch_zones()
 
-while True:
-    success, img = cap.read()
-    if not success:
-            if args.video and args.loop:
-                if args.verbose:
-                    print("Looping video...")
-                cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
-                success, img = cap.read()
-            else:
-                break 
-    curr_t = time.time()
-    img = cv2.flip(img,-1)
+session = requests.Session()
+change_detector = slot_change.SlotChangeDetector(args.change_threshold, max_unchanged=args.max_unchanged)
+EMPTY_CROP = b""
+stream = None
+if args.transport == 'stream':
+    stream = frame_stream.FrameStreamClient(STREAM_HOST, STREAM_PORT, max_inflight=args.inflight)
 
-    p_slots = [(card, 'player', p_idx, c_idx) for p_idx, hand in enumerate(players) for c_idx, card in enumerate(hand)]
-    f_slots = [(card, 'flop', 0, f_idx) for f_idx, card in enumerate(flop_slots)]
-    all_slots = p_slots + f_slots
+# (frame_id, capture time) of frames sent and not yet answered, oldest first.
+captured_at = deque()
+latencies = []
 
-    encoded_crops = []
-    sanitized_slots = []
+def handle_response(data, rtt):
+    encoder.observe(rtt, data.get('confidence'))
+    answered = data.get('frame_id')
+    if answered is not None:
+        now = time.perf_counter()
+        while captured_at and captured_at[0][0] <= answered:
+            sent_id, captured = captured_at.popleft()
+            if sent_id == answered:
+                latencies.append(now - captured)
+    for label, p_idx, c_idx in data.get('resend', []):
+        change_detector.invalidate((label, p_idx, c_idx))
 
-    for (rect, label, p_idx, c_idx) in all_slots:
-        x, y, w, h = [int(v) for v in rect]
-        
-        crop = img[y:y+h, x:x+w]
-        if crop.size > 0:
-            crop = apply_clahe(crop)
-            _, buffer = cv2.imencode('.jpg', crop)
-            encoded_crops.append(base64.b64encode(buffer).decode('utf-8'))
-            
-            sanitized_slots.append({
-                "rect": [int(x), int(y), int(w), int(h)],
-                "label": str(label),
-                "p_idx": int(p_idx),
-                "c_idx": int(c_idx)
-            })
+def draw_detections(img, detections):
+    for det in detections:
+        x1, y1, x2, y2 = det['bbox']
+        label = det['label']
+        color = det['color'] 
 
-    payload = {
-            "client_id": CLIENT_ID, 
-            "crops": encoded_crops,
-            "slots": sanitized_slots  
-        }
+        cv2.rectangle(img, (x1, y1), (x2, y2), tuple(color), 2)
+        cv2.putText(img, label, (x1, y1 - 10), 
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, tuple(color), 2)
+
+stop = threading.Event()
+timer = pipeline.StageTimer()
+frames = pipeline.DropOldestQueue(1)   # capture -> prepare: only the newest frame
+outgoing = pipeline.DropOldestQueue(2)  # prepare -> send
+display = pipeline.DropOldestQueue(1)   # prepare -> main thread
+encode_pool = ThreadPoolExecutor(max_workers=max(1, args.encode_workers))
+http_response = {'data': None, 'rtt': None}
+encoder = adaptive_encoder.AdaptiveEncoder(target_rtt_ms=args.target_rtt_ms)
+
+all_slots = ([(card, 'player', p_idx, c_idx) for p_idx, hand in enumerate(players) for c_idx, card in enumerate(hand)]
+             + [(card, 'flop', 0, f_idx) for f_idx, card in enumerate(flop_slots)])
+
+def capture():
+    """Reads frames as fast as the source delivers them, keeping only the newest."""
+    global frames_captured
+    # Video files would otherwise be read far faster than real time.
+    fps = cap.get(cv2.CAP_PROP_FPS) if args.video and not args.unpaced else 0
+    frame_interval = 1.0 / fps if fps and fps > 0 else 0
+    next_t = time.perf_counter()
+    try:
+        while not stop.is_set() and not (args.max_frames and frames_captured >= args.max_frames):
+            start = time.perf_counter()
+            success, img = cap.read()
+            if not success:
+                if args.video and args.loop:
+                    if args.verbose:
+                        print("Looping video...")
+                    cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                    success, img = cap.read()
+                if not success:
+                    break
+            timer.record('capture', time.perf_counter() - start)
+            frames_captured += 1
+            frames.put((time.perf_counter(), img))
+            if frame_interval:
+                next_t += frame_interval
+                time.sleep(max(0.0, next_t - time.perf_counter()))
+    finally:
+        frames.close()
+
+clahe = preprocess.ClahePreprocessor()
 
+def encode_crop(crop, quality, scale):
+    if args.clahe == 'slot':
+        crop = clahe.apply(crop)
+    return encoder.encode(crop, quality, scale)
+
+def draw_zones(img):
     for p_idx, hand in enumerate(players):
         for c_idx, rect in enumerate(hand):
             x, y, w, h = [int(v) for v in rect]
@@ -121,27 +186,185 @@ while True:
         cv2.putText(img, f"Flop {f_idx}", (x, y - 5), 
                     cv2.FONT_HERSHEY_SIMPLEX, 0.4, (0, 255, 0), 1)
 
+frame_id = 0
+frames_captured = 0
 
-    try:
-        response = requests.post(SERVER_URL, json=payload)
-        if response.status_code == 200:
-            data = response.json()
-            detections = data.get('detections', [])
+def prepare(item):
+    """Flips the frame, encodes changed crops on the worker pool and builds the request."""
+    global frame_id
+    captured, img = item
+    img = cv2.flip(img,-1)
 
-            for det in detections:
-                x1, y1, x2, y2 = det['bbox']
-                label = det['label']
-                color = det['color'] 
+    sanitized_slots = []
+    slot_updates = []
+    crops = []
 
-                cv2.rectangle(img, (x1, y1), (x2, y2), tuple(color), 2)
-                cv2.putText(img, label, (x1, y1 - 10), 
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.5, tuple(color), 2)
+    for (rect, label, p_idx, c_idx) in all_slots:
+        x, y, w, h = [int(v) for v in rect]
+        
+        crop = img[y:y+h, x:x+w]
+        if crop.size > 0:
+            slot = {
+                "rect": [int(x), int(y), int(w), int(h)],
+                "label": str(label),
+                "p_idx": int(p_idx),
+                "c_idx": int(c_idx)
+            }
+            key = (slot["label"], slot["p_idx"], slot["c_idx"])
+            changed, thumb = change_detector.check(key, crop)
+            slot_updates.append((key, changed, thumb))
+
+            if not changed:
+                # The server reuses its last detection for this slot.
+                slot["unchanged"] = True
+            
+            sanitized_slots.append(slot)
+            crops.append(crop if changed else None)
+
+    if args.clahe == 'frame':
+        # One CLAHE pass per group of neighbouring changed slots; crops become views into the result.
+        changed = [i for i, c in enumerate(crops) if c is not None]
+        for i, crop in zip(changed, clahe.apply_regions(img, [sanitized_slots[i]["rect"] for i in changed])):
+            crops[i] = crop
 
+    quality, frame_scale = encoder.settings()
+    jobs = []
+    for slot, crop in zip(sanitized_slots, crops):
+        if crop is None:
+            jobs.append(None)
+            continue
+        scale = encoder.scale_for(crop.shape, frame_scale)
+        if scale < 1.0:
+            # The server maps boxes on the smaller crop back to slot coordinates.
+            slot["scale"] = scale
+        jobs.append(encode_pool.submit(encode_crop, crop, quality, scale))
+
+    # Crops are views into img, so every encode must finish before the zones are drawn on it.
+    jpeg_buffers = [job.result() if job is not None else EMPTY_CROP for job in jobs]
+
+    frame_id += 1
+    captured_at.append((frame_id, captured))
+    header = {
+            "client_id": CLIENT_ID, 
+            "frame_id": frame_id,
+            "slots": sanitized_slots,
+            "encoder": {"quality": quality, "scale": round(frame_scale, 3)}
+        }
+    if args.clahe == 'server':
+        header["preprocess"] = "clahe"
+
+    draw_zones(img)
+    display.put(img)
+    return header, jpeg_buffers, slot_updates
+
+def send(item):
+    header, jpeg_buffers, slot_updates = item
+    try:
+        if stream is not None:
+            body = frame_codec.encode_frame(header, jpeg_buffers)
+            # Wait for window room unless a newer frame is already queued behind this one.
+            while not stream.submit(header['frame_id'], body):
+                if stop.is_set() or not outgoing.empty():
+                    return
+                stream.wait_for_room(0.05)
+            change_detector.commit(slot_updates)
+        else:
+            start = time.perf_counter()
+            if args.transport == 'binary':
+                body = frame_codec.encode_frame(header, jpeg_buffers)
+                response = session.post(SERVER_BIN_URL, data=body,
+                                        headers={'Content-Type': frame_codec.CONTENT_TYPE})
+            else:
+                payload = dict(header, crops=[base64.b64encode(b).decode('utf-8') for b in jpeg_buffers])
+                response = session.post(SERVER_URL, json=payload)
+            if response.status_code == 200:
+                change_detector.commit(slot_updates)
+                data = response.json()
+                data.setdefault('frame_id', header['frame_id'])
+                http_response['rtt'] = time.perf_counter() - start
+                http_response['data'] = data
     except Exception as e:
         print(f"Connection Error: {e}")
 
-    cv2.imshow('{feed} Feed'.format(feed=CLIENT_ID), img)
-    if cv2.waitKey(1) == ord('q'): break
+def latest_response():
+    return stream.latest() if stream is not None else http_response['data']
+
+threads = [
+    threading.Thread(target=capture, name='capture', daemon=True),
+    pipeline.start_stage('prepare', frames, prepare, outgoing, timer, stop),
+    pipeline.start_stage('send', outgoing, send, None, timer, stop),
+]
+threads[0].start()
+
+last_response_id = None
+responses = 0
+shown = 0
+
+def poll_response():
+    """Handles the newest response once; returns it (or None before the first one)."""
+    global last_response_id, responses
+    data = latest_response()
+    if data and data.get('frame_id') != last_response_id:
+        last_response_id = data.get('frame_id')
+        responses += 1
+        handle_response(data, stream.last_rtt if stream is not None else http_response['rtt'])
+    return data
+
+while True:
+    # Headless runs poll often so response latencies are measured close to arrival.
+    img = display.get(timeout=0.005 if args.headless else 0.1)
+    data = poll_response()
+    if img is None:
+        if display.closed or not threads[1].is_alive():
+            # The capture source ended and prepare has finished with its last frame.
+            break
+        if not args.headless and cv2.waitKey(1) == ord('q'): break
+        continue
+
+    start = time.perf_counter()
+    if data:
+        draw_detections(img, data.get('detections', []))
+
+    if not args.headless:
+        cv2.imshow('{feed} Feed'.format(feed=CLIENT_ID), img)
+    timer.record('display', time.perf_counter() - start)
+    shown += 1
+    if args.verbose and shown % 30 == 0:
+        print(f"Stages: {timer.format()}")
+        print(f"Dropped frames: capture {frames.dropped}, send {outgoing.dropped}, display {display.dropped}")
+        if stream is not None and stream.last_rtt is not None:
+            print(f"Showing result of frame {last_response_id} at frame {frame_id}, "
+                  f"{stream.inflight()} in flight, rtt {stream.last_rtt * 1000:.1f}ms")
+        print(f"Unchanged slot ratio: {change_detector.skip_ratio():.1%}")
+        quality, scale = encoder.settings()
+        print(f"JPEG quality {quality}, crop scale {scale:.2f}")
+    if not args.headless and cv2.waitKey(1) == ord('q'): break
 
+stop.set()
+for thread in threads:
+    thread.join(timeout=1.0)
+# Give frames still in flight a moment to be answered so they count.
+drain_until = time.perf_counter() + 2.0
+while stream is not None and stream.inflight() and time.perf_counter() < drain_until:
+    time.sleep(0.005)
+    poll_response()
+poll_response()
+if args.stats_file:
+    with open(args.stats_file, "w") as f:
+        json.dump({
+            "client_id": CLIENT_ID,
+            "video": args.video,
+            "frames_captured": frames_captured,
+            "frames_sent": frame_id,
+            "responses": responses,
+            "latency_ms": [round(l * 1000, 3) for l in latencies],
+            "dropped": {"capture": frames.dropped, "send": outgoing.dropped, "display": display.dropped},
+            "unchanged_ratio": change_detector.skip_ratio(),
+            "stages": timer.summary(),
+        }, f, indent=4)
+encode_pool.shutdown(wait=False)
+if stream is not None:
+    stream.close()
 cap.release()
-cv2.destroyAllWindows()
\ No newline at end of file
+if not args.headless:
+    cv2.destroyAllWindows()
@@ -0,0 +1,75 @@
+import numpy as np
+
+# The 52 card classes of the face model (card_state.CLASS_NAMES) plus one for card backs.
+N_CARDS = 52
+DN_CLASS = N_CARDS
+N_CLASSES = N_CARDS + 1
+FUSION_FRAMES = 5
+DECIDE_CONF = 0.3
+
+
+def frame_evidence(classes, confs):
+    """P(class present) per class for one frame: noisy-OR of the confidences of its boxes.
+
+    Two boxes of the same card (its two corner indices) back each other up,
+    so the class gets 1 - (1 - c1)(1 - c2) instead of a fixed boost.
+    """
+    miss = np.ones(N_CLASSES)
+    if len(classes):
+        np.multiply.at(miss, np.asarray(classes, dtype=np.intp), 1 - np.asarray(confs, dtype=np.float64))
+    return 1 - miss
+
+
+class ClassVotes:
+    """Exponential vote over roughly the last ``frames`` frames of one slot or track.
+
+    ``fused[c]`` is the bias-corrected moving average of ``frame_evidence``,
+    i.e. how confidently class ``c`` was seen recently. A frame costs a fixed
+    number of N_CLASSES-sized array operations plus one scatter over its boxes.
+    """
+
+    def __init__(self, frames=FUSION_FRAMES):
+        self.decay = 1 - 1 / max(frames, 1)
+        self.reset()
+
+    def reset(self):
+        self.evidence = np.zeros(N_CLASSES)
+        self.fused = np.zeros(N_CLASSES)
+        self.weight = 0.0
+        self.t = None
+        self.backs = 0
+
+    def update(self, faces, backs=None, t=None):
+        """Adds one frame of (n, 6) face boxes and card-back boxes; returns ``fused``."""
+        classes, confs = faces[:, 5], faces[:, 4]
+        if backs is not None and len(backs):
+            classes = np.concatenate([classes, np.full(len(backs), DN_CLASS)])
+            confs = np.concatenate([confs, backs[:, 4]])
+            self.backs = len(backs)
+        self.evidence *= self.decay
+        self.evidence += (1 - self.decay) * frame_evidence(classes, confs)
+        self.weight = self.weight * self.decay + (1 - self.decay)
+        self.fused = self.evidence / self.weight
+        self.t = t
+        return self.fused
+
+    def update_tracked(self, faces, backs=None, t=None):
+        """``update`` for face boxes from card tracks, whose confidences are already fused.
+
+        Card backs are averaged as usual; each card takes the confidence its
+        track gives it, so a card change is not smoothed a second time.
+        """
+        self.update(faces[:0], backs, t)
+        tracked = frame_evidence(faces[:, 5], faces[:, 4])[:N_CARDS]
+        self.fused[:N_CARDS] = tracked
+        self.evidence[:N_CARDS] = tracked * self.weight
+        return self.fused
+
+    def top(self):
+        return int(np.argmax(self.fused))
+
+    def decide(self, k=1, min_conf=DECIDE_CONF, allow_dn=True):
+        """Up to ``k`` (class, fused confidence) pairs at or above ``min_conf``, best first."""
+        fused = self.fused if allow_dn else self.fused[:N_CARDS]
+        best = np.argsort(-fused, kind="stable")[:k]
+        return [(int(c), float(fused[c])) for c in best if fused[c] >= min_conf]
@@ -0,0 +1,101 @@
+import http.server
+import json
+import threading
+
+KEEPALIVE_SECONDS = 15
+
+
+def section_diff(prev, curr):
+    """One-level diff between two section dicts: {"set": {key: value}, "del": [key]}."""
+    if not isinstance(prev, dict) or not isinstance(curr, dict):
+        return {"replace": curr}
+    changed = {k: v for k, v in curr.items() if k not in prev or prev[k] != v}
+    removed = [k for k in prev if k not in curr]
+    return {"set": changed, "del": removed}
+
+
+def state_diff(prev, curr):
+    """Diff of every section that differs between two game state snapshots."""
+    sections = {}
+    for name, value in curr.items():
+        if name not in prev or prev[name] != value:
+            sections[name] = section_diff(prev.get(name, {}), value)
+    return sections
+
+
+def sse_message(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n".encode("utf-8")
+
+
+class EventFeed:
+    """Turns store versions into SSE messages, encoding each diff once for all viewers.
+
+    Viewers that are on the previous version (the common case) share the cached
+    message; a viewer that fell behind gets a diff computed against its own
+    last snapshot.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._lock = threading.Lock()
+        self._cached = None  # (from_version, to_version, message)
+
+    def snapshot_message(self):
+        version, state = self.store.snapshot()
+        return version, state, sse_message("snapshot", {"version": version, "state": state})
+
+    def next_message(self, version, state, timeout=KEEPALIVE_SECONDS):
+        """Waits for a newer version; returns (version, state, message), message None on timeout."""
+        new_version, new_state = self.store.wait_for_change(version, timeout)
+        if new_version == version:
+            return version, state, None
+        with self._lock:
+            cached = self._cached
+            if cached and cached[0] == version and cached[1] == new_version:
+                return new_version, new_state, cached[2]
+        message = sse_message("diff", {"version": new_version, "sections": state_diff(state, new_state)})
+        with self._lock:
+            self._cached = (version, new_version, message)
+        return new_version, new_state, message
+
+
+def make_handler(web_dir, feed):
+    """Static file handler for the dashboard with a server-sent events stream at /events."""
+
+    class Handler(http.server.SimpleHTTPRequestHandler):
+        def __init__(self, *args, **kwargs):
+            # Tell this specific handler to look in the PokerTracker folder
+            super().__init__(*args, directory=web_dir, **kwargs)
+
+        def do_GET(self):
+            if self.path.split("?")[0] == "/events":
+                return self.stream_events()
+            return super().do_GET()
+
+        def stream_events(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Connection", "keep-alive")
+            self.end_headers()
+            try:
+                version, state, message = feed.snapshot_message()
+                self.wfile.write(message)
+                self.wfile.flush()
+                while True:
+                    version, state, message = feed.next_message(version, state)
+                    self.wfile.write(message if message is not None else b": ping\n\n")
+                    self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+    return Handler
+
+
+def serve_dashboard(store, port, web_dir):
+    """Serves the dashboard files and live state pushes until the process exits."""
+    http.server.ThreadingHTTPServer.allow_reuse_address = True
+    http.server.ThreadingHTTPServer.daemon_threads = True
+    with http.server.ThreadingHTTPServer(("", port), make_handler(web_dir, EventFeed(store))) as httpd:
+        print(f"Dashboard available at http://localhost:{port}")
+        httpd.serve_forever()
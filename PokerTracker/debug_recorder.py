@@ -0,0 +1,142 @@
+import os
+import queue
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+
+import cv2
+
+from game_state import write_json_atomic
+
+INDEX_FILE = "index.json"
+_UNSAFE = re.compile(r"[^A-Za-z0-9_-]")
+
+
+def safe_name(value):
+    return _UNSAFE.sub("_", str(value))[:64] or "unknown"
+
+
+class DebugRecorder:
+    """Dumps sampled slot crops to ``directory/<client>/<frame>_<slot>.jpg`` on a background thread.
+
+    A frame is recorded when it falls in the ``sample_rate`` fraction of that
+    client's frames; independently, any slot whose best detection is below
+    ``low_conf`` is recorded. Crops are queued without copying (the server never
+    mutates them) and dropped when the queue is full, so the request path never
+    waits on disk. At most ``max_files`` crops are kept: the oldest file is
+    deleted as each new one is written, including files left by earlier runs.
+    A rewritten path (a restarted client's frame ids begin again) counts as new.
+    ``index.json`` lists the newest crops for debug.html.
+
+    Callers should skip the recorder entirely when ``enabled`` is False.
+    """
+
+    def __init__(self, directory, sample_rate=0.0, low_conf=None, max_files=1000, queue_size=256,
+                 index_size=48):
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.low_conf = low_conf
+        self.max_files = max_files
+        self.index_size = index_size
+        self.enabled = sample_rate > 0 or low_conf is not None
+        self.dropped = 0
+        self.written = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._frames = {}
+        self._frames_lock = threading.Lock()
+        # path -> None, oldest first
+        self._files = OrderedDict()
+        self._recent = deque(maxlen=index_size)
+        self._thread = None
+
+    def start(self):
+        if self.enabled:
+            os.makedirs(self.directory, exist_ok=True)
+            self._files.update(dict.fromkeys(self._existing_files()))
+            self._thread = threading.Thread(target=self._run, name="debug-recorder", daemon=True)
+            self._thread.start()
+        return self
+
+    def _existing_files(self):
+        found = []
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if name.endswith(".jpg"):
+                    path = os.path.join(root, name)
+                    found.append((os.path.getmtime(path), path))
+        return [path for _, path in sorted(found)]
+
+    def sample_frame(self, client_id):
+        """Whether this client's next frame falls in the sampled fraction."""
+        if self.sample_rate <= 0:
+            return False
+        with self._frames_lock:
+            n = self._frames.get(client_id, 0)
+            self._frames[client_id] = n + 1
+        return int((n + 1) * self.sample_rate) > int(n * self.sample_rate)
+
+    def wants(self, sampled, conf):
+        """Whether a slot should be recorded; ``conf`` is its best detection confidence or None."""
+        return sampled or (self.low_conf is not None and conf is not None and conf < self.low_conf)
+
+    def record(self, client_id, frame_id, slot_name, crop, conf=None):
+        try:
+            self._queue.put_nowait((time.time(), client_id, frame_id, slot_name, crop, conf))
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        while True:
+            entry = self._queue.get()
+            try:
+                self._write(*entry)
+            except (OSError, cv2.error) as e:
+                print(f"Debug recorder: could not write crop: {e}")
+            if self._queue.empty():
+                try:
+                    write_json_atomic(os.path.join(self.directory, INDEX_FILE), list(self._recent), indent=None)
+                except OSError as e:
+                    print(f"Debug recorder: could not write index: {e}")
+            self._queue.task_done()
+
+    def _write(self, ts, client_id, frame_id, slot_name, crop, conf):
+        client_dir = os.path.join(self.directory, safe_name(client_id))
+        os.makedirs(client_dir, exist_ok=True)
+        name = f"{int(frame_id):08d}_{safe_name(slot_name)}.jpg"
+        path = os.path.join(client_dir, name)
+        cv2.imwrite(path, crop)
+        self._files.pop(path, None)
+        self._files[path] = None
+        self.written += 1
+        stale = {path}
+        while len(self._files) > self.max_files:
+            old, _ = self._files.popitem(last=False)
+            stale.add(old)
+            try:
+                os.remove(old)
+            except FileNotFoundError:
+                pass
+        # The index lists each file once, and only files still on disk.
+        stale = {self._index_path(p) for p in stale}
+        for item in [item for item in self._recent if item["path"] in stale]:
+            self._recent.remove(item)
+        self._recent.appendleft({
+            "path": self._index_path(path),
+            "client_id": str(client_id),
+            "frame_id": int(frame_id),
+            "slot": slot_name,
+            "conf": None if conf is None else round(float(conf), 3),
+            "ts": ts,
+        })
+
+    def _index_path(self, path):
+        """``path`` as index.json lists it: relative to the recorder directory's parent."""
+        return os.path.relpath(path, os.path.dirname(self.directory)).replace(os.sep, "/")
+
+    def flush(self, timeout=5.0):
+        """Waits until every queued crop is written (for tests and shutdown); False on timeout."""
+        if self._thread is None:
+            return True
+        with self._queue.all_tasks_done:
+            return self._queue.all_tasks_done.wait_for(lambda: self._queue.unfinished_tasks == 0, timeout)
@@ -0,0 +1,170 @@
+"""One card per deck: resolves the same card showing up in several slots or clients.
+
+``player_cards`` and ``flop_cards`` are filled slot by slot, so nothing stops
+AS from being read on the board and in a hand at once. Every frame the solver
+takes each card position (a board slot or one card of a hand) with its
+candidates: the card it shows plus the next readings of its slot. It then
+picks at most one position per card, maximizing total confidence:
+  - greedy: candidate pairs by descending confidence, each position and card used once
+  - repair: moves that hand a card to another claimant, who takes its next
+    candidate or a card freed by the first, as long as the total goes up
+The matrix is positions x distinct candidate cards (25 x 75 for 10 players,
+5 board slots and 3 candidates), so a frame costs under a millisecond.
+"""
+import numpy as np
+
+from card_state import CLASS_NAMES
+
+CANDIDATES = 3
+# Breaks ties toward positions keeping the card they show (e.g. the two cards of a hand).
+KEEP_BONUS = 1e-6
+MAX_REPAIR_ROUNDS = 8
+
+
+def position_name(position):
+    """"flop/2" for a board slot, "<client>_<player>/<card>" for a card in a hand."""
+    if position[0] == "flop":
+        return f"flop/{position[1]}"
+    _, client_id, p_idx, idx = position
+    return f"{client_id}_{p_idx}/{idx}"
+
+
+def table_candidates(table, k=CANDIDATES):
+    """(position, [(card, conf), ...]) for every face-up card of a CardState, best candidate first.
+
+    The first candidate is the card the position holds; the others are the
+    next cards its slot's votes back, so a position that loses a card can
+    fall back on what else it could be.
+    """
+    positions = []
+    for client_id, players in table.player_cards.items():
+        for p_idx, cards in players.items():
+            for idx, card in cards.items():
+                if card['name'] != 'DN':
+                    positions.append((("player", client_id, p_idx, idx), card))
+    positions += [(("flop", c_idx), card) for c_idx, card in table.flop_cards.items()]
+
+    out = []
+    for position, card in positions:
+        candidates = [(card['name'], card['conf'])]
+        votes = table.slot_votes.get(table.entry_slots.get(position))
+        if votes is not None:
+            for cls, conf in votes.decide(k + 1, table.min_conf, allow_dn=False):
+                if len(candidates) < k and CLASS_NAMES[cls] != card['name']:
+                    candidates.append((CLASS_NAMES[cls], conf))
+        out.append((position, candidates))
+    return out
+
+
+def solve(candidates):
+    """{position: (card, conf) or None} with every card used at most once."""
+    cards = sorted({card for _, cands in candidates for card, _ in cands})
+    column = {card: j for j, card in enumerate(cards)}
+    confs = np.zeros((len(candidates), len(cards)))
+    for i, (_, cands) in enumerate(candidates):
+        for card, conf in cands:
+            confs[i, column[card]] = max(confs[i, column[card]], conf)
+    weights = confs.copy()
+    for i, (_, cands) in enumerate(candidates):
+        if cands:
+            weights[i, column[cands[0][0]]] += KEEP_BONUS
+
+    row_card = np.full(len(candidates), -1)
+    card_row = np.full(len(cards), -1)
+    for flat in np.argsort(-weights, axis=None, kind="stable"):
+        r, c = divmod(int(flat), len(cards))
+        if weights[r, c] <= 0:
+            break
+        if row_card[r] < 0 and card_row[c] < 0:
+            row_card[r], card_row[c] = c, r
+
+    for _ in range(MAX_REPAIR_ROUNDS):
+        if not _repair(weights, row_card, card_row):
+            break
+
+    return {position: (cards[row_card[i]], float(confs[i, row_card[i]])) if row_card[i] >= 0 else None
+            for i, (position, _) in enumerate(candidates)}
+
+
+def _repair(weights, row_card, card_row):
+    """One pass of improving moves: row r takes card c from row r2, which takes its best free card."""
+    improved = False
+    for r in range(len(row_card)):
+        own = row_card[r]
+        own_weight = weights[r, own] if own >= 0 else 0.0
+        for c in np.flatnonzero(weights[r] > own_weight):
+            r2 = card_row[c]
+            if r2 < 0:
+                # A free card r prefers (left over by an earlier move).
+                if own >= 0:
+                    card_row[own] = -1
+                row_card[r], card_row[c] = c, r
+                improved = True
+                break
+            if r2 == r:
+                continue
+            free = (card_row < 0) & (weights[r2] > 0)
+            if own >= 0:
+                free[own] = True
+            free_weights = np.where(free, weights[r2], 0.0)
+            c2 = int(np.argmax(free_weights))
+            gain = weights[r, c] + free_weights[c2] - own_weight - weights[r2, c]
+            if gain > 1e-9:
+                if own >= 0:
+                    card_row[own] = -1
+                row_card[r], card_row[c] = c, r
+                if free_weights[c2] > 0:
+                    row_card[r2], card_row[c2] = c2, r2
+                else:
+                    row_card[r2] = -1
+                improved = True
+                break
+    return improved
+
+
+def find_conflicts(candidates, assignment):
+    """{card: {"claims", "kept", "reassigned"}} for every card first read at more than one position."""
+    claims = {}
+    for position, cands in candidates:
+        claims.setdefault(cands[0][0], []).append(position)
+    conflicts = {}
+    for card, positions in claims.items():
+        if len(positions) < 2:
+            continue
+        kept = next((p for p in positions if assignment[p] and assignment[p][0] == card), None)
+        conflicts[card] = {
+            "claims": [position_name(p) for p in positions],
+            "kept": position_name(kept) if kept else None,
+            "reassigned": {position_name(p): assignment[p][0] if assignment[p] else None
+                           for p in positions if p != kept},
+        }
+    return conflicts
+
+
+def resolve(table, k=CANDIDATES):
+    """(player_cards, flop_cards, conflicts): the table's cards with one card per deck.
+
+    Positions that gave up a card show their next candidate, or are left out
+    when they have none; players and clients left without cards are dropped.
+    The table itself is not changed, so next frame's detections are resolved
+    from scratch.
+    """
+    candidates = table_candidates(table, k)
+    assignment = solve(candidates)
+    player_cards = {cid: {p_idx: dict(cards) for p_idx, cards in players.items()}
+                    for cid, players in table.player_cards.items()}
+    flop_cards = dict(table.flop_cards)
+    for position, assigned in assignment.items():
+        if position[0] == "flop":
+            cards, key = flop_cards, position[1]
+        else:
+            _, cid, p_idx, key = position
+            cards = player_cards[cid][p_idx]
+        if assigned is None:
+            del cards[key]
+        elif assigned[0] != cards[key]['name']:
+            cards[key] = dict(cards[key], name=assigned[0], conf=assigned[1])
+    player_cards = {cid: {p: cards for p, cards in players.items() if cards}
+                    for cid, players in player_cards.items()}
+    player_cards = {cid: players for cid, players in player_cards.items() if players}
+    return player_cards, flop_cards, find_conflicts(candidates, assignment)
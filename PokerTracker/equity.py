@@ -0,0 +1,205 @@
+import itertools
+import math
+import multiprocessing
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+import cards
+import hand_eval
+
+STREETS = {0: "preflop", 3: "flop", 4: "turn", 5: "river"}
+
+
+def score_hands(boards, holes):
+    """Scores 7-card hands: boards (n, 5) and holes (n, p, 2) card indices -> (n, p) treys scores."""
+    n, p = holes.shape[:2]
+    hands = np.concatenate([np.broadcast_to(boards[:, None, :], (n, p, 5)), holes], axis=2)
+    return hand_eval.evaluate(hands.reshape(n * p, 7)).reshape(n, p)
+
+
+def tally(scores, n_known):
+    """Wins and ties per known player (the first ``n_known`` columns) over a batch of boards."""
+    is_best = scores == scores.min(axis=1, keepdims=True)
+    split = is_best.sum(axis=1, keepdims=True) > 1
+    wins = (is_best & ~split).sum(axis=0)[:n_known]
+    ties = (is_best & split).sum(axis=0)[:n_known]
+    return wins, ties
+
+
+def build_hands(board, known, deals, n_unknown):
+    """Completes ``board`` and deals unknown hole cards from ``deals`` (n, cards needed)."""
+    n, k = len(deals), 5 - len(board)
+    boards = np.empty((n, 5), dtype=np.int64)
+    boards[:, :len(board)] = board
+    boards[:, len(board):] = deals[:, :k]
+    holes = np.empty((n, len(known) + n_unknown, 2), dtype=np.int64)
+    holes[:, :len(known)] = known
+    holes[:, len(known):] = deals[:, k:].reshape(n, n_unknown, 2)
+    return boards, holes
+
+
+def sample_deals(rng, remaining, n, need):
+    """(n, need) random draws without replacement from ``remaining``, one row per sample."""
+    if need == 0:
+        return np.empty((n, 0), dtype=np.int64)
+    keys = rng.random((n, len(remaining)))
+    return remaining[np.argpartition(keys, need - 1, axis=1)[:, :need]]
+
+
+def simulate(board, known, n_unknown, n, seed):
+    """Monte Carlo over ``n`` random completions; returns (wins, ties, n). Runs in pool workers too."""
+    board = np.asarray(board, dtype=np.int64)
+    known = np.asarray(known, dtype=np.int64).reshape(-1, 2)
+    dead = set(board.tolist()) | set(known.ravel().tolist())
+    remaining = np.array([c for c in range(52) if c not in dead], dtype=np.int64)
+    deals = sample_deals(np.random.default_rng(seed), remaining, n, 5 - len(board) + 2 * n_unknown)
+    boards, holes = build_hands(board, known, deals, n_unknown)
+    wins, ties = tally(score_hands(boards, holes), len(known))
+    return wins, ties, n
+
+
+class _Run:
+    """Accumulated results for one card configuration, refined across frames."""
+
+    def __init__(self, board, known, n_unknown, exact_limit, seed):
+        self.board = np.array(board, dtype=np.int64)
+        self.known = np.array(known, dtype=np.int64).reshape(-1, 2)
+        self.n_unknown = n_unknown
+        self.wins = np.zeros(len(known), dtype=np.int64)
+        self.ties = np.zeros(len(known), dtype=np.int64)
+        self.n = 0
+        self.rng = np.random.default_rng(seed)
+
+        dead = set(board) | set(self.known.ravel().tolist())
+        self.remaining = np.array([c for c in range(52) if c not in dead], dtype=np.int64)
+        need = 5 - len(board)
+        self.combos = None
+        if n_unknown == 0 and math.comb(len(self.remaining), need) <= exact_limit:
+            combos = list(itertools.combinations(self.remaining.tolist(), need))
+            self.combos = np.array(combos, dtype=np.int64).reshape(len(combos), need)
+        self.exact = self.combos is not None
+
+    def add(self, wins, ties, n):
+        self.wins += wins
+        self.ties += ties
+        self.n += n
+
+    def done(self, max_samples):
+        return self.n >= (len(self.combos) if self.exact else max_samples)
+
+
+class EquityCalculator:
+    """Win/tie probabilities for every face-up hand on a partial (or empty) board.
+
+    Small spaces (turn, and flop up to ``exact_limit`` completions) are enumerated
+    exactly; everything else is Monte Carlo. Players whose hole cards are down
+    are dealt random cards in each sample. Work is spread over frames: each call
+    spends at most ``budget_ms`` adding samples to the running totals for the
+    current cards, until ``max_samples`` (or the full enumeration) is reached.
+    With ``workers`` > 1, fields of at least ``parallel_min_players`` run their
+    Monte Carlo chunks in a process pool, created on first use or by ``start``.
+    At most one pool batch is outstanding: a batch that misses the budget is
+    collected by a later call instead of being abandoned.
+    """
+
+    def __init__(self, budget_ms=20.0, max_samples=20000, exact_limit=2000, chunk=256,
+                 workers=0, parallel_min_players=6, cache_size=32, mp_context="spawn"):
+        self.budget = budget_ms / 1000.0
+        self.max_samples = max_samples
+        self.exact_limit = exact_limit
+        self.chunk = chunk
+        self.workers = workers
+        self.parallel_min_players = parallel_min_players
+        self.cache_size = cache_size
+        self.mp_context = mp_context
+        self._runs = OrderedDict()
+        self._pool = None
+        self._pending = None
+        self._seed = 0
+
+    def start(self):
+        """Creates the worker pool now, e.g. to fork it before the caller starts threads or loads CUDA."""
+        if self.workers > 1 and self._pool is None:
+            self._pool = multiprocessing.get_context(self.mp_context).Pool(self.workers)
+        return self
+
+    def _pool_for(self, n_players):
+        if self.workers <= 1 or n_players < self.parallel_min_players:
+            return None
+        return self.start()._pool
+
+    def _get_run(self, board, known, n_unknown):
+        key = (tuple(board), tuple(map(tuple, known)), n_unknown)
+        run = self._runs.get(key)
+        if run is None:
+            self._seed += 1
+            run = self._runs[key] = _Run(board, known, n_unknown, self.exact_limit, self._seed)
+            if len(self._runs) > self.cache_size:
+                self._runs.popitem(last=False)
+        self._runs.move_to_end(key)
+        return run
+
+    def _step(self, run, deadline):
+        if run.exact:
+            batch = run.combos[run.n:run.n + self.chunk]
+            boards, holes = build_hands(run.board, run.known, batch, 0)
+            run.add(*tally(score_hands(boards, holes), len(run.known)), len(batch))
+            return
+        pool = self._pool_for(len(run.known) + run.n_unknown)
+        if pool is None:
+            run.add(*simulate(run.board, run.known, run.n_unknown, self.chunk, run.rng.integers(1 << 31)))
+            return
+        if self._pending is None:
+            jobs = [(run.board, run.known, run.n_unknown, self.chunk, int(run.rng.integers(1 << 31)))
+                    for _ in range(self.workers)]
+            self._pending = (run, pool.starmap_async(simulate, jobs))
+        # The pending batch may belong to earlier cards; its samples still go to their run.
+        pending_run, batch = self._pending
+        batch.wait(max(deadline - time.perf_counter(), 0.001))
+        if not batch.ready():
+            return
+        self._pending = None
+        if batch.successful():
+            for result in batch.get():
+                pending_run.add(*result)
+
+    def compute(self, board_names, hands, n_unknown=0):
+        """``hands`` maps player key -> two card names. Returns {player key: {win, tie, samples, exact}}.
+
+        Returns {} when there is nothing to compare or the detected cards are inconsistent.
+        """
+        if not hands or len(hands) + n_unknown < 2 or len(board_names) > 5:
+            return {}
+        try:
+            board = [cards.card_index(c) for c in board_names]
+            keys = list(hands)
+            known = [[cards.card_index(c) for c in hands[k]] for k in keys]
+        except KeyError:
+            return {}
+        used = board + [c for hand in known for c in hand]
+        if len(set(used)) != len(used) or len(used) + 2 * n_unknown + (5 - len(board)) > 52:
+            return {}
+
+        run = self._get_run(board, known, n_unknown)
+        # At least one chunk per call so a tight budget still makes progress.
+        deadline = time.perf_counter() + self.budget
+        while not run.done(self.max_samples):
+            self._step(run, deadline)
+            if time.perf_counter() >= deadline:
+                break
+
+        if run.n == 0:
+            return {}
+        return {key: {"win": round(100.0 * float(run.wins[i]) / run.n, 1),
+                      "tie": round(100.0 * float(run.ties[i]) / run.n, 1),
+                      "samples": int(run.n),
+                      "exact": run.exact}
+                for i, key in enumerate(keys)}
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool = None
+            self._pending = None
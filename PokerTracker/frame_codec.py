@@ -0,0 +1,48 @@
+import json
+import struct
+import numpy as np
+import cv2
+
+# Binary frame layout:
+#   [4 byte big-endian header length][JSON header][crop 0 bytes][crop 1 bytes]...
+# The header carries the same fields as the JSON payload (client_id, slots, ...)
+# plus "sizes", the byte length of every JPEG crop in slot order.
+CONTENT_TYPE = "application/x-pokertracker-frame"
+HEADER_LEN = struct.Struct(">I")
+
+
+def encode_frame(header, buffers):
+    """Packs a header dict and a list of encoded JPEG buffers into one frame body."""
+    header = dict(header)
+    header["sizes"] = [len(b) for b in buffers]
+    head = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    return b"".join([HEADER_LEN.pack(len(head)), head, *buffers])
+
+
+def decode_frame(body):
+    """Splits a frame body into its header and per-crop uint8 views.
+
+    The views point straight into ``body``; nothing is copied until imdecode.
+    """
+    if len(body) < HEADER_LEN.size:
+        raise ValueError("Frame too short for header")
+    (head_len,) = HEADER_LEN.unpack_from(body, 0)
+    offset = HEADER_LEN.size + head_len
+    if offset > len(body):
+        raise ValueError("Frame header length exceeds body")
+    header = json.loads(bytes(body[HEADER_LEN.size:offset]))
+
+    sizes = header.get("sizes", [])
+    if offset + sum(sizes) > len(body):
+        raise ValueError("Frame crop sizes exceed body")
+
+    views = []
+    for size in sizes:
+        views.append(np.frombuffer(body, dtype=np.uint8, count=size, offset=offset))
+        offset += size
+    return header, views
+
+
+def decode_crops(views):
+    """Decodes JPEG views into BGR images; empty views (unchanged slots) decode to None."""
+    return [cv2.imdecode(v, cv2.IMREAD_COLOR) if len(v) else None for v in views]
@@ -0,0 +1,202 @@
+import json
+import socket
+import socketserver
+import struct
+import threading
+import time
+
+import frame_codec
+
+# Long-lived TCP channel between client.py and server.py.
+# Every message in either direction is [4 byte big-endian length][payload].
+# Client -> server payloads are frame_codec bodies whose header carries a
+# "frame_id"; server -> client payloads are the JSON detection response
+# tagged with the same "frame_id", sent back in arrival order.
+MSG_LEN = struct.Struct(">I")
+MAX_MESSAGE_BYTES = 64 * 1024 * 1024
+REPLY_TIMEOUT_SECONDS = 5.0
+
+
+def _recv_exact(sock, n):
+    buf = bytearray(n)
+    view = memoryview(buf)
+    got = 0
+    while got < n:
+        chunk = sock.recv_into(view[got:], n - got)
+        if chunk == 0:
+            raise ConnectionError("Connection closed")
+        got += chunk
+    return buf
+
+
+def recv_message(sock):
+    (length,) = MSG_LEN.unpack(_recv_exact(sock, MSG_LEN.size))
+    if length > MAX_MESSAGE_BYTES:
+        raise ConnectionError(f"Message of {length} bytes exceeds limit")
+    return _recv_exact(sock, length)
+
+
+def send_message(sock, payload):
+    sock.sendall(MSG_LEN.pack(len(payload)) + payload)
+
+
+def frame_id_of(body):
+    """The header's "frame_id" of a frame_codec body, or None if the header can't be read."""
+    try:
+        (head_len,) = frame_codec.HEADER_LEN.unpack_from(body, 0)
+        header = json.loads(bytes(body[frame_codec.HEADER_LEN.size:frame_codec.HEADER_LEN.size + head_len]))
+        return header.get("frame_id")
+    except (struct.error, ValueError, AttributeError):
+        return None
+
+
+def serve(handle_body, port, host=""):
+    """Serves the frame stream forever. ``handle_body(body)`` returns a JSON-able dict.
+
+    Every reply, errors included, carries the frame's "frame_id" so the
+    client can free its in-flight slot.
+    """
+
+    class Handler(socketserver.BaseRequestHandler):
+        def handle(self):
+            self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            while True:
+                try:
+                    body = recv_message(self.request)
+                except ConnectionError:
+                    return
+                frame_id = frame_id_of(body)
+                try:
+                    response = handle_body(body)
+                except Exception as e:
+                    response = {"status": "error", "error": str(e)}
+                if isinstance(response, dict) and frame_id is not None:
+                    response.setdefault("frame_id", frame_id)
+                send_message(self.request, json.dumps(response).encode("utf-8"))
+
+    socketserver.ThreadingTCPServer.allow_reuse_address = True
+    socketserver.ThreadingTCPServer.daemon_threads = True
+    with socketserver.ThreadingTCPServer((host, port), Handler) as server:
+        server.serve_forever()
+
+
+class FrameStreamClient:
+    """Keeps up to ``max_inflight`` frames outstanding on one persistent connection.
+
+    ``submit`` never blocks the capture loop: it returns False when the window
+    is full or the server is unreachable. Responses arrive on a reader thread
+    and the newest one is available from ``latest()``. A frame with no reply
+    after ``reply_timeout`` seconds is given up on so it stops holding a slot.
+    """
+
+    def __init__(self, host, port, max_inflight=2, reconnect_delay=1.0, reply_timeout=REPLY_TIMEOUT_SECONDS):
+        self.host, self.port = host, port
+        self.max_inflight = max_inflight
+        self.reconnect_delay = reconnect_delay
+        self.reply_timeout = reply_timeout
+        self._lock = threading.Lock()
+        self._room = threading.Condition(self._lock)
+        self._sock = None
+        self._sent_at = {}
+        self._latest = None
+        self._last_attempt = 0.0
+        self.last_rtt = None
+
+    def _connect(self):
+        now = time.time()
+        if now - self._last_attempt < self.reconnect_delay:
+            return False
+        self._last_attempt = now
+        try:
+            sock = socket.create_connection((self.host, self.port), timeout=self.reconnect_delay)
+        except OSError:
+            return False
+        sock.settimeout(None)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._sock = sock
+        self._sent_at = {}
+        threading.Thread(target=self._reader, args=(sock,), daemon=True).start()
+        return True
+
+    def _reader(self, sock):
+        while True:
+            try:
+                response = json.loads(recv_message(sock))
+            except (ConnectionError, OSError, ValueError):
+                break
+            frame_id = response.get("frame_id")
+            with self._lock:
+                sent = self._sent_at.pop(frame_id, None)
+                if sent is not None:
+                    self.last_rtt = time.time() - sent
+                    self._room.notify_all()
+                if self._latest is None or (frame_id or 0) >= (self._latest.get("frame_id") or 0):
+                    self._latest = response
+        self._drop(sock)
+
+    def _drop(self, sock):
+        with self._lock:
+            if self._sock is sock:
+                self._sock = None
+                self._sent_at = {}
+                self._room.notify_all()
+        try:
+            sock.close()
+        except OSError:
+            pass
+
+    def _expire(self):
+        """Forgets frames sent more than ``reply_timeout`` ago. Call with the lock held."""
+        cutoff = time.time() - self.reply_timeout
+        stale = [frame_id for frame_id, sent in self._sent_at.items() if sent < cutoff]
+        for frame_id in stale:
+            del self._sent_at[frame_id]
+        if stale:
+            self._room.notify_all()
+
+    def _has_room(self):
+        self._expire()
+        return self._sock is not None and len(self._sent_at) < self.max_inflight
+
+    def submit(self, frame_id, body):
+        with self._lock:
+            if self._sock is None and not self._connect():
+                return False
+            self._expire()
+            if len(self._sent_at) >= self.max_inflight:
+                return False
+            sock = self._sock
+            self._sent_at[frame_id] = time.time()
+        try:
+            send_message(sock, body)
+        except OSError:
+            self._drop(sock)
+            return False
+        return True
+
+    def wait_for_room(self, timeout):
+        """Blocks until a submit could go out (connected, window not full) or ``timeout`` passes."""
+        deadline = time.time() + timeout
+        with self._room:
+            while not self._has_room():
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return False
+                # Wake up by the reply timeout at the latest, so expired frames free the window.
+                self._room.wait(min(remaining, self.reply_timeout))
+            return True
+
+    def latest(self):
+        with self._lock:
+            return self._latest
+
+    def inflight(self):
+        with self._lock:
+            self._expire()
+            return len(self._sent_at)
+
+    def close(self):
+        with self._lock:
+            sock = self._sock
+        if sock is not None:
+            self._drop(sock)
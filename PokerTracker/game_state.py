@@ -0,0 +1,132 @@
+import copy
+import json
+import os
+import stat
+import tempfile
+import threading
+import time
+
+DATA_DIR = "PokerTracker/data"
+SNAPSHOT_FILES = {
+    "player_cards": f"{DATA_DIR}/player_cards.json",
+    "flop_cards": f"{DATA_DIR}/flop_cards.json",
+    "winner": f"{DATA_DIR}/winner.json",
+}
+
+
+def write_json_atomic(path, data, indent=4):
+    """Writes JSON to a temp file in the same directory and renames it over ``path``.
+
+    Readers polling the file see either the old or the new document, never a torn one.
+    The file keeps its permissions, or gets 0644 when new (mkstemp creates 0600).
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp_", suffix=".json")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=indent)
+        try:
+            mode = stat.S_IMODE(os.stat(path).st_mode)
+        except FileNotFoundError:
+            mode = 0o644
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class GameStateStore:
+    """Thread-safe, versioned holder of the live game state.
+
+    The state is a dict of sections (``player_cards``, ``flop_cards``, ``winner``, ...).
+    ``update`` stores deep copies and bumps the version once per call, so a
+    snapshot handed out by ``snapshot`` is never mutated afterwards and can be
+    read without holding the lock.
+    """
+
+    def __init__(self, **sections):
+        self._cond = threading.Condition()
+        self.version = 0
+        self._state = {name: copy.deepcopy(value) for name, value in sections.items()}
+        self._section_versions = {name: 0 for name in sections}
+
+    def update(self, **sections):
+        copies = {name: copy.deepcopy(value) for name, value in sections.items()}
+        with self._cond:
+            self.version += 1
+            state = dict(self._state)
+            state.update(copies)
+            self._state = state
+            for name in copies:
+                self._section_versions[name] = self.version
+            self._cond.notify_all()
+            return self.version
+
+    def snapshot(self):
+        """Returns (version, state). Treat the state as read-only."""
+        with self._cond:
+            return self.version, self._state
+
+    def get(self, name, default=None):
+        with self._cond:
+            return self._state.get(name, default)
+
+    def section_versions(self):
+        with self._cond:
+            return dict(self._section_versions)
+
+    def wait_for_change(self, version, timeout=None):
+        """Blocks until the version moves past ``version`` (or timeout); returns snapshot()."""
+        with self._cond:
+            self._cond.wait_for(lambda: self.version != version, timeout)
+            return self.version, self._state
+
+
+class SnapshotWriter:
+    """Background thread that mirrors store sections to JSON files.
+
+    Writes happen at most once per ``interval`` seconds and only for sections
+    whose version changed, each one atomically (see write_json_atomic).
+    ``on_flush(ms)`` is called after every flush that wrote at least one file.
+    """
+
+    def __init__(self, store, files=SNAPSHOT_FILES, interval=0.2, on_flush=None):
+        self.store = store
+        self.files = dict(files)
+        self.interval = interval
+        self.on_flush = on_flush
+        self._written = {}
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def flush(self):
+        """Writes every section that changed since the last flush; returns how many were written."""
+        # Versions are read before the state, so a racing update can only cause
+        # an extra rewrite later, never a skipped one.
+        versions = self.store.section_versions()
+        _, state = self.store.snapshot()
+        start = time.perf_counter()
+        written = 0
+        for name, path in self.files.items():
+            if name in state and versions.get(name) != self._written.get(name):
+                write_json_atomic(path, state[name])
+                self._written[name] = versions.get(name)
+                written += 1
+        if written and self.on_flush is not None:
+            self.on_flush((time.perf_counter() - start) * 1000)
+        return written
+
+    def _run(self):
+        version = None
+        while True:
+            version, _ = self.store.wait_for_change(version)
+            try:
+                self.flush()
+            except OSError as e:
+                print(f"Snapshot write failed: {e}")
+            time.sleep(self.interval)
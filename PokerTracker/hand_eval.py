@@ -0,0 +1,86 @@
+import itertools
+import math
+import os
+import threading
+
+import numpy as np
+from treys.lookup import LookupTable
+
+# Batched poker hand evaluator backed by a precomputed table of every 5-card
+# hand. Scores are identical to treys (1 = royal flush ... 7462 = worst high
+# card). A 6 or 7 card hand scores the minimum over its 5-card subsets, exactly
+# as treys does, but for whole batches in a handful of NumPy gathers.
+#
+# Cards are cards.py indices (rank * 4 + suit). A sorted 5-card hand
+# c0 < c1 < ... < c4 is stored at its colex rank sum(C(c_i, i + 1)).
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "hand_ranks_5.npy")
+N_FIVE_CARD_HANDS = math.comb(52, 5)
+PRIMES = np.array([2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41], dtype=np.int64)
+BINOM = np.array([[math.comb(n, k) for k in range(6)] for n in range(52)], dtype=np.int64)
+SUBSETS = {k: np.array(list(itertools.combinations(range(k), 5))) for k in (5, 6, 7)}
+
+_table = None
+_table_lock = threading.Lock()
+
+
+def colex_index(hands):
+    """Sorted (n, 5) card indices -> (n,) table positions."""
+    return sum(BINOM[hands[:, i], i + 1] for i in range(5))
+
+
+def build_table():
+    """Scores all C(52, 5) hands with treys' own rank tables; returns a uint16 array."""
+    lookup = LookupTable()
+    hands = np.fromiter(itertools.chain.from_iterable(itertools.combinations(range(52), 5)),
+                        dtype=np.int8, count=5 * N_FIVE_CARD_HANDS).reshape(-1, 5).astype(np.int64)
+    ranks, suits = hands // 4, hands % 4
+    primes = PRIMES[ranks].prod(axis=1)
+    flush = (suits == suits[:, :1]).all(axis=1)
+
+    scores = np.empty(len(hands), dtype=np.uint16)
+    for is_flush, table in ((True, lookup.flush_lookup), (False, lookup.unsuited_lookup)):
+        keys = np.array(sorted(table), dtype=np.int64)
+        values = np.array([table[k] for k in keys], dtype=np.uint16)
+        mask = flush == is_flush
+        scores[mask] = values[np.searchsorted(keys, primes[mask])]
+
+    out = np.empty(N_FIVE_CARD_HANDS, dtype=np.uint16)
+    out[colex_index(hands)] = scores
+    return out
+
+
+def generate_table(path=TABLE_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp.npy"
+    np.save(tmp_path, build_table())
+    os.replace(tmp_path, path)
+
+
+def load_table(path=TABLE_PATH):
+    """Memory-maps the rank table, generating it on first use."""
+    global _table
+    with _table_lock:
+        if _table is None:
+            if not os.path.exists(path):
+                generate_table(path)
+            _table = np.load(path, mmap_mode="r")
+        return _table
+
+
+def evaluate(hands):
+    """Scores a batch of hands: (n, k) card indices with 5 <= k <= 7 -> (n,) int32 treys scores."""
+    hands = np.sort(np.asarray(hands, dtype=np.int64), axis=1)
+    k = hands.shape[1]
+    if k not in SUBSETS:
+        raise ValueError(f"Can only evaluate 5 to 7 card hands, got {k}")
+    table = load_table()
+    best = None
+    for subset in SUBSETS[k]:
+        scores = table[colex_index(hands[:, subset])]
+        best = scores if best is None else np.minimum(best, scores)
+    return best.astype(np.int32)
+
+
+if __name__ == "__main__":
+    generate_table()
+    print(f"Wrote {N_FIVE_CARD_HANDS} hand ranks to {TABLE_PATH}")
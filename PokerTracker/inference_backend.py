@@ -0,0 +1,160 @@
+import os
+import time
+
+import numpy as np
+
+# One interface over the ways we can run the YOLO models:
+#   torch     ultralytics + PyTorch on cuda/mps/cpu (the original path)
+#   onnx      exported ONNX run by onnxruntime on CPU, optionally INT8-quantized
+#   openvino  exported OpenVINO IR on Intel CPUs
+#   stub      no model; returns no boxes after an optional fixed delay
+# Heavy imports happen only when a backend is loaded, so a CPU node needs
+# neither CUDA nor the exporters it does not use.
+BACKENDS = ("auto", "torch", "onnx", "openvino", "stub")
+EMPTY_BOXES = np.zeros((0, 6), dtype=np.float32)
+
+
+def select_device(requested="auto"):
+    """'auto' -> cuda, then mps, then cpu, whichever torch can use."""
+    if requested != "auto":
+        return requested
+    try:
+        import torch
+    except ImportError:
+        return "cpu"
+    if torch.cuda.is_available():
+        return "cuda"
+    mps = getattr(torch.backends, "mps", None)
+    if mps is not None and mps.is_available():
+        return "mps"
+    return "cpu"
+
+
+def select_backend(requested="auto", device="cpu"):
+    """'auto' -> torch on a GPU, ONNX Runtime on CPU when it is installed, else torch."""
+    if requested != "auto":
+        return requested
+    if device != "cpu":
+        return "torch"
+    try:
+        import onnxruntime  # noqa: F401
+    except ImportError:
+        return "torch"
+    return "onnx"
+
+
+def export_onnx(weights, imgsz=640, int8=False):
+    """Exports ``weights`` to ONNX next to the .pt file (once) and returns the path.
+
+    With ``int8`` the model is also dynamically quantized to ``<name>.int8.onnx``.
+    """
+    base = os.path.splitext(weights)[0]
+    onnx_path = base + ".onnx"
+    if not os.path.exists(onnx_path):
+        from ultralytics import YOLO
+        onnx_path = YOLO(weights).export(format="onnx", imgsz=imgsz, dynamic=True, simplify=True)
+    if not int8:
+        return onnx_path
+    int8_path = base + ".int8.onnx"
+    if not os.path.exists(int8_path):
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        quantize_dynamic(onnx_path, int8_path, weight_type=QuantType.QUInt8)
+    return int8_path
+
+
+def export_openvino(weights, imgsz=640, int8=False):
+    """Exports ``weights`` to an OpenVINO model directory (once) and returns its path."""
+    path = os.path.splitext(weights)[0] + ("_int8" if int8 else "") + "_openvino_model"
+    if not os.path.exists(path):
+        from ultralytics import YOLO
+        path = YOLO(weights).export(format="openvino", imgsz=imgsz, int8=int8)
+    return path
+
+
+class YoloDetector:
+    """A YOLO model behind ``predict(images, conf, imgsz) -> [(n, 6) boxes per image]``.
+
+    Boxes are float32 rows of [x1, y1, x2, y2, conf, cls] in image pixels, the
+    same layout as ``result.boxes.data`` in ultralytics, whatever the backend.
+    """
+
+    def __init__(self, weights, backend="auto", device="auto", int8=False, imgsz=640):
+        from ultralytics import YOLO
+
+        self.device = select_device(device)
+        self.backend = select_backend(backend, self.device)
+        self.imgsz = imgsz
+        if self.backend == "torch":
+            self.model = YOLO(weights)
+            self.model.to(self.device)
+        elif self.backend == "onnx":
+            self.device = "cpu"
+            self.model = YOLO(export_onnx(weights, imgsz, int8), task="detect")
+        elif self.backend == "openvino":
+            self.device = "cpu"
+            self.model = YOLO(export_openvino(weights, imgsz, int8), task="detect")
+        else:
+            raise ValueError(f"Unknown inference backend: {self.backend}")
+        self.names = self.model.names
+
+    def predict(self, images, conf=0.25, imgsz=None):
+        if not images:
+            return []
+        results = self.model(images, conf=conf, imgsz=imgsz or self.imgsz, device=self.device, verbose=False)
+        return [r.boxes.data.cpu().numpy() for r in results]
+
+    def warmup(self, runs=2, batch=1):
+        """Runs a few dummy batches so the first real frame does not pay for lazy init."""
+        dummy = [np.full((self.imgsz, self.imgsz, 3), 114, dtype=np.uint8)] * batch
+        for _ in range(runs):
+            self.predict(dummy)
+        return self
+
+
+class StubDetector:
+    """Stands in for a model in tests and load benchmarks: fixed latency, no boxes.
+
+    With ``fake_cards`` every image gets one full-image box whose class is derived
+    from its pixels, so the game state, winner evaluation and dashboard see
+    changing cards without a model.
+    """
+
+    backend = device = "stub"
+    names = {}
+
+    def __init__(self, latency_ms=0.0, per_image_ms=0.0, fake_cards=False):
+        self.latency = latency_ms / 1000.0
+        self.per_image = per_image_ms / 1000.0
+        self.fake_cards = fake_cards
+
+    def predict(self, images, conf=0.25, imgsz=None):
+        if self.latency or self.per_image:
+            time.sleep(self.latency + self.per_image * len(images))
+        if self.fake_cards:
+            return [self._fake_card(img) for img in images]
+        return [EMPTY_BOXES for _ in images]
+
+    @staticmethod
+    def _fake_card(img):
+        h, w = img.shape[:2]
+        cls = int(img[::8, ::8].mean()) * 7 % 52
+        return np.array([[0, 0, w, h, 0.9, cls]], dtype=np.float32)
+
+    def warmup(self, runs=2, batch=1):
+        return self
+
+
+def load_detector(weights, backend="auto", device="auto", int8=False, imgsz=640, warmup=True, stub_ms=0.0,
+                  stub_cards=False):
+    """Builds the detector for ``weights`` on the chosen backend and warms it up.
+
+    ``stub_ms`` is the simulated per-image cost of the stub backend and
+    ``stub_cards`` makes it report fake cards (see StubDetector).
+    """
+    if backend == "stub":
+        return StubDetector(per_image_ms=stub_ms, fake_cards=stub_cards)
+    detector = YoloDetector(weights, backend, device, int8, imgsz)
+    print(f"Loaded {os.path.basename(weights)} on {detector.backend}/{detector.device}"
+          f"{' (int8)' if int8 and detector.backend != 'torch' else ''}")
+    return detector.warmup() if warmup else detector
+
@@ -0,0 +1,126 @@
+import copy
+import threading
+import time
+from collections import deque
+
+from metrics import Histogram
+
+BATCH_SIZE_BUCKETS = [1, 2, 4, 8, 16, 32, 64, 128]
+QUEUE_WAIT_MS_BUCKETS = [0.5, 1, 2, 5, 10, 20, 50, 100, 250, 1000]
+
+
+class _Job:
+    __slots__ = ("items", "enqueued", "done", "results", "error")
+
+    def __init__(self, items):
+        self.items = items
+        self.enqueued = time.perf_counter()
+        self.done = threading.Event()
+        self.results = None
+        self.error = None
+
+
+class InferenceScheduler:
+    """Collects crops from every client into one queue and runs them as shared batches.
+
+    ``run_batch(items)`` is called on a runner thread with the concatenated items
+    of one or more requests and must return one result per item. A batch is
+    dispatched when it holds ``max_batch`` items or the oldest request has waited
+    ``max_wait_ms``. Requests are never split across batches, so a single request
+    larger than ``max_batch`` runs as its own batch.
+    """
+
+    def __init__(self, run_batch, max_batch=32, max_wait_ms=5.0, num_runners=1):
+        self.run_batch = run_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._stats_lock = threading.Lock()
+        self.batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+        self.queue_wait_ms = Histogram(QUEUE_WAIT_MS_BUCKETS)
+        for _ in range(num_runners):
+            threading.Thread(target=self._runner, daemon=True).start()
+
+    def submit(self, items):
+        """Blocks until every item has been inferred and returns their results in order."""
+        return self.submit_async(items)()
+
+    def submit_async(self, items):
+        """Queues ``items`` and returns a function that blocks for their results.
+
+        Lets a request wait on two schedulers (e.g. cards and chips) at once.
+        """
+        if not items:
+            return lambda: []
+        job = _Job(list(items))
+        with self._cond:
+            self._queue.append(job)
+            self._cond.notify()
+
+        def result():
+            job.done.wait()
+            if job.error is not None:
+                raise job.error
+            return job.results
+        return result
+
+    def _next_batch(self):
+        with self._cond:
+            while not self._queue:
+                self._cond.wait()
+            batch = [self._queue.popleft()]
+            size = len(batch[0].items)
+            deadline = batch[0].enqueued + self.max_wait
+            while size < self.max_batch:
+                if self._queue:
+                    if size + len(self._queue[0].items) > self.max_batch:
+                        break
+                    job = self._queue.popleft()
+                    batch.append(job)
+                    size += len(job.items)
+                    continue
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            return batch, size
+
+    def _runner(self):
+        while True:
+            batch, size = self._next_batch()
+            started = time.perf_counter()
+            with self._stats_lock:
+                self.batch_sizes.observe(size)
+                for job in batch:
+                    self.queue_wait_ms.observe((started - job.enqueued) * 1000)
+
+            items = [item for job in batch for item in job.items]
+            try:
+                results = self.run_batch(items)
+            except Exception as e:
+                for job in batch:
+                    job.error = e
+                    job.done.set()
+                continue
+
+            offset = 0
+            for job in batch:
+                job.results = results[offset:offset + len(job.items)]
+                offset += len(job.items)
+                job.done.set()
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                "batch_size": self.batch_sizes.to_dict(),
+                "queue_wait_ms": self.queue_wait_ms.to_dict(),
+            }
+
+    def prometheus_histograms(self):
+        """(name, help, histogram) for metrics.StageMetrics.prometheus; histograms are copies."""
+        with self._stats_lock:
+            return [("pokertracker_batch_size", "Crops per shared inference batch.",
+                     copy.deepcopy(self.batch_sizes)),
+                    ("pokertracker_queue_wait_ms", "Time a request waited for its inference batch in milliseconds.",
+                     copy.deepcopy(self.queue_wait_ms))]
@@ -0,0 +1,132 @@
+import multiprocessing
+import queue
+import time
+
+import cascade
+import inference_backend
+import mosaic
+
+FACE_WEIGHTS = "PokerTracker/models/yolov8s_playing_cards.pt"
+BACK_WEIGHTS = "PokerTracker/backCard/runs/detect/train6/weights/best.pt"
+
+
+class CardModels:
+    """The card-face and card-back detectors behind one ``run_batch(items)`` callable.
+
+    ``items`` are (crop, back_first) pairs as taken by cascade.run_cascade. With
+    ``mosaic_size`` set, each model call packs its crops into shared canvases.
+    After each call ``last_timings`` holds the milliseconds spent in each model.
+    """
+
+    def __init__(self, backend="auto", device="auto", int8=False, face_conf=0.4, back_conf=0.8,
+                 mosaic_size=0, stub_ms=0.0, stub_cards=False, face_weights=FACE_WEIGHTS, back_weights=BACK_WEIGHTS):
+        self.face = inference_backend.load_detector(face_weights, backend, device, int8, stub_ms=stub_ms,
+                                                    stub_cards=stub_cards)
+        self.back = inference_backend.load_detector(back_weights, backend, device, int8, stub_ms=stub_ms)
+        self.face_conf, self.back_conf = face_conf, back_conf
+        self.mosaic_size = mosaic_size
+        self.last_timings = {}
+
+    def _run(self, stage, detector, conf, crops):
+        start = time.perf_counter()
+        if self.mosaic_size:
+            boxes = mosaic.detect(crops, lambda canvases: detector.predict(
+                canvases, conf=conf, imgsz=self.mosaic_size), self.mosaic_size)
+        else:
+            boxes = detector.predict(crops, conf=conf)
+        self.last_timings[stage] = self.last_timings.get(stage, 0.0) + (time.perf_counter() - start) * 1000
+        return boxes
+
+    def run_face(self, crops):
+        return self._run("face_model", self.face, self.face_conf, crops)
+
+    def run_back(self, crops):
+        return self._run("back_model", self.back, self.back_conf, crops)
+
+    def __call__(self, items):
+        self.last_timings = {}
+        return cascade.run_cascade(items, self.run_face, self.run_back)
+
+
+def _worker_main(conn, factory, kwargs):
+    try:
+        run_batch = factory(**kwargs)
+    except Exception as e:
+        conn.send(("error", repr(e)))
+        return
+    conn.send(("ready", None))
+    while True:
+        try:
+            items = conn.recv()
+        except (EOFError, OSError):
+            return
+        try:
+            results = run_batch(items)
+            conn.send(("ok", (results, getattr(run_batch, "last_timings", None))))
+        except Exception as e:
+            conn.send(("error", repr(e)))
+
+
+class WorkerPool:
+    """``n`` processes that each build their own models with ``factory(**kwargs)``.
+
+    ``run_batch`` hands a batch to an idle worker and blocks for its results, so
+    an InferenceScheduler with ``num_runners=n`` keeps every worker busy. Workers
+    are forked: create the pool before the parent loads models or starts threads.
+    A worker that dies is dropped from the rotation. When the runner records
+    ``last_timings`` (as CardModels does), ``on_timings`` receives them after each batch.
+    """
+
+    def __init__(self, n, factory, context="fork", on_timings=None, **kwargs):
+        ctx = multiprocessing.get_context(context)
+        self.on_timings = on_timings
+        self._idle = queue.Queue()
+        self._processes = []
+        self._conns = []
+        for i in range(n):
+            parent, child = ctx.Pipe()
+            process = ctx.Process(target=_worker_main, args=(child, factory, kwargs),
+                                  name=f"inference-worker-{i}", daemon=True)
+            process.start()
+            child.close()
+            self._processes.append(process)
+            self._conns.append(parent)
+
+    def wait_ready(self, timeout=None):
+        """Blocks until every worker has loaded its models; raises if one failed."""
+        for i, conn in enumerate(self._conns):
+            if timeout is not None and not conn.poll(timeout):
+                raise TimeoutError(f"Inference worker {i} not ready after {timeout}s")
+            status, error = conn.recv()
+            if status != "ready":
+                raise RuntimeError(f"Inference worker {i} failed to start: {error}")
+            self._idle.put(conn)
+        return self
+
+    def alive(self):
+        return sum(p.is_alive() for p in self._processes)
+
+    def run_batch(self, items):
+        if not self.alive():
+            raise RuntimeError("No inference workers left")
+        conn = self._idle.get()
+        try:
+            conn.send(items)
+            status, result = conn.recv()
+        except (EOFError, OSError) as e:
+            raise RuntimeError(f"Inference worker died: {e}")
+        self._idle.put(conn)
+        if status != "ok":
+            raise RuntimeError(f"Inference worker error: {result}")
+        results, timings = result
+        if timings and self.on_timings is not None:
+            self.on_timings(timings)
+        return results
+
+    def close(self):
+        for conn in self._conns:
+            conn.close()
+        for process in self._processes:
+            process.join(timeout=1.0)
+            if process.is_alive():
+                process.terminate()
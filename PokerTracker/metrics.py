@@ -0,0 +1,147 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+from pipeline import StageTimer
+
+LATENCY_MS_BUCKETS = [0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500]
+STAGE_METRIC = "pokertracker_stage_latency_ms"
+# Work that is not done for any one client (shared inference batches, snapshot writes).
+SHARED = "shared"
+# Clients beyond MAX_CLIENTS live ones are counted under this label instead of their own.
+OTHER = "other"
+MAX_CLIENTS = 32
+# A client that reports nothing for this long loses its histograms (client.py picks
+# a new random id on every run, so ids of restarted clients never come back).
+CLIENT_TIMEOUT_SECONDS = 600.0
+
+
+class Histogram:
+    """Fixed-bucket histogram; counts[i] holds values <= buckets[i], the last slot is +Inf."""
+
+    def __init__(self, buckets):
+        self.buckets = list(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.total = 0.0
+        self.n = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.n += 1
+
+    def to_dict(self):
+        labels = [str(b) for b in self.buckets] + ["+Inf"]
+        return {
+            "buckets": dict(zip(labels, self.counts)),
+            "count": self.n,
+            "mean": self.total / self.n if self.n else 0.0,
+        }
+
+    def prometheus(self, name, **labels):
+        """Exposition lines for this histogram: cumulative ``_bucket`` series, ``_sum`` and ``_count``."""
+        lines, running = [], 0
+        for le, count in zip([str(b) for b in self.buckets] + ["+Inf"], self.counts):
+            running += count
+            lines.append(f"{name}_bucket{format_labels(labels, le=le)} {running}")
+        lines.append(f"{name}_sum{format_labels(labels)} {self.total}")
+        lines.append(f"{name}_count{format_labels(labels)} {self.n}")
+        return lines
+
+
+def format_labels(labels, **extra):
+    labels = dict(labels, **extra)
+    if not labels:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for v in labels.values())
+    return "{" + ",".join(f'{k}="{v}"' for k, v in zip(labels, escaped)) + "}"
+
+
+class StageMetrics:
+    """Latency histograms per (stage, client) plus a rolling per-stage summary.
+
+    The histograms are cumulative since startup and exported in Prometheus text
+    format; the summary covers the last ``window`` samples of each stage across
+    all clients and is meant for the dashboard and verbose logs.
+
+    The client label is bounded: clients not seen for ``client_timeout``
+    seconds are dropped, and while ``max_clients`` others are live a new
+    client is recorded as OTHER.
+    """
+
+    def __init__(self, buckets=LATENCY_MS_BUCKETS, window=500, max_clients=MAX_CLIENTS,
+                 client_timeout=CLIENT_TIMEOUT_SECONDS, clock=time.monotonic):
+        self.buckets = list(buckets)
+        self.max_clients = max_clients
+        self.client_timeout = client_timeout
+        self.clock = clock
+        self._histograms = {}
+        self._last_seen = {}
+        self._lock = threading.Lock()
+        self._rolling = StageTimer(window)
+
+    def _client_label(self, client_id, now):
+        """The label to record ``client_id`` under. Call with the lock held."""
+        if client_id in (SHARED, OTHER):
+            return client_id
+        if client_id not in self._last_seen:
+            self._expire(now)
+            if len(self._last_seen) >= self.max_clients:
+                return OTHER
+        self._last_seen[client_id] = now
+        return client_id
+
+    def _expire(self, now):
+        """Drops the histograms of clients not seen within the timeout. Call with the lock held."""
+        stale = {c for c, seen in self._last_seen.items() if now - seen > self.client_timeout}
+        if stale:
+            for client_id in stale:
+                del self._last_seen[client_id]
+            self._histograms = {key: h for key, h in self._histograms.items() if key[1] not in stale}
+
+    def observe(self, stage, client_id, ms):
+        with self._lock:
+            key = (stage, self._client_label(str(client_id), self.clock()))
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.buckets)
+            histogram.observe(ms)
+        self._rolling.record(stage, ms / 1000.0)
+
+    @contextmanager
+    def time(self, stage, client_id):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, client_id, (time.perf_counter() - start) * 1000)
+
+    def observe_many(self, timings, client_id=SHARED):
+        """Records a {stage: ms} dict, e.g. the model timings of one inference batch."""
+        for stage, ms in (timings or {}).items():
+            self.observe(stage, client_id, ms)
+
+    def prometheus(self, extra=()):
+        """The whole registry in Prometheus text format.
+
+        ``extra`` is an iterable of (name, help, histogram) for other histograms to
+        export alongside the stage latencies (e.g. the scheduler's).
+        """
+        lines = [f"# HELP {STAGE_METRIC} Server processing time per stage and client in milliseconds.",
+                 f"# TYPE {STAGE_METRIC} histogram"]
+        with self._lock:
+            self._expire(self.clock())
+            for (stage, client_id), histogram in sorted(self._histograms.items()):
+                lines.extend(histogram.prometheus(STAGE_METRIC, stage=stage, client=client_id))
+        for name, help_text, histogram in extra:
+            lines.extend([f"# HELP {name} {help_text}", f"# TYPE {name} histogram"])
+            lines.extend(histogram.prometheus(name))
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        """{stage: {"mean": ms, "p95": ms, "count": n}} over the rolling window."""
+        return {stage: {k: round(v, 2) for k, v in s.items()} for stage, s in self._rolling.summary().items()}
+
+    def format(self):
+        return self._rolling.format()
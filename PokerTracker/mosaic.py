@@ -0,0 +1,90 @@
+import cv2
+import numpy as np
+
+# Packs many small crops into a few square canvases so the detector runs once per
+# canvas instead of once per crop. Gaps are filled with YOLO's letterbox grey.
+FILL_VALUE = 114
+EMPTY_BOXES = np.zeros((0, 6), dtype=np.float32)
+
+
+class Placement:
+    __slots__ = ("canvas", "x", "y", "w", "h", "scale")
+
+    def __init__(self, canvas, x, y, w, h, scale):
+        self.canvas, self.x, self.y, self.w, self.h, self.scale = canvas, x, y, w, h, scale
+
+
+def shelf_pack(sizes, canvas_size=640, gap=4):
+    """Shelf-packs (w, h) sizes into square canvases, tallest first.
+
+    Each crop goes on the first shelf with room, else a new shelf, else a new
+    canvas. Crops bigger than a canvas are scaled down to fit. Returns
+    (placements in input order, number of canvases).
+    """
+    placements = [None] * len(sizes)
+    canvases = []  # per canvas: list of shelves [y, height, next_x]
+    order = sorted(range(len(sizes)), key=lambda i: sizes[i][1], reverse=True)
+    for i in order:
+        w, h = sizes[i]
+        scale = min(1.0, canvas_size / max(w, h, 1))
+        w, h = max(1, int(w * scale)), max(1, int(h * scale))
+        placed = None
+        for c, shelves in enumerate(canvases):
+            for shelf in shelves:
+                if h <= shelf[1] and shelf[2] + w <= canvas_size:
+                    placed = (c, shelf[2], shelf[0])
+                    shelf[2] += w + gap
+                    break
+            if placed is None:
+                top = shelves[-1][0] + shelves[-1][1] + gap if shelves else 0
+                if top + h <= canvas_size:
+                    shelves.append([top, h, w + gap])
+                    placed = (c, 0, top)
+            if placed is not None:
+                break
+        if placed is None:
+            canvases.append([[0, h, w + gap]])
+            placed = (len(canvases) - 1, 0, 0)
+        placements[i] = Placement(placed[0], placed[1], placed[2], w, h, scale)
+    return placements, len(canvases)
+
+
+def build_mosaics(crops, canvas_size=640, gap=4):
+    """Returns (canvases, placements) for a list of BGR crops."""
+    placements, n_canvases = shelf_pack([(c.shape[1], c.shape[0]) for c in crops], canvas_size, gap)
+    canvases = [np.full((canvas_size, canvas_size, 3), FILL_VALUE, dtype=np.uint8) for _ in range(n_canvases)]
+    for crop, p in zip(crops, placements):
+        if p.scale < 1.0:
+            crop = cv2.resize(crop, (p.w, p.h), interpolation=cv2.INTER_AREA)
+        canvases[p.canvas][p.y:p.y + p.h, p.x:p.x + p.w] = crop
+    return canvases, placements
+
+
+def split_boxes(canvas_boxes, placements):
+    """Assigns each canvas box to the crop containing its centre and maps it to crop coordinates.
+
+    ``canvas_boxes`` holds one (n, 6) [x1, y1, x2, y2, conf, cls] array per canvas.
+    Boxes are clipped to their crop; boxes centred in a gap are dropped.
+    """
+    out = []
+    for p in placements:
+        boxes = canvas_boxes[p.canvas]
+        if len(boxes) == 0:
+            out.append(EMPTY_BOXES)
+            continue
+        cx = (boxes[:, 0] + boxes[:, 2]) / 2
+        cy = (boxes[:, 1] + boxes[:, 3]) / 2
+        inside = (cx >= p.x) & (cx < p.x + p.w) & (cy >= p.y) & (cy < p.y + p.h)
+        mine = boxes[inside].astype(np.float32, copy=True)
+        mine[:, [0, 2]] = np.clip(mine[:, [0, 2]] - p.x, 0, p.w) / p.scale
+        mine[:, [1, 3]] = np.clip(mine[:, [1, 3]] - p.y, 0, p.h) / p.scale
+        out.append(mine)
+    return out
+
+
+def detect(crops, run_canvases, canvas_size=640, gap=4):
+    """Runs ``run_canvases(canvases) -> [boxes per canvas]`` on packed crops; returns boxes per crop."""
+    if not crops:
+        return []
+    canvases, placements = build_mosaics(crops, canvas_size, gap)
+    return split_boxes(run_canvases(canvases), placements)
@@ -0,0 +1,280 @@
+"""Offline mode: re-scores a recorded video without a server, client or window.
+
+A reader thread decodes the video (only grabbing the frames skipped by
+--stride), slot crops from several frames are inferred as one batch, and the
+same card state logic as the server turns detections into hands, board and
+winner. Every change in the hand is written as one JSON line:
+
+    {"frame": 120, "t": 4.0, "board": ["AS", ...], "players": {"0": ["KD", "KH"]},
+     "winner": "offline_0", "hands": {"offline_0": "Pair"}, "slots": [...]}
+
+Run from the repository root:
+    python PokerTracker/offline.py --video Testvideo2.mp4 -pz p_slots --stride 2
+"""
+import argparse
+import json
+import os
+import queue
+import threading
+import time
+
+import cv2
+
+import calcWinner
+import card_state
+import confidence_fusion
+import deck_solver
+import inference_backend
+import inference_workers
+import preprocess
+import select_zones
+import slot_change
+from pipeline import StageTimer
+
+OFFLINE_CLIENT = "offline"
+
+
+class FrameReader(threading.Thread):
+    """Decodes a video on its own thread and queues every ``stride``-th frame.
+
+    Items are (frame index, seconds into the video, image); frames in between
+    are grabbed without decoding. The queue is bounded so decoding stays at
+    most ``queue_size`` frames ahead of inference. Iterating the reader yields
+    items until the video (or ``max_frames``) ends.
+    """
+
+    def __init__(self, path, stride=1, start=0, max_frames=0, flip=True, queue_size=32):
+        super().__init__(name="frame-reader", daemon=True)
+        self.cap = cv2.VideoCapture(str(path))
+        if not self.cap.isOpened():
+            raise FileNotFoundError(f"Could not open video file: {path}")
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.stride = max(1, stride)
+        self.start_frame = start
+        self.max_frames = max_frames
+        self.flip = flip
+        self.decoded = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+
+    def run(self):
+        try:
+            if self.start_frame:
+                self.cap.set(cv2.CAP_PROP_POS_FRAMES, self.start_frame)
+            idx = self.start_frame
+            while not self._stop.is_set() and not (self.max_frames and self.decoded >= self.max_frames):
+                if (idx - self.start_frame) % self.stride:
+                    if not self.cap.grab():
+                        break
+                else:
+                    success, img = self.cap.read()
+                    if not success:
+                        break
+                    self.decoded += 1
+                    # Zones are drawn on flipped frames, as in client.py.
+                    self._put((idx, idx / self.fps, cv2.flip(img, -1) if self.flip else img))
+                idx += 1
+        finally:
+            self.cap.release()
+            self._put(None)
+
+    def _put(self, item):
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def stop(self):
+        self._stop.set()
+
+    def __iter__(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            yield item
+
+
+def build_slots(players, flop_slots):
+    """Slot descriptions in the same layout the client sends."""
+    slots = [{"rect": [int(v) for v in rect], "label": "player", "p_idx": p_idx, "c_idx": c_idx}
+             for p_idx, hand in enumerate(players) for c_idx, rect in enumerate(hand)]
+    slots += [{"rect": [int(v) for v in rect], "label": "flop", "p_idx": 0, "c_idx": f_idx}
+              for f_idx, rect in enumerate(flop_slots)]
+    return slots
+
+
+def crop_slots(img, slots):
+    crops = []
+    for slot in slots:
+        x, y, w, h = slot["rect"]
+        crop = img[y:y+h, x:x+w]
+        crops.append(crop if crop.size > 0 else None)
+    return crops
+
+
+def hand_summary(flop_cards, player_cards, winner, conflicts=None):
+    """The parts of the state a hand history records, comparable between frames."""
+    board = [flop_cards[c]['name'] for c in sorted(flop_cards)]
+    players = {str(p_idx): [cards[c]['name'] for c in sorted(cards)]
+               for p_idx, cards in sorted(player_cards.get(OFFLINE_CLIENT, {}).items())}
+    hands = {key: r.get("hand_type") for key, r in winner.get("results", {}).items()}
+    summary = {"board": board, "players": players, "winner": winner.get("winner_id"), "hands": hands}
+    if conflicts:
+        summary["conflicts"] = conflicts
+    return summary
+
+
+def slot_record(slot, detection):
+    face, back, _ = detection
+    boxes, name = (face, None) if len(face) else (back, "DN")
+    return {"label": slot["label"], "p_idx": slot["p_idx"], "c_idx": slot["c_idx"],
+            "cards": [{"name": name or card_state.CLASS_NAMES[int(b[5])], "conf": round(float(b[4]), 3)}
+                      for b in boxes]}
+
+
+def process_video(frames, slots, run_batch, out, batch_frames=4, change_threshold=4.0, max_unchanged=30,
+                  clahe=None, back_first=False, all_frames=False, timer=None,
+                  fusion_frames=confidence_fusion.FUSION_FRAMES, deck_check=True):
+    """Runs every frame from ``frames`` through detection and the card state.
+
+    ``run_batch`` takes (crop, back_first) items as CardModels does. Slot crops
+    that barely changed since they were last inferred reuse that result. A JSON
+    line is written to ``out`` whenever the hand changes (every frame with
+    ``all_frames``). With ``deck_check`` each card is kept in one slot only
+    (deck_solver) and lines note the conflicts. Returns the number of frames
+    processed.
+    """
+    table = card_state.CardState(fusion_frames=fusion_frames)
+    evaluator = calcWinner.WinnerEvaluator()
+    detector = slot_change.SlotChangeDetector(change_threshold, max_unchanged=max_unchanged)
+    cache = {}
+    last_summary = None
+    processed = 0
+    timer = timer or StageTimer()
+    frames = iter(frames)
+
+    while True:
+        start = time.perf_counter()
+        batch = [item for _, item in zip(range(batch_frames), frames)]
+        timer.record("read", time.perf_counter() - start)
+        if not batch:
+            return processed
+
+        start = time.perf_counter()
+        items, owners, changed_per_frame = [], [], []
+        for f, (_, _, img) in enumerate(batch):
+            crops = crop_slots(img, slots)
+            updates, changed = [], set()
+            for i, crop in enumerate(crops):
+                if crop is None:
+                    continue
+                key = card_state.slot_key(OFFLINE_CLIENT, slots[i])
+                is_changed, thumb = detector.check(key, crop)
+                updates.append((key, is_changed, thumb))
+                if is_changed:
+                    changed.add(i)
+                    items.append((clahe.apply(crop) if clahe is not None else crop,
+                                  back_first and table.slot_was_dn.get(key, False)))
+                    owners.append((f, i))
+            detector.commit(updates)
+            changed_per_frame.append(changed)
+        timer.record("crop", time.perf_counter() - start)
+
+        start = time.perf_counter()
+        results = run_batch(items) if items else []
+        timer.record("inference", time.perf_counter() - start)
+
+        start = time.perf_counter()
+        fresh = {}
+        for owner, result in zip(owners, results):
+            fresh[owner] = result
+        for f, (frame_idx, t, _) in enumerate(batch):
+            detections = [None] * len(slots)
+            for i, slot in enumerate(slots):
+                key = card_state.slot_key(OFFLINE_CLIENT, slot)
+                if i in changed_per_frame[f]:
+                    detections[i] = cache[key] = fresh[(f, i)]
+                elif key in cache:
+                    detections[i] = cache[key]
+            table.apply(OFFLINE_CLIENT, slots, detections, t)
+            if deck_check:
+                player_cards, flop_cards, conflicts = deck_solver.resolve(table)
+            else:
+                player_cards, flop_cards, conflicts = table.player_cards, table.flop_cards, None
+            winner, _ = evaluator.evaluate(flop_cards, player_cards)
+            summary = hand_summary(flop_cards, player_cards, winner, conflicts)
+            if all_frames or summary != last_summary:
+                last_summary = summary
+                record = dict({"frame": frame_idx, "t": round(t, 3)}, **summary)
+                record["slots"] = [slot_record(slots[i], detections[i]) for i in sorted(changed_per_frame[f])
+                                   if len(detections[i][0]) or len(detections[i][1])]
+                out.write(json.dumps(record) + "\n")
+            processed += 1
+        timer.record("state", time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the card detectors over a recorded video, headless.")
+    parser.add_argument('--video', required=True, help='Path to the recorded video')
+    parser.add_argument('-pz', '--playerzone', default='p_slots', help='Player zone file in data/')
+    parser.add_argument('-fz', '--flopzone', default='f_slots', help='Flop zone file in data/')
+    parser.add_argument('-o', '--out', help='JSONL hand history path (default data/<video>_hands.jsonl)')
+    parser.add_argument('--stride', type=int, default=1, help='Process every Nth frame')
+    parser.add_argument('--start', type=int, default=0, help='First frame to process')
+    parser.add_argument('--max-frames', type=int, default=0, help='Stop after this many processed frames')
+    parser.add_argument('--batch-frames', type=int, default=4, help='Frames whose crops share one inference batch')
+    parser.add_argument('--change-threshold', type=float, default=4.0,
+                        help='Mean abs pixel diff below which a slot reuses its last detection (0 disables)')
+    parser.add_argument('--clahe', choices=['slot', 'off'], default='slot', help='Equalize crops as the client does')
+    parser.add_argument('--no-flip', action='store_true', help='Do not rotate frames 180 degrees like client.py')
+    parser.add_argument('--all-frames', action='store_true', help='Write a line for every frame, not only changes')
+    parser.add_argument('--back-first', action='store_true',
+                        help='Run the card-back model first on slots that showed DN last frame')
+    parser.add_argument('--fusion-frames', type=int, default=confidence_fusion.FUSION_FRAMES,
+                        help='Frames each slot votes over before deciding its card')
+    parser.add_argument('--no-deck-solver', action='store_true', help='Record cards as read, duplicates included')
+    parser.add_argument('--device', default='auto')
+    parser.add_argument('--backend', choices=inference_backend.BACKENDS, default='auto')
+    parser.add_argument('--int8', action='store_true')
+    parser.add_argument('--mosaic', action='store_true', help='Pack crops into shared canvases per model call')
+    parser.add_argument('--mosaic-size', type=int, default=640)
+    parser.add_argument('--stub-ms', type=float, default=0.0, help='Simulated per-crop time with --backend stub')
+    parser.add_argument('--stub-cards', action='store_true', help='With --backend stub, report fake cards')
+    args = parser.parse_args()
+
+    players, flop_slots = select_zones.fetch_zones(P_PATH=args.playerzone, F_PATH=args.flopzone)
+    slots = build_slots(players, flop_slots)
+    models = inference_workers.CardModels(backend=args.backend, device=args.device, int8=args.int8,
+                                          mosaic_size=args.mosaic_size if args.mosaic else 0,
+                                          stub_ms=args.stub_ms, stub_cards=args.stub_cards)
+    out_path = args.out or os.path.join(
+        "PokerTracker/data", os.path.splitext(os.path.basename(args.video))[0] + "_hands.jsonl")
+
+    reader = FrameReader(args.video, stride=args.stride, start=args.start, max_frames=args.max_frames,
+                         flip=not args.no_flip)
+    timer = StageTimer(window=1000)
+    start = time.perf_counter()
+    reader.start()
+    try:
+        with open(out_path, "w") as out:
+            processed = process_video(reader, slots, models, out, batch_frames=args.batch_frames,
+                                      change_threshold=args.change_threshold,
+                                      clahe=preprocess.ClahePreprocessor() if args.clahe == 'slot' else None,
+                                      back_first=args.back_first, all_frames=args.all_frames, timer=timer,
+                                      fusion_frames=args.fusion_frames, deck_check=not args.no_deck_solver)
+    finally:
+        reader.stop()
+    elapsed = time.perf_counter() - start
+
+    video_seconds = processed * args.stride / reader.fps
+    print(f"Processed {processed} frames in {elapsed:.1f}s: {processed / elapsed:.1f} frames/s, "
+          f"{video_seconds / elapsed:.1f}x real time")
+    print(f"Stages: {timer.format()}")
+    print(f"Hand history written to {out_path}")
+
+
+if __name__ == "__main__":
+    main()
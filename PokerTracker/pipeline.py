@@ -0,0 +1,106 @@
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+
+class DropOldestQueue:
+    """Bounded hand-off between pipeline stages that never blocks the producer.
+
+    ``put`` discards the oldest queued item when full, so a slow consumer always
+    picks up the newest work instead of a backlog of stale frames. ``close``
+    wakes every waiting consumer; ``get`` returns None once the queue is closed
+    and drained (or on timeout).
+    """
+
+    def __init__(self, maxsize=1):
+        self.maxsize = maxsize
+        self._items = deque()
+        self._cond = threading.Condition()
+        self.closed = False
+        self.dropped = 0
+
+    def put(self, item):
+        with self._cond:
+            if self.closed:
+                return
+            if len(self._items) >= self.maxsize:
+                self._items.popleft()
+                self.dropped += 1
+            self._items.append(item)
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        with self._cond:
+            self._cond.wait_for(lambda: self._items or self.closed, timeout)
+            return self._items.popleft() if self._items else None
+
+    def empty(self):
+        with self._cond:
+            return not self._items
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+
+class StageTimer:
+    """Rolling per-stage timings over the last ``window`` samples of each stage."""
+
+    def __init__(self, window=120):
+        self.window = window
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage, seconds):
+        with self._lock:
+            samples = self._samples.get(stage)
+            if samples is None:
+                samples = self._samples[stage] = deque(maxlen=self.window)
+            samples.append(seconds * 1000.0)
+
+    def summary(self):
+        """{stage: {"mean": ms, "p95": ms, "count": n}} for every stage seen so far."""
+        with self._lock:
+            samples = {stage: list(values) for stage, values in self._samples.items()}
+        return {stage: {"mean": float(np.mean(values)),
+                        "p95": float(np.percentile(values, 95)),
+                        "count": len(values)}
+                for stage, values in samples.items() if values}
+
+    def format(self):
+        return " | ".join(f"{stage} {s['mean']:.1f}ms (p95 {s['p95']:.1f})"
+                          for stage, s in self.summary().items())
+
+
+def run_stage(name, inbox, work, outbox=None, timer=None, stop=None):
+    """Consumes ``inbox`` until it closes (or ``stop`` is set), passing each item to ``work``.
+
+    Non-None results go to ``outbox``. Closing propagates downstream so the whole
+    pipeline winds down from its source.
+    """
+    try:
+        while stop is None or not stop.is_set():
+            item = inbox.get(timeout=0.1)
+            if item is None:
+                if inbox.closed:
+                    break
+                continue
+            start = time.perf_counter()
+            result = work(item)
+            if timer is not None:
+                timer.record(name, time.perf_counter() - start)
+            if result is not None and outbox is not None:
+                outbox.put(result)
+    finally:
+        if outbox is not None:
+            outbox.close()
+
+
+def start_stage(name, inbox, work, outbox=None, timer=None, stop=None):
+    thread = threading.Thread(target=run_stage, args=(name, inbox, work, outbox, timer, stop),
+                              name=name, daemon=True)
+    thread.start()
+    return thread
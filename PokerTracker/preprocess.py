@@ -0,0 +1,110 @@
+import math
+import threading
+
+import cv2
+import numpy as np
+
+# --clahe modes: equalize neighbouring slots together once per frame, each slot
+# separately (the original behaviour), on the server, or not at all.
+CLAHE_MODES = ("frame", "slot", "server", "off")
+
+
+def union_rect(rects, shape):
+    """Bounding box [x, y, w, h] of ``rects`` clipped to an image of ``shape``; None if empty."""
+    h, w = shape[:2]
+    boxes = [(max(0, int(x)), max(0, int(y)), min(w, int(x) + int(rw)), min(h, int(y) + int(rh)))
+             for x, y, rw, rh in rects]
+    boxes = [b for b in boxes if b[2] > b[0] and b[3] > b[1]]
+    if not boxes:
+        return None
+    x0, y0 = min(b[0] for b in boxes), min(b[1] for b in boxes)
+    x1, y1 = max(b[2] for b in boxes), max(b[3] for b in boxes)
+    return [x0, y0, x1 - x0, y1 - y0]
+
+
+def rect_area(rect):
+    return max(0, rect[2]) * max(0, rect[3])
+
+
+def group_rects(rects, max_waste=1.25):
+    """Greedily merges rects into groups whose bounding box is at most ``max_waste``
+    times the area the group's rects cover, so one pass per group never spends much
+    time on table between the slots. Returns lists of indices into ``rects``.
+    """
+    groups = [([i], list(rect)) for i, rect in enumerate(rects) if rect_area(rect) > 0]
+    while len(groups) > 1:
+        best = None
+        for a in range(len(groups)):
+            for b in range(a + 1, len(groups)):
+                box = union_rect([groups[a][1], groups[b][1]], (1 << 30, 1 << 30))
+                covered = sum(rect_area(rects[i]) for i in groups[a][0] + groups[b][0])
+                waste = rect_area(box) / covered
+                if waste <= max_waste and (best is None or waste < best[0]):
+                    best = (waste, a, b, box)
+        if best is None:
+            break
+        _, a, b, box = best
+        merged = (groups[a][0] + groups[b][0], box)
+        groups = [g for k, g in enumerate(groups) if k not in (a, b)] + [merged]
+    return [sorted(indices) for indices, _ in groups]
+
+
+class ClahePreprocessor:
+    """CLAHE on the LAB lightness channel, with the CLAHE objects built once.
+
+    ``apply`` equalizes a single crop. ``apply_regions`` equalizes each cluster of
+    neighbouring slots in one pass; the tile grid is sized so a tile covers about
+    as many pixels as a tile of the per-slot ``tile_grid_size`` would on a typical
+    slot, keeping the local contrast close to per-slot processing. OpenCV's CLAHE
+    keeps scratch buffers, so every thread gets its own objects.
+    """
+
+    def __init__(self, clip_limit=2.0, tile_grid_size=(8, 8)):
+        self.clip_limit = clip_limit
+        self.tile_grid_size = tuple(tile_grid_size)
+        self._local = threading.local()
+
+    def _clahe(self, grid):
+        cache = getattr(self._local, "clahe", None)
+        if cache is None:
+            cache = self._local.clahe = {}
+        clahe = cache.get(grid)
+        if clahe is None:
+            clahe = cache[grid] = cv2.createCLAHE(clipLimit=self.clip_limit, tileGridSize=grid)
+        return clahe
+
+    def _equalize(self, img, grid):
+        lab = cv2.cvtColor(img, cv2.COLOR_BGR2LAB)
+        lightness = lab[:, :, 0].copy()
+        lab[:, :, 0] = self._clahe(grid).apply(lightness)
+        return cv2.cvtColor(lab, cv2.COLOR_LAB2BGR)
+
+    def apply(self, img):
+        return self._equalize(img, self.tile_grid_size)
+
+    def region_grid(self, region_size, rects):
+        """Tile grid (cols, rows) for a region so tiles match per-slot tile size."""
+        slot_w = float(np.median([r[2] for r in rects]))
+        slot_h = float(np.median([r[3] for r in rects]))
+        tile_w = max(slot_w / self.tile_grid_size[0], 1.0)
+        tile_h = max(slot_h / self.tile_grid_size[1], 1.0)
+        return (max(1, math.ceil(region_size[0] / tile_w)), max(1, math.ceil(region_size[1] / tile_h)))
+
+    def apply_regions(self, img, rects):
+        """Equalizes each group of nearby ``rects`` in one pass and returns one crop per rect,
+        sliced as a view of its group's result (None where the rect misses the image).
+        """
+        rects = [[int(v) for v in rect] for rect in rects]
+        crops = [None] * len(rects)
+        for indices in group_rects(rects):
+            box = union_rect([rects[i] for i in indices], img.shape)
+            if box is None:
+                continue
+            x0, y0, w, h = box
+            grid = self.region_grid((w, h), [rects[i] for i in indices])
+            region = self._equalize(img[y0:y0 + h, x0:x0 + w], grid)
+            for i in indices:
+                x, y, rw, rh = rects[i]
+                crop = region[max(0, y - y0):max(0, y - y0 + rh), max(0, x - x0):max(0, x - x0 + rw)]
+                crops[i] = crop if crop.size > 0 else None
+        return crops
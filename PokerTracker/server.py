@@ -1,24 +1,37 @@
 import cv2
 import numpy as np
-from ultralytics import YOLO
 import time
 import os
-import json
 import calcWinner
 import select_zones
+import frame_codec
+import frame_stream
+import inference_scheduler
+import game_state
+import dashboard
+import equity
+import hand_eval
+import preprocess
+import adaptive_encoder
+import inference_backend
+import inference_workers
+import debug_recorder
+import metrics
+import card_state
+import card_tracker
+import confidence_fusion
+import deck_solver
+import chip_engine
+import chip_accounting
 import argparse
 import base64
-import http
 import threading
-import socketserver
-from flask import Flask, request, jsonify
-from sahi import AutoDetectionModel
-from sahi.predict import get_prediction
+from flask import Flask, Response, request, jsonify
+from werkzeug.serving import WSGIRequestHandler
 
 
 
 X, Y = 1920, 1080
-CARD_TIMEOUT_SECONDS = 2
 CARD_IMAGES_DIR = "PokerTracker/card_images"
 CARD_IMAGE_WIDTH, CARD_IMAGE_HEIGHT = 100, 140 
 PLAYER_HAND_SIZE, FLOP_HAND_SIZE = 2, 5
@@ -27,55 +40,88 @@ DN_CONF_MIN = 0.80
 
 parser = argparse.ArgumentParser(description='A sample program with a flag.')
 parser.add_argument('-v', '--verbose', action='store_true', help='Enable verbose output')
+parser.add_argument('--device', default='auto', help='Device for the models (auto, cuda, mps, cpu, ...)')
+parser.add_argument('--backend', choices=inference_backend.BACKENDS, default='auto',
+                    help='auto picks torch on a GPU and ONNX Runtime on CPU-only machines')
+parser.add_argument('--int8', action='store_true', help='Use INT8-quantized models with the onnx/openvino backends')
+parser.add_argument('--batch-max', type=int, default=32, help='Max crops per shared inference batch')
+parser.add_argument('--batch-wait-ms', type=float, default=5.0, help='Max time a request waits for a batch to fill')
+parser.add_argument('--snapshot-interval', type=float, default=0.2,
+                    help='Min seconds between JSON snapshots of the game state in data/')
+parser.add_argument('--equity-budget-ms', type=float, default=20.0,
+                    help='Time per frame spent refining win probabilities (0 disables)')
+parser.add_argument('--equity-workers', type=int, default=0, help='Worker processes for equity on big fields')
+parser.add_argument('--mosaic', action='store_true',
+                    help='Pack the crops of each inference batch into shared canvases, one detector call per canvas')
+parser.add_argument('--mosaic-size', type=int, default=640, help='Mosaic canvas side in pixels')
+parser.add_argument('--workers', type=int, default=0,
+                    help='Inference worker processes, each with its own model copies (0 runs models in this process)')
+parser.add_argument('--stub-ms', type=float, default=0.0, help='Simulated per-crop inference time with --backend stub')
+parser.add_argument('--stub-cards', action='store_true',
+                    help='With --backend stub, report a fake card in every crop so the game state keeps changing')
+parser.add_argument('--face-conf', type=float, default=0.4, help='Card face detection threshold')
+parser.add_argument('--fusion-frames', type=int, default=confidence_fusion.FUSION_FRAMES,
+                    help='Frames each slot votes over before deciding its card (1 = latest frame only)')
+parser.add_argument('--no-deck-solver', action='store_true',
+                    help='Publish cards as read, even when the same card shows up in several slots')
+parser.add_argument('--detect-every', type=int, default=0,
+                    help='Track cards per slot and run the detector on a tracked slot every N frames (0 = no tracking)')
+parser.add_argument('--back-first', action='store_true',
+                    help='Run the card-back model first on slots that showed DN last frame')
+parser.add_argument('--debug-rate', type=float, default=0.0,
+                    help='Fraction of frames whose crops are dumped to debug_crops/ (0 disables)')
+parser.add_argument('--debug-low-conf', type=float, default=None,
+                    help='Also dump any crop whose best detection is below this confidence')
+parser.add_argument('--debug-max-files', type=int, default=1000,
+                    help='Oldest debug crops are deleted beyond this many files')
+parser.add_argument('--metrics-interval', type=float, default=2.0,
+                    help='Seconds between stage latency summaries pushed to the dashboard (0 disables)')
+parser.add_argument('--chips', action='store_true', help='Detect chips in the player crops clients send')
+parser.add_argument('--chip-weights', default=chip_engine.CHIP_WEIGHTS, help='Chip model weights')
+parser.add_argument('--chip-conf', type=float, default=0.5, help='Chip confidence threshold')
+parser.add_argument('--chip-slice', type=int, default=0,
+                    help='Cut player crops into tiles of this size for the chip model (0 = whole crop)')
+parser.add_argument('--chip-overlap', type=float, default=0.2, help='Overlap ratio between chip tiles')
+parser.add_argument('--chip-window', type=int, default=chip_accounting.STACK_WINDOW,
+                    help='Chip detections per player averaged into a stack count')
+parser.add_argument('--chip-values', help='JSON file of {chip label: value}')
 args = parser.parse_args()
 
 
 
-model = YOLO("PokerTracker/models/yolov8s_playing_cards.pt")
-model.to('cuda')
-
-modelBack = YOLO('PokerTracker/backCard/runs/detect/train6/weights/best.pt')
-modelBack.to('cuda')
-
-detection_model = AutoDetectionModel.from_pretrained(
-    model_type="ultralytics",
-    model_path="/home/evan/Documents/senior-design/hoyleed-senior-design/PokerTracker/chips/best5.pt",
-    confidence_threshold=0.5,
-    device="cuda" 
-)
-
-classNames = [
-    '10C', '10D', '10H', '10S', '2C', '2D', '2H', '2S', '3C', '3D', 
-    '3H', '3S', '4C', '4D', '4H', '4S', '5C', '5D', '5H', '5S', 
-    '6C', '6D', '6H', '6S', '7C', '7D', '7H', '7S', '8C', '8D', 
-    '8H', '8S', '9C', '9D', '9H', '9S', 'AC', 'AD', 'AH', 'AS', 
-    'JC', 'JD', 'JH', 'JS', 'KC', 'KD', 'KH', 'KS', 'QC', 'QD', 
-    'QH', 'QS'
-]
+card_model_args = dict(backend=args.backend, device=args.device, int8=args.int8, face_conf=args.face_conf,
+                       back_conf=DN_CONF_MIN, mosaic_size=args.mosaic_size if args.mosaic else 0,
+                       stub_ms=args.stub_ms, stub_cards=args.stub_cards)
+# Per-stage latency histograms, served at /metrics. Model timings are per shared batch.
+stage_metrics = metrics.StageMetrics()
+# Workers are forked before this process loads any model or starts a thread.
+worker_pool = None
+if args.workers > 0:
+    worker_pool = inference_workers.WorkerPool(args.workers, inference_workers.CardModels,
+                                               on_timings=stage_metrics.observe_many, **card_model_args)
+# Build or map the hand rank table now rather than on the first frame's winner;
+# the equity workers forked below share the mapping.
+hand_eval.load_table()
+equity_calculator = equity.EquityCalculator(budget_ms=args.equity_budget_ms, workers=args.equity_workers,
+                                            mp_context="fork").start()
+
+# Chips run in this process on their own scheduler, so zones from every client share
+# one chip model call while the card models work on the same frames.
+chip_scheduler = None
+if args.chips:
+    chips = chip_engine.ChipEngine(
+        inference_backend.load_detector(args.chip_weights, args.backend, args.device, args.int8,
+                                        stub_ms=args.stub_ms),
+        conf=args.chip_conf, slice_size=args.chip_slice, overlap=args.chip_overlap)
+    chip_scheduler = inference_scheduler.InferenceScheduler(
+        chips.detect, max_batch=args.batch_max, max_wait_ms=args.batch_wait_ms)
 
 DEBUG_DIR = "PokerTracker/debug_crops"
-if not os.path.exists(DEBUG_DIR):
-    os.makedirs(DEBUG_DIR)
+recorder = debug_recorder.DebugRecorder(DEBUG_DIR, sample_rate=args.debug_rate, low_conf=args.debug_low_conf,
+                                        max_files=args.debug_max_files).start()
 
 WEB_PORT = 8000
-def start_web_server():
-    """Starts a simple HTTP server without breaking the main script's paths."""
-    # Define where index.html lives (PokerTracker folder)
-    web_dir = os.path.dirname(os.path.abspath(__file__))
-    
-    class Handler(http.server.SimpleHTTPRequestHandler):
-        def __init__(self, *args, **kwargs):
-            # Tell this specific handler to look in the PokerTracker folder
-            super().__init__(*args, directory=web_dir, **kwargs)
-
-    socketserver.TCPServer.allow_reuse_address = True
-    with socketserver.TCPServer(("", WEB_PORT), Handler) as httpd:
-        print(f"Dashboard available at http://localhost:{WEB_PORT}")
-        httpd.serve_forever()
-
-
-web_thread = threading.Thread(target=start_web_server, daemon=True)
-web_thread.start()
+STREAM_PORT = 5001
 
 
 
@@ -100,186 +146,388 @@ def load_card_image(card_name):
     CARD_IMAGE_CACHE[card_name] = resized_img
     return resized_img
 
-def has_two_identical_detections(yolo_results,class_id):
-    detected_classes = [int(box.cls[0]) for box in yolo_results.boxes]
-    count = detected_classes.count(class_id)
-    
-    return count >= 2
-
-global player_cards 
-player_cards  = {} 
-
-global flop_cards 
-flop_cards= {}
+# Inference for one shared batch of (crop, back_first) items: (face, back, skipped) per crop,
+# with boxes as (n, 6) float arrays of [x1, y1, x2, y2, conf, cls] rows.
+if worker_pool is not None:
+    run_card_models = worker_pool.wait_ready().run_batch
+else:
+    card_models = inference_workers.CardModels(**card_model_args)
+
+    def run_card_models(items):
+        results = card_models(items)
+        stage_metrics.observe_many(card_models.last_timings)
+        return results
+
+scheduler = inference_scheduler.InferenceScheduler(
+    run_card_models, max_batch=args.batch_max, max_wait_ms=args.batch_wait_ms,
+    num_runners=max(1, args.workers))
+
+# Hands and board built from the detections of every client; player_cards and
+# flop_cards below are its latest sections.
+table = card_state.CardState(verbose=args.verbose, fusion_frames=args.fusion_frames)
+player_cards, flop_cards = {}, {}
+slot_key = card_state.slot_key
+# Card tracks per slot give stable labels and stand in for the detector between runs.
+tracker = card_tracker.CardTracker(args.detect_every, frames=args.fusion_frames) if args.detect_every > 0 else None
+
+skipped_inferences_total = 0
+
+# (client_id, label, p_idx, c_idx) -> (face boxes, back boxes) of the last crop inferred,
+# reused when the client marks the slot unchanged.
+slot_result_cache = {}
+# client_id -> [unchanged slots, total slots]
+unchanged_slot_counts = {}
+# client_id -> {"quality", "scale"} the client's adaptive encoder last used
+client_encoders = {}
+
+def best_confidence(face, back):
+    if len(face) or len(back):
+        return float(max(face[:, 4].max() if len(face) else 0.0, back[:, 4].max() if len(back) else 0.0))
+    return None
+
+def mean_confidence(detections):
+    """Mean best-box confidence over freshly inferred slots that detected anything."""
+    confs = [best_confidence(face, back) for face, back, _ in detections if len(face) or len(back)]
+    return round(sum(confs) / len(confs), 3) if confs else None
 
 global players, flop_slots
 players, flop_slots = select_zones.fetch_zones()
 
+# Single source of truth for the live game; data/*.json are throttled snapshots of it.
+winner_evaluator = calcWinner.WinnerEvaluator()
+last_equity = None
+
+def compute_equity(flop_cards, player_cards):
+    """Win/tie odds for face-up hands; players showing card backs count as random hands."""
+    board = [d['name'] for d in flop_cards.values()]
+    hands, n_unknown = {}, 0
+    for cid, p_data in player_cards.items():
+        for p_id, cards in p_data.items():
+            names = [d['name'] for d in cards.values()]
+            if 'DN' in names:
+                n_unknown += 1
+            elif len(names) == 2:
+                hands[f"{cid}_{p_id}"] = names
+    return {"street": equity.STREETS.get(len(board), "unknown"),
+            "players": equity_calculator.compute(board, hands, n_unknown)}
+# client_id -> {p_idx: {"ts", "chips": [detected_chips.json entries]}}
+player_chips = {}
+# Slot key -> chip records of the last crop the chip model saw, reused for
+# unchanged and tracked slots like slot_result_cache.
+slot_chip_cache = {}
+last_chip_detections = None
+accounting = chip_accounting.ChipAccounting(chip_accounting.load_chip_values(args.chip_values), args.chip_window,
+                                            timeout=card_state.CARD_TIMEOUT_SECONDS)
+last_stacks = None
+board_seen = False
+initial_state = dict(player_cards={}, flop_cards={}, winner=winner_evaluator.evaluate({}, {})[0])
+snapshot_files = dict(game_state.SNAPSHOT_FILES)
+last_conflicts = {}
+if not args.no_deck_solver:
+    initial_state["conflicts"] = {}
+    snapshot_files["conflicts"] = f"{game_state.DATA_DIR}/conflicts.json"
+if args.chips:
+    initial_state["chips"] = {"timestamp": None, "detections": []}
+    initial_state["stacks"] = accounting.state()
+    snapshot_files["chips"] = f"{game_state.DATA_DIR}/detected_chips.json"
+    snapshot_files["stacks"] = f"{game_state.DATA_DIR}/chip_stacks.json"
+state_store = game_state.GameStateStore(**initial_state)
+snapshot_writer = game_state.SnapshotWriter(
+    state_store, files=snapshot_files, interval=args.snapshot_interval,
+    on_flush=lambda ms: stage_metrics.observe("json_snapshot", metrics.SHARED, ms)).start()
+last_metrics_push = 0.0
+
+# Dashboard files plus /events, which pushes state diffs as soon as the store changes.
+web_dir = os.path.dirname(os.path.abspath(__file__))
+web_thread = threading.Thread(target=dashboard.serve_dashboard, args=(state_store, WEB_PORT, web_dir), daemon=True)
+web_thread.start()
+
 app = Flask(__name__)
+@app.route('/scheduler_stats', methods=['GET'])
+def scheduler_stats():
+    return jsonify(scheduler.stats())
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    return Response(stage_metrics.prometheus(scheduler.prometheus_histograms()),
+                    mimetype='text/plain; version=0.0.4')
+
+@app.route('/metrics/summary', methods=['GET'])
+def metrics_summary():
+    return jsonify(stage_metrics.summary())
+
 @app.route('/process_frame', methods=['POST'])
 def process_frame():
-    global player_cards, flop_cards, players, flop_slots
     curr_t = time.time()
 
+    parse_start = time.perf_counter()
     data = request.json
     client_id = data.get('client_id', 'unknown_client')
+    stage_metrics.observe("parse", client_id, (time.perf_counter() - parse_start) * 1000)
     encoded_crops = data.get('crops', [])
     slots = data.get('slots', [])
-    
-    decoded_crops = []
-    for c in encoded_crops:
-        nparr = np.frombuffer(base64.b64decode(c), np.uint8)
-        decoded_crops.append(cv2.imdecode(nparr, cv2.IMREAD_COLOR))
 
-    if not decoded_crops:
-        return jsonify({"status": "empty"})
-    
-
-    for i, crop in enumerate(decoded_crops):
-        cv2.imwrite(f"{DEBUG_DIR}/crop_{i}.jpg", crop)
-
-    results = model(decoded_crops, conf=0.4, verbose=False)
-    resultsBack = modelBack(decoded_crops, conf=DN_CONF_MIN, verbose=False)
-
-    return_detections = []
-
-    if client_id not in player_cards:
-        player_cards[client_id] = {}
-
-    all_detections = []
-    current_time = time.strftime("%Y-%m-%d %H:%M:%S")
-        
-    for i, r in enumerate(results):
-
-            slot_data = slots[i]
-            rect = slot_data.get('rect', [0, 0, 0, 0])
-            label = slot_data.get('label', 'unknown')
-            p_idx = slot_data.get('p_idx', 0)
-            c_idx = slot_data.get('c_idx', 0)
-
-            roi_x, roi_y, roi_w, roi_h = [int(v) for v in rect]
-
-        
-            r_back = resultsBack[i]
-
-            conf = 0
-            
-            if len(r.boxes) > 0:
-                for box in r.boxes:
-                    lx1, ly1, lx2, ly2 = [int(val) for val in box.xyxy[0]]
-                    gx1, gy1, gx2, gy2 = roi_x + lx1, roi_y + ly1, roi_x + lx2, roi_y + ly2
-
-                    conf = box.conf[0].item()
-                    card_name = classNames[int(box.cls[0])]
-                    rank = card_name[:-1]
-                    
-                    if has_two_identical_detections(r,int(box.cls[0])):
-                        conf = min(conf * 1.1, 0.98)
-                    else:
-                        conf = conf * 0.9
-
-                    return_detections.append({
-                        "bbox": [roi_x + lx1, roi_y + ly1, roi_x + lx2, roi_y + ly2],
-                        "label": f"{card_name} {conf:.2f}",
-                        "color": [0, 0, 255] 
-                    })
-
-
-                unique_detections = {}
-                for box in r.boxes:
-                    name = classNames[int(box.cls[0])]
-                    if args.verbose:
-                        print(f"[VERBOSE] Detected {name} in {label} slot {i} (Conf: {conf:.2f})")
-                    if name not in unique_detections or conf > unique_detections[name]['conf']:
-                        unique_detections[name] = {'name': name, 'conf': conf}
-                
-                sorted_cards = sorted(unique_detections.values(), key=lambda x: x['conf'], reverse=True)
-                if label == "player":
-                    if p_idx not in player_cards[client_id]: 
-                        player_cards[client_id][p_idx] = {}
-                    for idx, card in enumerate(sorted_cards[:2]):
-                        player_cards[client_id][p_idx][idx] = {'name': card['name'], 'conf': card['conf'], 'ts': curr_t}
-                elif label == "flop":
-                    flop_cards[c_idx] = {'name': sorted_cards[0]['name'], 'conf': sorted_cards[0]['conf'], 'ts': curr_t}
-
-
-            elif len(r_back.boxes) > 0:
-                for box_back in r_back.boxes:
-                    blx1, bly1, blx2, bly2 = [int(val) for val in box_back.xyxy[0]]
-            
-                    bgx1 = roi_x + blx1
-                    bgy1 = roi_y + bly1
-                    bgx2 = roi_x + blx2
-                    bgy2 = roi_y + bly2
-                    conf = box_back.conf[0].item()
-
-                    if args.verbose:
-                        print(f"[VERBOSE] Detected DN in {label} slot {i} (Conf: {conf:.2f})")
-
-                    if label == "player":
-                        return_detections.append({
-                            "bbox": [roi_x + blx1, roi_y + bly1, roi_x + blx2, roi_y + bly2],
-                            "label": f"DN {conf:.2f}",
-                            "color": [0, 255, 255] 
-                        })
-
-                if label == "player":
-                    if p_idx not in player_cards[client_id]: player_cards[client_id][p_idx] = {}
-                    for idx in range(min(len(r_back.boxes), 2)):
-                        player_cards[client_id][p_idx][idx] = {'name': 'DN', 'conf': r_back.boxes[idx].conf[0].item(), 'ts': curr_t}
-                    
-    new_player_cards = {}
-    for cid, p_data in player_cards.items():
-        client_players = {}
-        for p_id, cards in p_data.items():
-            valid_cards = {c_idx: d for c_idx, d in cards.items() if curr_t - d['ts'] < CARD_TIMEOUT_SECONDS}
-            if valid_cards:
-                client_players[p_id] = valid_cards
-        if client_players:
-            new_player_cards[cid] = client_players
-    player_cards = new_player_cards
+    with stage_metrics.time("base64_decode", client_id):
+        buffers = [np.frombuffer(base64.b64decode(c), np.uint8) if c else None for c in encoded_crops]
+    with stage_metrics.time("imdecode", client_id):
+        decoded_crops = [cv2.imdecode(b, cv2.IMREAD_COLOR) if b is not None else None for b in buffers]
 
-    flop_cards = {c_idx: d for c_idx, d in flop_cards.items() if curr_t - d['ts'] < CARD_TIMEOUT_SECONDS}
-
-    if args.verbose:
-        for p_id, cards in player_cards.items():
-            for c_idx, data in cards.items():
-                if curr_t - data['ts'] >= CARD_TIMEOUT_SECONDS:
-                    print(f"[TIMEOUT] Player {p_id+1}, Card Slot {c_idx+1} ({data['name']}) removed after {CARD_TIMEOUT_SECONDS}s")
-    if args.verbose:
-        for c_idx, data in flop_cards.items():
-            if curr_t - data['ts'] >= CARD_TIMEOUT_SECONDS:
-                print(f"[TIMEOUT] Flop Slot {c_idx+1} ({data['name']}) removed after {CARD_TIMEOUT_SECONDS}s")
+    client_encoders[client_id] = data.get('encoder')
+    return jsonify(handle_frame(client_id, slots, decoded_crops, curr_t, data.get('preprocess'),
+                                data.get('frame_id')))
 
+@app.route('/process_frame_bin', methods=['POST'])
+def process_frame_bin():
+    """Binary transport: JSON slot header followed by raw JPEG bytes (see frame_codec)."""
+    curr_t = time.time()
 
+    parse_start = time.perf_counter()
+    try:
+        header, views = frame_codec.decode_frame(request.get_data(cache=False))
+    except ValueError as e:
+        return jsonify({"status": "error", "error": str(e)}), 400
+
+    client_id = header.get('client_id', 'unknown_client')
+    stage_metrics.observe("parse", client_id, (time.perf_counter() - parse_start) * 1000)
+    slots = header.get('slots', [])
+    with stage_metrics.time("imdecode", client_id):
+        decoded_crops = frame_codec.decode_crops(views)
+
+    client_encoders[client_id] = header.get('encoder')
+    return jsonify(handle_frame(client_id, slots, decoded_crops, curr_t, header.get('preprocess'),
+                                header.get('frame_id')))
+
+def process_stream_frame(body):
+    """Persistent-connection transport: same binary body, response tagged with frame_id."""
+    curr_t = time.time()
+    parse_start = time.perf_counter()
+    header, views = frame_codec.decode_frame(body)
+    client_id = header.get('client_id', 'unknown_client')
+    stage_metrics.observe("parse", client_id, (time.perf_counter() - parse_start) * 1000)
+    slots = header.get('slots', [])
+    with stage_metrics.time("imdecode", client_id):
+        decoded_crops = frame_codec.decode_crops(views)
+
+    client_encoders[client_id] = header.get('encoder')
+    response = handle_frame(client_id, slots, decoded_crops, curr_t, header.get('preprocess'),
+                            header.get('frame_id'))
+    response["frame_id"] = header.get('frame_id')
+    return response
+
+# Flask runs threaded and the stream server runs a thread per connection.
+# Inference goes through the shared scheduler concurrently; only the card
+# state update (which mutates the globals) is serialized.
+frame_lock = threading.Lock()
+clahe = preprocess.ClahePreprocessor()
+
+def record_debug_crops(client_id, frame_id, slots, decoded_crops, fresh, fresh_detections, curr_t):
+    """Queues the sampled and low-confidence fresh crops for the debug recorder."""
+    sampled = recorder.sample_frame(client_id)
+    if frame_id is None:
+        frame_id = int(curr_t * 1000)
+    for i, (face, back, _) in zip(fresh, fresh_detections):
+        conf = best_confidence(face, back)
+        if recorder.wants(sampled, conf):
+            s = slots[i]
+            recorder.record(client_id, frame_id, f"{s.get('label')}_{s.get('p_idx', 0)}_{s.get('c_idx', 0)}",
+                            decoded_crops[i], conf)
+
+def handle_frame(client_id, slots, decoded_crops, curr_t, preprocess_mode=None, frame_id=None):
+    if not decoded_crops:
+        return {"status": "empty"}
+
+    if preprocess_mode == "clahe":
+        # Clients running --clahe server send raw crops.
+        with stage_metrics.time("clahe", client_id):
+            decoded_crops = [clahe.apply(c) if c is not None else None for c in decoded_crops]
+
+    keys = [slot_key(client_id, s) for s in slots]
+    unchanged = [i for i, s in enumerate(slots) if s.get('unchanged')]
+    fresh = [i for i, crop in enumerate(decoded_crops) if crop is not None and not slots[i].get('unchanged')]
+    tracked = []
+    if tracker is not None:
+        with frame_lock:
+            tracked = [i for i in fresh if not tracker.due(keys[i])]
+        fresh = [i for i in fresh if i not in tracked]
+
+    items = [(decoded_crops[i], args.back_first and table.slot_was_dn.get(keys[i], False)) for i in fresh]
+    chip_slots, reused_chip_slots = [], []
+    if chip_scheduler is not None:
+        chip_slots = [i for i in fresh if slots[i].get('label') == 'player']
+        reused_chip_slots = [i for i in unchanged + tracked if slots[i].get('label') == 'player']
+    with stage_metrics.time("inference", client_id):
+        chip_result = chip_scheduler.submit_async([decoded_crops[i] for i in chip_slots]) if chip_slots else None
+        fresh_detections = scheduler.submit(items)
+    if chip_result is not None:
+        with stage_metrics.time("chips", client_id):
+            fresh_chips = chip_result()
+    # Downscaled crops: boxes back to slot coordinates before they are cached or used.
+    fresh_detections = [(adaptive_encoder.rescale_boxes(face, slots[i].get('scale', 1.0)),
+                         adaptive_encoder.rescale_boxes(back, slots[i].get('scale', 1.0)), skipped)
+                        for i, (face, back, skipped) in zip(fresh, fresh_detections)]
+    if recorder.enabled:
+        record_debug_crops(client_id, frame_id, slots, decoded_crops, fresh, fresh_detections, curr_t)
+
+    with frame_lock:
+        detections = [None] * len(decoded_crops)
+        for i, det in zip(fresh, fresh_detections):
+            if tracker is not None:
+                det = (*tracker.update(keys[i], det[0], det[1], curr_t), det[2])
+            detections[i] = det
+            slot_result_cache[keys[i]] = det[:2]
+        for i in tracked:
+            detections[i] = (*tracker.propagate(keys[i], curr_t), 2)
+
+        resend = []
+        for i in unchanged:
+            cached = slot_result_cache.get(keys[i])
+            if cached is None:
+                # Nothing to reuse (e.g. the server restarted): ask the client for a real crop.
+                resend.append([slots[i].get('label'), slots[i].get('p_idx', 0), slots[i].get('c_idx', 0)])
+            else:
+                detections[i] = (cached[0], cached[1], 2)
+
+        counts = unchanged_slot_counts.setdefault(client_id, [0, 0])
+        counts[0] += len(unchanged)
+        counts[1] += len(slots)
+
+        if chip_slots or reused_chip_slots:
+            update_chips(client_id, slots, keys, chip_slots, fresh_chips if chip_slots else [],
+                         reused_chip_slots, curr_t)
+        response = update_card_state(client_id, slots, detections, curr_t)
+        response["confidence"] = mean_confidence(fresh_detections)
+        if resend:
+            response["resend"] = resend
+    # Time since the request arrived, including waiting for frame_lock.
+    stage_metrics.observe("frame_total", client_id, (time.time() - curr_t) * 1000)
+    return response
+
+def update_chips(client_id, slots, keys, chip_slots, fresh_chips, reused_chip_slots, curr_t):
+    """Refreshes the chips of the client's player slots; boxes go to frame coordinates.
+
+    Freshly inferred slots replace their cached chips; unchanged and tracked
+    slots keep the chips last detected in them, so they don't time out.
+    """
+    for i, boxes in zip(chip_slots, fresh_chips):
+        slot = slots[i]
+        boxes = adaptive_encoder.rescale_boxes(boxes, slot.get('scale', 1.0))
+        slot_chip_cache[keys[i]] = chip_engine.chip_records(chips, boxes, slot.get('rect', [0, 0]),
+                                                            slot.get('p_idx', 0), slot.get('c_idx', 0))
+    client = player_chips.setdefault(client_id, {})
+    for i in sorted(chip_slots + reused_chip_slots):
+        records = slot_chip_cache.get(keys[i])
+        if records is None:
+            continue
+        p_idx = slots[i].get('p_idx', 0)
+        client[p_idx] = {"ts": curr_t, "chips": records}
+        accounting.observe(f"{client_id}_{p_idx}", records, curr_t)
+
+def current_chips(curr_t):
+    """Chips of every player seen within the card timeout, as detected_chips.json entries."""
+    detections = []
+    for cid in list(player_chips):
+        players_seen = {p: d for p, d in player_chips[cid].items() if curr_t - d['ts'] < card_state.CARD_TIMEOUT_SECONDS}
+        if players_seen:
+            player_chips[cid] = players_seen
+        else:
+            del player_chips[cid]
+        for p_idx in sorted(players_seen):
+            detections.extend(dict(chip, client_id=cid) for chip in players_seen[p_idx]["chips"])
+    return detections
+
+def update_card_state(client_id, slots, detections, curr_t):
+    global player_cards, flop_cards, players, flop_slots, skipped_inferences_total, last_equity, last_metrics_push
+    global last_chip_detections, last_stacks, board_seen, last_conflicts
+    state_start = time.perf_counter()
+
+    skipped_inferences = sum(d[2] for d in detections if d is not None)
+    skipped_inferences_total += skipped_inferences
+
+    # Tracked face boxes already carry their track's fused label and confidence.
+    return_detections = table.apply(client_id, slots, detections, curr_t, tracked=tracker is not None)
+    player_cards, flop_cards = table.player_cards, table.flop_cards
+    conflicts = None
+    if not args.no_deck_solver:
+        # Every card at most once across all slots and clients.
+        with stage_metrics.time("deck_solver", client_id):
+            player_cards, flop_cards, conflicts = deck_solver.resolve(table)
 
     if args.verbose:
         active_players = [p for p, cards in player_cards.items() if len(cards) > 0]
         active_flop = len(flop_cards)
         print(f"--- Frame Summary ---")
         print(f"Active Players: {active_players} | Cards on Flop: {active_flop}")
+        print(f"Skipped Inferences: {skipped_inferences}/{2 * len(detections)} (total {skipped_inferences_total})")
+        for cid, (n_unchanged, n_total) in unchanged_slot_counts.items():
+            print(f"Unchanged slots from {cid}: {n_unchanged}/{n_total} ({n_unchanged / max(n_total, 1):.1%})")
+        for cid, enc in client_encoders.items():
+            if enc:
+                print(f"Encoder for {cid}: JPEG quality {enc.get('quality')}, crop scale {enc.get('scale')}")
 
         processing_time = (time.time() - curr_t) * 1000
         print(f"Frame Processing Time: {processing_time:.2f}ms")
-        
-    with open("PokerTracker/data/flop_cards.json", "w") as file:
-        json.dump(flop_cards, file, indent=4) 
-    file.close()
-    with open("PokerTracker/data/player_cards.json", "w") as file:
-        json.dump(player_cards, file, indent=4) 
-    file.close()
-
+        stats = scheduler.stats()
+        print(f"Batch size: mean {stats['batch_size']['mean']:.1f} {stats['batch_size']['buckets']}")
+        print(f"Queue wait (ms): mean {stats['queue_wait_ms']['mean']:.2f} {stats['queue_wait_ms']['buckets']}")
+        print(f"Stages: {stage_metrics.format()}")
+        if tracker is not None:
+            print(f"Tracker: {tracker.stats()}")
+    stage_metrics.observe("state_update", client_id, (time.perf_counter() - state_start) * 1000)
+
+    sections = {"player_cards": player_cards, "flop_cards": flop_cards}
+    if conflicts is not None and conflicts != last_conflicts:
+        last_conflicts = conflicts
+        sections["conflicts"] = conflicts
+        if args.verbose and conflicts:
+            print(f"Deck conflicts: {conflicts}")
+    if args.chips:
+        chip_detections = current_chips(curr_t)
+        if chip_detections != last_chip_detections:
+            last_chip_detections = chip_detections
+            sections["chips"] = {"timestamp": time.strftime("%Y-%m-%d %H:%M:%S"), "detections": chip_detections}
+        return_detections.extend({"bbox": chip["bbox"], "label": f"P{chip['player_index']+1}: {chip['label']}",
+                                  "color": [0, 255, 0]}
+                                 for chip in chip_detections if chip["client_id"] == client_id)
+        # A cleared board ends the hand: bets are measured from the stacks as they are now.
+        if board_seen and not flop_cards:
+            accounting.new_hand()
+        board_seen = bool(flop_cards)
+        with stage_metrics.time("chip_accounting", client_id):
+            stacks = accounting.state(curr_t)
+        if stacks != last_stacks:
+            last_stacks = stacks
+            sections["stacks"] = stacks
     try:
-        calcWinner.evaluate_winner()
+        with stage_metrics.time("winner_eval", client_id):
+            winner, winner_changed = winner_evaluator.evaluate(flop_cards, player_cards)
+        if args.equity_budget_ms > 0:
+            with stage_metrics.time("equity", client_id):
+                equity_doc = compute_equity(flop_cards, player_cards)
+        else:
+            equity_doc = None
+        if winner_changed or equity_doc != last_equity:
+            last_equity = equity_doc
+            sections["winner"] = dict(winner, equity=equity_doc) if equity_doc else winner
     except Exception as e:
         print(f"Calc Winner: An unexpected error occurred: {e}")
 
+    if args.metrics_interval > 0 and curr_t - last_metrics_push >= args.metrics_interval:
+        last_metrics_push = curr_t
+        sections["metrics"] = stage_metrics.summary()
+    with stage_metrics.time("state_publish", client_id):
+        state_store.update(**sections)
+
 
 
-    return jsonify({
+    return {
         "status": "success",
         "detections": return_detections
-    })
+    }
+
 
+stream_thread = threading.Thread(target=frame_stream.serve, args=(process_stream_frame, STREAM_PORT), daemon=True)
+stream_thread.start()
 
+# HTTP/1.1 lets clients reuse one keep-alive connection instead of a handshake per frame.
+WSGIRequestHandler.protocol_version = "HTTP/1.1"
 app.run(host='0.0.0.0', port=5000, debug=False)
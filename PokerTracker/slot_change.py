@@ -0,0 +1,64 @@
+import threading
+
+import cv2
+import numpy as np
+
+
+class SlotChangeDetector:
+    """Decides per slot whether a crop differs enough from the last one sent to re-run detection.
+
+    Crops are reduced to small grayscale thumbnails and compared by mean absolute
+    difference against the thumbnail of the last crop the server actually saw.
+    A slot is re-sent anyway after ``max_unchanged`` skipped frames so the server
+    never works from a stale result for long. A threshold of 0 disables skipping.
+
+    ``check`` does not change any state; call ``commit`` once the frame has been
+    delivered, so frames dropped before reaching the server are not counted as seen.
+    The methods are safe to call from different pipeline threads.
+    """
+
+    def __init__(self, threshold=4.0, thumb_size=(16, 16), max_unchanged=30):
+        self.threshold = threshold
+        self.thumb_size = thumb_size
+        self.max_unchanged = max_unchanged
+        self._thumbs = {}
+        self._unchanged = {}
+        self._lock = threading.Lock()
+        self.sent = 0
+        self.skipped = 0
+
+    def thumbnail(self, crop):
+        gray = cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY)
+        return cv2.resize(gray, self.thumb_size, interpolation=cv2.INTER_AREA).astype(np.int16)
+
+    def check(self, key, crop):
+        """Returns (changed, thumbnail) for a crop without recording it."""
+        thumb = self.thumbnail(crop)
+        with self._lock:
+            last = self._thumbs.get(key)
+            unchanged = self._unchanged.get(key, 0)
+        if self.threshold <= 0 or last is None or unchanged >= self.max_unchanged:
+            return True, thumb
+        return float(np.mean(np.abs(thumb - last))) >= self.threshold, thumb
+
+    def commit(self, updates):
+        """Records a delivered frame: ``updates`` is a list of (key, changed, thumbnail)."""
+        with self._lock:
+            for key, changed, thumb in updates:
+                if changed:
+                    self._thumbs[key] = thumb
+                    self._unchanged[key] = 0
+                    self.sent += 1
+                else:
+                    self._unchanged[key] = self._unchanged.get(key, 0) + 1
+                    self.skipped += 1
+
+    def invalidate(self, key):
+        """Forces the next crop of ``key`` to be sent (e.g. the server lost its cached result)."""
+        with self._lock:
+            self._thumbs.pop(key, None)
+            self._unchanged.pop(key, None)
+
+    def skip_ratio(self):
+        total = self.sent + self.skipped
+        return self.skipped / total if total else 0.0
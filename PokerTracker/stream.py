@@ -1,16 +1,24 @@
-from ultralytics import YOLO
+import argparse
+import inference_backend
+import confidence_fusion
 import cv2
 import math 
 import time
 import os 
 import numpy as np
 
+parser = argparse.ArgumentParser()
+parser.add_argument('--device', default='auto', help='Device for the card model (auto, cuda, mps, cpu, ...)')
+parser.add_argument('--backend', choices=inference_backend.BACKENDS, default='auto')
+parser.add_argument('--int8', action='store_true', help='INT8-quantized model with the onnx/openvino backends')
+args = parser.parse_args()
+
 # --- Configuration Variables ---
 X = 1920
 Y = 1080
 
-# --- Confidence Boosting Multiplier ---
-CONFIDENCE_MULTIPLIER = 0.5 
+# --- Confidence Fusion (frames each region votes over) ---
+FUSION_FRAMES = confidence_fusion.FUSION_FRAMES
 
 # --- Timeout Variable (in seconds) ---
 CARD_TIMEOUT_SECONDS = 5.0 
@@ -32,7 +40,7 @@ FRAME_HEIGHT = int(cap.get(4))
 FRAME_CENTER_Y = FRAME_HEIGHT // 2
 
 # model
-model = YOLO("yolov8s_playing_cards.pt")
+model = inference_backend.load_detector("yolov8s_playing_cards.pt", args.backend, args.device, args.int8)
 
 classNames = [
     '10C', '10D', '10H', '10S', '2C', '2D', '2H', '2S', '3C', '3D', 
@@ -132,6 +140,9 @@ def update_card_set(card_set, card_name, confidence, max_size):
 
     return set_changed
 
+# Recent detections of each region, fused into one confidence per card
+region_votes = {'player': confidence_fusion.ClassVotes(FUSION_FRAMES), 'flop': confidence_fusion.ClassVotes(FUSION_FRAMES)}
+
 # Variable to track the last time a card was successfully added/updated in each set
 last_player_update_time = time.time()
 last_flop_update_time = time.time()
@@ -161,63 +172,55 @@ while True:
         last_flop_update_time = current_frame_time 
 
     # --- Temporary Storage for Current Frame Detections ---
-    current_frame_detections = {}
+    current_frame_detections = {'player': [], 'flop': []}
 
     # --- Drawing Split Line for Visualization ---
     cv2.line(img, (0, FRAME_CENTER_Y), (FRAME_WIDTH, FRAME_CENTER_Y), (255, 255, 255), 2)
     cv2.putText(img, "Player Hand (Max 2)", (10, FRAME_CENTER_Y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
     cv2.putText(img, "Flop (Max 3)", (10, FRAME_CENTER_Y + 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 0, 0), 2)
     
-    results = model(img, stream=True)
+    boxes = model.predict([img])[0]
     
     player_set_updated_this_frame = False
     flop_set_updated_this_frame = False
 
     # 1. Collect all detections in the current frame (Draws initial boxes)
-    for r in results:
-        boxes = r.boxes
-        for box in boxes:
-            x1, y1, x2, y2 = [int(x) for x in box.xyxy[0]]
-            card_center_y = (y1 + y2) // 2
-            confidence = box.conf[0].item() 
-            cls = int(box.cls[0])
-            card_name = classNames[cls]
-
-            position = 'flop' if card_center_y > FRAME_CENTER_Y else 'player'
-            box_color = (255, 0, 0) if position == 'flop' else (0, 0, 255) 
-
-            if card_name not in current_frame_detections:
-                current_frame_detections[card_name] = {'player': [], 'flop': []}
-            
-            current_frame_detections[card_name][position].append({'conf': confidence})
-            
-            # Drawing on Image (initial confidence)
-            cv2.rectangle(img, (x1, y1), (x2, y2), box_color, 3)
-            text_org = (x1, y1 - 10) 
-            cv2.putText(img, f"{card_name} ({confidence:.2f})", text_org, cv2.FONT_HERSHEY_SIMPLEX, 1, box_color, 2)
-
-
-    # 2. Process collected detections, apply confidence boost, and update permanent sets
-    for card_name, positions in current_frame_detections.items():
-        for position in ['player', 'flop']:
-            detections = positions[position]
-            count = len(detections)
-            
-            if count > 0:
-                best_detection = max(detections, key=lambda x: x['conf'])
-                initial_conf = best_detection['conf']
-                
-                # Apply the confidence boosting formula
-                boosted_conf = initial_conf * (1 + (count - 1) * CONFIDENCE_MULTIPLIER)
-                final_conf_rounded = math.ceil(min(boosted_conf, 1.0) * 100) / 100
-                
-                # Update the permanent card sets and track if a change occurred
-                if position == 'player':
-                    if update_card_set(player_cards, card_name, final_conf_rounded, PLAYER_HAND_SIZE):
-                        player_set_updated_this_frame = True
-                else:
-                    if update_card_set(flop_cards, card_name, final_conf_rounded, FLOP_HAND_SIZE):
-                        flop_set_updated_this_frame = True
+    for box in boxes:
+        x1, y1, x2, y2 = [int(x) for x in box[:4]]
+        card_center_y = (y1 + y2) // 2
+        confidence = float(box[4])
+        cls = int(box[5])
+        card_name = classNames[cls]
+
+        position = 'flop' if card_center_y > FRAME_CENTER_Y else 'player'
+        box_color = (255, 0, 0) if position == 'flop' else (0, 0, 255) 
+
+        current_frame_detections[position].append(box)
+        
+        # Drawing on Image (initial confidence)
+        cv2.rectangle(img, (x1, y1), (x2, y2), box_color, 3)
+        text_org = (x1, y1 - 10) 
+        cv2.putText(img, f"{card_name} ({confidence:.2f})", text_org, cv2.FONT_HERSHEY_SIMPLEX, 1, box_color, 2)
+
+
+    # 2. Fuse each region's detections with its recent frames and update permanent sets
+    for position, max_size in (('player', PLAYER_HAND_SIZE), ('flop', FLOP_HAND_SIZE)):
+        detections = current_frame_detections[position]
+        votes = region_votes[position]
+        votes.update(np.array(detections).reshape(-1, 6))
+        if not detections:
+            continue
+
+        for cls, conf in votes.decide(max_size, allow_dn=False):
+            final_conf_rounded = math.ceil(conf * 100) / 100
+
+            # Update the permanent card sets and track if a change occurred
+            if position == 'player':
+                if update_card_set(player_cards, classNames[cls], final_conf_rounded, PLAYER_HAND_SIZE):
+                    player_set_updated_this_frame = True
+            else:
+                if update_card_set(flop_cards, classNames[cls], final_conf_rounded, FLOP_HAND_SIZE):
+                    flop_set_updated_this_frame = True
 
     # 3. Update the last update time if any card was added/changed in this frame
     current_time_for_update = time.time()
@@ -0,0 +1,75 @@
+import sys
+import unittest
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+SCRIPT_DIR = Path(__file__).parent.absolute()
+PROJECT_ROOT = SCRIPT_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import adaptive_encoder
+
+
+class TestAdaptiveEncoder(unittest.TestCase):
+
+    def setUp(self):
+        self.encoder = adaptive_encoder.AdaptiveEncoder(target_rtt_ms=100, min_quality=40, max_quality=90,
+                                                        min_scale=0.5)
+
+    def test_slow_server_lowers_quality_before_scale(self):
+        self.encoder.observe(0.3)
+        quality, scale = self.encoder.settings()
+        self.assertLess(quality, 90)
+        self.assertEqual(scale, 1.0)
+        for _ in range(50):
+            self.encoder.observe(0.3)
+        self.assertEqual(self.encoder.settings(), (40, 0.5))
+
+    def test_fast_server_recovers_scale_then_quality(self):
+        for _ in range(50):
+            self.encoder.observe(0.3)
+        self.encoder.observe(0.01)
+        quality, scale = self.encoder.settings()
+        self.assertEqual(quality, 40)
+        self.assertGreater(scale, 0.5)
+        for _ in range(100):
+            self.encoder.observe(0.01)
+        self.assertEqual(self.encoder.settings(), (90, 1.0))
+
+    def test_low_confidence_overrides_load(self):
+        for _ in range(50):
+            self.encoder.observe(0.3)
+        self.encoder.observe(0.3, confidence=0.2)
+        self.assertGreater(self.encoder.settings()[1], 0.5)
+
+    def test_rtt_near_target_holds_settings(self):
+        self.encoder.observe(0.3)
+        before = self.encoder.settings()
+        self.encoder.observe(0.08)
+        self.assertEqual(self.encoder.settings(), before)
+
+    def test_disabled_stays_at_max(self):
+        encoder = adaptive_encoder.AdaptiveEncoder(target_rtt_ms=0, max_quality=90)
+        encoder.observe(5.0)
+        self.assertEqual(encoder.settings(), (90, 1.0))
+
+    def test_scale_capped_at_model_input(self):
+        self.assertEqual(self.encoder.scale_for((1280, 640, 3), 1.0), 0.5)
+        self.assertEqual(self.encoder.scale_for((180, 140, 3), 0.8), 0.8)
+
+    def test_encode_resizes_crop(self):
+        crop = np.random.default_rng(0).integers(0, 256, (200, 100, 3), dtype=np.uint8)
+        buffer = self.encoder.encode(crop, 80, 0.5)
+        self.assertEqual(cv2.imdecode(buffer, cv2.IMREAD_COLOR).shape, (100, 50, 3))
+
+    def test_rescale_boxes(self):
+        boxes = np.array([[10, 20, 30, 40, 0.9, 3]], dtype=np.float32)
+        out = adaptive_encoder.rescale_boxes(boxes, 0.5)
+        np.testing.assert_allclose(out[0], [20, 40, 60, 80, 0.9, 3], rtol=1e-6)
+        self.assertEqual(boxes[0, 0], 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
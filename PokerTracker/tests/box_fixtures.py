@@ -0,0 +1,8 @@
+import numpy as np
+
+# Detections as the detectors return them: (n, 6) float32 rows of [x1, y1, x2, y2, conf, cls].
+EMPTY = np.zeros((0, 6), dtype=np.float32)
+
+
+def boxes(*rows):
+    return np.array(rows, dtype=np.float32)
@@ -2,8 +2,12 @@ import json
 import os
 import unittest
 import subprocess
+import sys
 from pathlib import Path
 
+import numpy as np
+from treys import Evaluator
+
 # --- Path Management ---
 # Get the directory where calcWinnerTest.py is located
 SCRIPT_DIR = Path(__file__).parent.absolute()
@@ -15,6 +19,11 @@ FLOP_FILE = DATA_DIR / "flop_cards.json"
 PLAYER_FILE = DATA_DIR / "player_cards.json"
 WINNER_FILE = DATA_DIR / "winner.json"
 
+sys.path.insert(0, str(PROJECT_ROOT))
+import calcWinner
+import cards
+import hand_eval
+
 DEFAULT_CONF = 0.95
 DEFAULT_TS = 1773612816.0
 
@@ -136,5 +145,74 @@ class TestPokerWinner(unittest.TestCase):
             self.assertTrue(p1_result["is_winner"])
             self.assertTrue(p2_result["is_winner"])
 
+class TestWinnerEvaluator(unittest.TestCase):
+
+    def setUp(self):
+        self.evaluator = calcWinner.WinnerEvaluator(cache_size=8)
+        self.flop = format_flop(["10S", "6D", "9H", "KH", "2S"])
+        self.players = format_players({
+            "585283d0": [["10H", "9D"], ["7C", "5H"]],
+            "a90231fb": [["8S", "3D"]]
+        })
+
+    def test_matches_file_mode_result(self):
+        res, changed = self.evaluator.evaluate(self.flop, self.players)
+        self.assertTrue(changed)
+        self.assertEqual(res["winner_id"], "585283d0_0")
+        self.assertEqual(res["results"]["585283d0_0"]["hand_type"], "Two Pair")
+
+    def test_unchanged_cards_hit_cache_and_report_no_change(self):
+        self.evaluator.evaluate(self.flop, self.players)
+        misses = self.evaluator.misses
+        res, changed = self.evaluator.evaluate(self.flop, self.players)
+        self.assertFalse(changed)
+        self.assertEqual(self.evaluator.misses, misses)
+
+    def test_only_changed_player_is_rescored(self):
+        self.evaluator.evaluate(self.flop, self.players)
+        misses = self.evaluator.misses
+        players = format_players({
+            "585283d0": [["10H", "9D"], ["7C", "5H"]],
+            "a90231fb": [["KS", "KD"]]
+        })
+        res, changed = self.evaluator.evaluate(self.flop, players)
+        self.assertTrue(changed)
+        self.assertEqual(self.evaluator.misses, misses + 1)
+        self.assertEqual(res["winner_id"], "a90231fb_0")
+
+    def test_cache_is_bounded(self):
+        for card in ["2C", "3C", "4C", "5C", "7D", "8D", "JC", "QC", "AC", "AD"]:
+            players = format_players({"c": [[card, "3H"]]})
+            self.evaluator.evaluate(self.flop, players)
+        self.assertLessEqual(len(self.evaluator._scores), 8)
+
+class TestLookupEvaluator(unittest.TestCase):
+
+    def check_against_treys(self, n_cards):
+        rng = np.random.default_rng(n_cards)
+        hands = np.array([rng.choice(52, n_cards, replace=False) for _ in range(2000)])
+        treys = Evaluator()
+        expected = [treys.evaluate([cards.TREYS_CARDS[c] for c in hand[:2]],
+                                   [cards.TREYS_CARDS[c] for c in hand[2:]]) for hand in hands]
+        np.testing.assert_array_equal(hand_eval.evaluate(hands), expected)
+
+    def test_five_cards_match_treys(self):
+        self.check_against_treys(5)
+
+    def test_six_cards_match_treys(self):
+        self.check_against_treys(6)
+
+    def test_seven_cards_match_treys(self):
+        self.check_against_treys(7)
+
+    def test_extremes(self):
+        royal = [cards.card_index(c) for c in ["AS", "KS", "QS", "JS", "10S"]]
+        worst = [cards.card_index(c) for c in ["7C", "5D", "4H", "3S", "2C"]]
+        self.assertEqual(hand_eval.evaluate([royal, worst]).tolist(), [1, 7462])
+
+    def test_rejects_short_hands(self):
+        with self.assertRaises(ValueError):
+            hand_eval.evaluate([[0, 1, 2, 3]])
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
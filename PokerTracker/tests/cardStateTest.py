@@ -0,0 +1,61 @@
+import sys
+import unittest
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent.absolute()
+PROJECT_ROOT = SCRIPT_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import card_state
+from box_fixtures import EMPTY, boxes
+
+AS = card_state.CLASS_NAMES.index('AS')
+KD = card_state.CLASS_NAMES.index('KD')
+
+
+class TestCardState(unittest.TestCase):
+
+    def setUp(self):
+        self.table = card_state.CardState()
+        self.slots = [{"rect": [100, 50, 40, 60], "label": "player", "p_idx": 0, "c_idx": 0},
+                      {"rect": [300, 50, 40, 60], "label": "flop", "p_idx": 0, "c_idx": 2}]
+
+    def test_player_and_board_cards(self):
+        drawn = self.table.apply("cam", self.slots, [
+            (boxes([0, 0, 10, 10, 0.8, AS], [10, 0, 20, 10, 0.7, KD]), EMPTY, 1),
+            (boxes([1, 2, 11, 12, 0.9, KD]), EMPTY, 1),
+        ], curr_t=10.0)
+        hand = self.table.player_cards["cam"][0]
+        self.assertEqual(sorted(c['name'] for c in hand.values()), ['AS', 'KD'])
+        self.assertEqual(self.table.flop_cards[2]['name'], 'KD')
+        self.assertEqual(drawn[2]["bbox"], [301, 52, 311, 62])
+
+    def test_card_backs_mark_the_slot(self):
+        self.table.apply("cam", self.slots, [(EMPTY, boxes([0, 0, 10, 10, 0.95, 0]), 0), None], curr_t=1.0)
+        self.assertEqual(self.table.player_cards["cam"][0][0]['name'], 'DN')
+        self.assertTrue(self.table.slot_was_dn[card_state.slot_key("cam", self.slots[0])])
+
+    def test_board_card_survives_a_misread(self):
+        for t in range(4):
+            self.table.apply("cam", self.slots, [None, (boxes([0, 0, 10, 10, 0.8, AS]), EMPTY, 1)], curr_t=float(t))
+        self.table.apply("cam", self.slots, [None, (boxes([0, 0, 10, 10, 0.9, KD]), EMPTY, 1)], curr_t=4.0)
+        self.assertEqual(self.table.flop_cards[2]['name'], 'AS')
+
+    def test_tracked_labels_are_not_fused_again(self):
+        for t in range(4):
+            self.table.apply("cam", self.slots, [None, (boxes([0, 0, 10, 10, 0.8, AS]), EMPTY, 1)], curr_t=float(t),
+                             tracked=True)
+        # The track itself switched to KD; the slot follows it at the track's confidence.
+        self.table.apply("cam", self.slots, [None, (boxes([0, 0, 10, 10, 0.6, KD]), EMPTY, 2)], curr_t=4.0,
+                         tracked=True)
+        self.assertEqual(self.table.flop_cards[2]['name'], 'KD')
+        self.assertAlmostEqual(self.table.flop_cards[2]['conf'], 0.6, places=5)
+
+    def test_cards_expire(self):
+        self.table.apply("cam", self.slots, [(boxes([0, 0, 10, 10, 0.8, AS]), EMPTY, 1), None], curr_t=1.0)
+        self.table.apply("cam", self.slots, [None, None], curr_t=1.0 + card_state.CARD_TIMEOUT_SECONDS)
+        self.assertEqual(self.table.player_cards, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+SCRIPT_DIR = Path(__file__).parent.absolute()
+PROJECT_ROOT = SCRIPT_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import card_state
+import card_tracker
+from box_fixtures import EMPTY, boxes
+
+AS = card_state.CLASS_NAMES.index('AS')
+KD = card_state.CLASS_NAMES.index('KD')
+
+
+class TestMatching(unittest.TestCase):
+
+    def test_iou_matrix(self):
+        ious = card_tracker.iou_matrix(boxes([0, 0, 10, 10]), boxes([0, 0, 10, 10], [5, 0, 15, 10], [20, 20, 30, 30]))
+        np.testing.assert_allclose(ious, [[1.0, 1 / 3, 0.0]], rtol=1e-5)
+
+    def test_greedy_match_takes_best_pairs_first(self):
+        ious = np.array([[0.5, 0.9], [0.6, 0.1]])
+        self.assertEqual(card_tracker.greedy_match(ious, 0.3), [(0, 1), (1, 0)])
+        self.assertEqual(card_tracker.greedy_match(ious, 0.7), [(0, 1)])
+
+
+class TestCardTracker(unittest.TestCase):
+
+    def test_label_survives_a_misread(self):
+        tracker = card_tracker.CardTracker()
+        for t, cls in enumerate([AS, AS, AS, KD, AS]):
+            face, _ = tracker.update("slot", boxes([0, 0, 20, 30, 0.8, cls]), EMPTY, float(t))
+            self.assertEqual(int(face[0, 5]), AS)
+        self.assertEqual(tracker.stats()["tracks_created"], 1)
+        self.assertEqual(tracker.stats()["label_switches"], 0)
+
+    def test_two_cards_keep_their_tracks(self):
+        tracker = card_tracker.CardTracker()
+        tracker.update("slot", boxes([0, 0, 20, 30, 0.8, AS], [30, 0, 50, 30, 0.8, KD]), EMPTY, 0.0)
+        face, _ = tracker.update("slot", boxes([31, 1, 51, 31, 0.8, KD], [1, 1, 21, 31, 0.8, AS]), EMPTY, 1.0)
+        self.assertEqual(sorted(face[:, 5].astype(int).tolist()), sorted([AS, KD]))
+        self.assertEqual(tracker.stats()["tracks_created"], 2)
+
+    def test_detector_runs_every_n_frames(self):
+        tracker = card_tracker.CardTracker(detect_every=3)
+        self.assertTrue(tracker.due("slot"))
+        tracker.update("slot", boxes([0, 0, 20, 30, 0.8, AS]), EMPTY, 0.0)
+        schedule = []
+        for t in range(1, 7):
+            schedule.append(tracker.due("slot"))
+            if schedule[-1]:
+                tracker.update("slot", boxes([0, 0, 20, 30, 0.8, AS]), EMPTY, float(t))
+            else:
+                face, _ = tracker.propagate("slot", float(t))
+                self.assertEqual(int(face[0, 5]), AS)
+        self.assertEqual(schedule, [False, False, True, False, False, True])
+        self.assertEqual(tracker.stats()["detector_runs"], 3)
+
+    def test_empty_slots_are_always_detected(self):
+        tracker = card_tracker.CardTracker(detect_every=5)
+        tracker.update("slot", EMPTY, EMPTY, 0.0)
+        self.assertTrue(tracker.due("slot"))
+
+    def test_moving_card_is_propagated(self):
+        tracker = card_tracker.CardTracker(detect_every=10)
+        for t in range(4):
+            last, _ = tracker.update("slot", boxes([10 * t, 0, 10 * t + 20, 30, 0.9, AS]), EMPTY, float(t))
+        face, _ = tracker.propagate("slot", 4.0)
+        self.assertGreater(face[0, 0], last[0, 0] + 5)
+
+    def test_lost_tracks_end(self):
+        tracker = card_tracker.CardTracker()
+        tracker.update("slot", boxes([0, 0, 20, 30, 0.8, AS]), EMPTY, 0.0)
+        for t in range(1, 4):
+            face, _ = tracker.update("slot", EMPTY, EMPTY, float(t))
+            self.assertEqual(len(face), 0)
+        self.assertEqual(tracker.slots["slot"].tracks, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
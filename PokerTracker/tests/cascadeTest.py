@@ -0,0 +1,49 @@
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+SCRIPT_DIR = Path(__file__).parent.absolute()
+PROJECT_ROOT = SCRIPT_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import cascade
+
+BOX = np.array([[0, 0, 10, 10, 0.9, 1]], dtype=np.float32)
+
+
+def fake_model(hits, calls):
+    """Detects a box on every crop whose name is in ``hits`` and records what it saw."""
+    def run(crops):
+        calls.append(list(crops))
+        return [BOX if c in hits else cascade.EMPTY_BOXES for c in crops]
+    return run
+
+
+class TestCascade(unittest.TestCase):
+
+    def test_back_model_only_sees_faceless_crops(self):
+        face_calls, back_calls = [], []
+        items = [("ace", False), ("felt", False), ("back", False)]
+        results = cascade.run_cascade(items, fake_model({"ace"}, face_calls), fake_model({"back"}, back_calls))
+
+        self.assertEqual(face_calls, [["ace", "felt", "back"]])
+        self.assertEqual(back_calls, [["felt", "back"]])
+        self.assertEqual(len(results[0][0]), 1)
+        self.assertEqual(len(results[2][1]), 1)
+        self.assertEqual([r[2] for r in results], [1, 0, 0])
+
+    def test_back_first_slots_skip_face_model(self):
+        face_calls, back_calls = [], []
+        items = [("back", True), ("ace", True)]
+        results = cascade.run_cascade(items, fake_model({"ace"}, face_calls), fake_model({"back"}, back_calls))
+
+        self.assertEqual(back_calls, [["back", "ace"]])
+        self.assertEqual(face_calls, [["ace"]])
+        self.assertEqual(len(results[0][1]), 1)
+        self.assertEqual(len(results[1][0]), 1)
+        self.assertEqual([r[2] for r in results], [1, 0])
+
+if __name__ == "__main__":
+    unittest.main()
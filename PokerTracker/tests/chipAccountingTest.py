@@ -0,0 +1,104 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent.absolute()
+PROJECT_ROOT = SCRIPT_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import chip_accounting
+
+
+def chips(**counts):
+    """detected_chips.json entries for ``red=3, blue=1`` and so on."""
+    return [{"label": label, "confidence": 0.9} for label, n in counts.items() for _ in range(n)]
+
+
+class TestStackWindow(unittest.TestCase):
+
+    def test_flicker_is_smoothed(self):
+        window = chip_accounting.StackWindow(window=5)
+        for counts in ({"red": 4}, {"red": 4}, {"red": 3}, {"red": 4}, {"red": 4, "blue": 1}):
+            window.add(counts)
+        self.assertEqual(window.counts(), {"red": 4})
+
+    def test_running_sums_drop_old_observations(self):
+        window = chip_accounting.StackWindow(window=3)
+        for counts in ({"red": 2}, {"red": 2}, {"red": 2}, {"blue": 1}, {"blue": 1}, {"blue": 1}):
+            window.add(counts)
+        self.assertEqual(dict(window.sums), {"blue": 3})
+        self.assertEqual(len(window.history), 3)
+        self.assertEqual(window.counts(), {"blue": 1})
+
+
+class TestChipAccounting(unittest.TestCase):
+
+    def setUp(self):
+        self.accounting = chip_accounting.ChipAccounting(window=3)
+
+    def feed(self, player, frames, **counts):
+        for _ in range(frames):
+            self.accounting.observe(player, chips(**counts))
+
+    def test_stack_value_per_player(self):
+        self.feed("cam_0", 3, red=2, green=1, black=1)
+        self.feed("cam_1", 2, white=5)
+        state = self.accounting.state()
+        self.assertEqual(state["players"]["cam_0"], {"counts": {"black": 1, "green": 1, "red": 2},
+                                                     "value": 135, "committed": 0})
+        # Window not full yet: no stack for cam_1.
+        self.assertNotIn("cam_1", state["players"])
+
+    def test_bets_go_to_the_pot(self):
+        self.feed("cam_0", 3, red=4)
+        self.feed("cam_1", 3, blue=2)
+        self.accounting.state()
+        self.feed("cam_0", 3, red=2)
+        state = self.accounting.state()
+        self.assertEqual(state["players"]["cam_0"]["committed"], 10)
+        self.assertEqual((state["pot"], state["pot_delta"]), (10, 10))
+        self.feed("cam_1", 3, blue=1)
+        state = self.accounting.state()
+        self.assertEqual((state["pot"], state["pot_delta"]), (20, 10))
+        # No change: the last delta stays.
+        self.assertEqual(self.accounting.state()["pot_delta"], 10)
+
+    def test_one_bad_frame_is_not_a_bet(self):
+        accounting = chip_accounting.ChipAccounting()
+        for _ in range(chip_accounting.STACK_WINDOW):
+            accounting.observe("cam_0", chips(red=4))
+        accounting.state()
+        accounting.observe("cam_0", [])
+        self.assertEqual(accounting.state()["pot"], 0)
+
+    def test_new_hand_resets_bets(self):
+        self.feed("cam_0", 3, red=4)
+        self.accounting.state()
+        self.feed("cam_0", 3, red=1)
+        self.assertEqual(self.accounting.state()["pot"], 15)
+        self.accounting.new_hand()
+        state = self.accounting.state()
+        self.assertEqual((state["pot"], state["players"]["cam_0"]["committed"]), (0, 0))
+
+    def test_players_expire(self):
+        accounting = chip_accounting.ChipAccounting(window=1, timeout=5)
+        accounting.observe("cam_0", chips(red=1), curr_t=1.0)
+        self.assertIn("cam_0", accounting.state(curr_t=2.0)["players"])
+        self.assertEqual(accounting.state(curr_t=6.0)["players"], {})
+
+    def test_values_file_and_numeric_labels(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "values.json")
+            with open(path, "w") as f:
+                json.dump({"Red": 2.5}, f)
+            values = chip_accounting.load_chip_values(path)
+        self.assertEqual(chip_accounting.chip_value("red", values), 2.5)
+        self.assertEqual(chip_accounting.chip_value("25", values), 25)
+        self.assertEqual(chip_accounting.chip_value("mystery", values), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
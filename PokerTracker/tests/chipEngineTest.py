@@ -0,0 +1,82 @@
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+SCRIPT_DIR = Path(__file__).parent.absolute()
+PROJECT_ROOT = SCRIPT_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import chip_engine
+from box_fixtures import boxes
+
+
+class CountingDetector:
+    """Finds one chip in the top-left corner of every image and counts predict calls."""
+
+    names = {0: "red", 1: "blue"}
+
+    def __init__(self):
+        self.calls = []
+
+    def predict(self, images, conf=0.25, imgsz=None):
+        self.calls.append(len(images))
+        return [boxes([0, 0, 10, 10, 0.8, 0]) for _ in images]
+
+
+class TestSlicing(unittest.TestCase):
+
+    def test_small_roi_is_one_tile(self):
+        self.assertEqual(chip_engine.slice_rects(100, 80, 160), [(0, 0, 100, 80)])
+        self.assertEqual(chip_engine.slice_rects(400, 300, 0), [(0, 0, 400, 300)])
+
+    def test_tiles_cover_the_roi(self):
+        rects = chip_engine.slice_rects(300, 100, 160, overlap=0.2)
+        self.assertEqual(rects, [(0, 0, 160, 100), (128, 0, 160, 100), (140, 0, 160, 100)])
+        self.assertEqual(max(x + w for x, _, w, _ in rects), 300)
+
+
+class TestMergeBoxes(unittest.TestCase):
+
+    def test_nmm_joins_a_chip_cut_by_a_tile_edge(self):
+        merged = chip_engine.merge_boxes(boxes([0, 0, 20, 20, 0.9, 1], [10, 0, 40, 20, 0.6, 1]))
+        self.assertEqual(merged.tolist(), [[0, 0, 40, 20, np.float32(0.9), 1]])
+
+    def test_nms_keeps_the_best_box(self):
+        merged = chip_engine.merge_boxes(boxes([10, 0, 40, 20, 0.6, 1], [0, 0, 20, 20, 0.9, 1]), mode="nms")
+        self.assertEqual(merged[:, :4].tolist(), [[0, 0, 20, 20]])
+
+    def test_other_classes_are_not_merged(self):
+        merged = chip_engine.merge_boxes(boxes([0, 0, 20, 20, 0.9, 1], [0, 0, 20, 20, 0.8, 0]))
+        self.assertEqual(len(merged), 2)
+
+
+class TestChipEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.detector = CountingDetector()
+
+    def test_all_zones_in_one_predict_call(self):
+        engine = chip_engine.ChipEngine(self.detector)
+        rois = [np.zeros((50, 60, 3), np.uint8) for _ in range(6)]
+        found = engine.detect(rois)
+        self.assertEqual(self.detector.calls, [6])
+        self.assertEqual([len(b) for b in found], [1] * 6)
+
+    def test_sliced_boxes_are_shifted_into_the_roi(self):
+        engine = chip_engine.ChipEngine(self.detector, slice_size=100, overlap=0.0)
+        found = engine.detect([np.zeros((100, 200, 3), np.uint8), None])
+        self.assertEqual(self.detector.calls, [2])
+        self.assertEqual(sorted(found[0][:, 0].tolist()), [0, 100])
+        self.assertEqual(len(found[1]), 0)
+
+    def test_chip_records_are_in_frame_pixels(self):
+        engine = chip_engine.ChipEngine(self.detector)
+        records = chip_engine.chip_records(engine, boxes([1, 2, 11, 12, 0.75, 1]), (100, 50, 40, 40), 3)
+        self.assertEqual(records, [{"player_index": 3, "zone_index": 0, "label": "blue",
+                                    "confidence": 0.75, "bbox": [101, 52, 111, 62]}])
+
+
+if __name__ == "__main__":
+    unittest.main()
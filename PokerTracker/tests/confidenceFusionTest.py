@@ -0,0 +1,77 @@
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+SCRIPT_DIR = Path(__file__).parent.absolute()
+PROJECT_ROOT = SCRIPT_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import card_state
+import confidence_fusion
+from box_fixtures import EMPTY, boxes
+
+AS = card_state.CLASS_NAMES.index('AS')
+KD = card_state.CLASS_NAMES.index('KD')
+QH = card_state.CLASS_NAMES.index('QH')
+
+
+def card(cls, conf):
+    return [0, 0, 10, 10, conf, cls]
+
+
+class TestConfidenceFusion(unittest.TestCase):
+
+    def test_duplicate_boxes_combine_as_noisy_or(self):
+        evidence = confidence_fusion.frame_evidence([AS, AS, KD], [0.6, 0.5, 0.7])
+        self.assertAlmostEqual(evidence[AS], 0.8)
+        self.assertAlmostEqual(evidence[KD], 0.7)
+        self.assertEqual(evidence.shape, (confidence_fusion.N_CLASSES,))
+        self.assertEqual(np.count_nonzero(evidence), 2)
+
+    def test_first_frame_is_taken_as_is(self):
+        votes = confidence_fusion.ClassVotes(frames=5)
+        votes.update(boxes(card(AS, 0.7)))
+        self.assertEqual(votes.decide(), [(AS, votes.fused[AS])])
+        self.assertAlmostEqual(votes.fused[AS], 0.7)
+
+    def test_one_misread_does_not_flip_the_card(self):
+        votes = confidence_fusion.ClassVotes(frames=5)
+        for _ in range(5):
+            votes.update(boxes(card(AS, 0.8)))
+        votes.update(boxes(card(QH, 0.9)))
+        self.assertEqual(votes.decide(), [(AS, votes.fused[AS])])
+
+    def test_low_threshold_noise_stays_below_the_decision(self):
+        # A detector run at a low threshold: the card at 0.45, and a different
+        # spurious class at 0.3 most frames.
+        votes = confidence_fusion.ClassVotes(frames=5)
+        rng = np.random.default_rng(0)
+        for i in range(30):
+            votes.update(boxes(card(AS, 0.45), card(int(rng.integers(0, 52)), 0.3)))
+        self.assertEqual([c for c, _ in votes.decide(2)], [AS])
+
+    def test_card_backs_vote_as_dn(self):
+        votes = confidence_fusion.ClassVotes()
+        votes.update(EMPTY, boxes(card(0, 0.9), card(0, 0.85)))
+        self.assertEqual(votes.top(), confidence_fusion.DN_CLASS)
+        self.assertEqual(votes.backs, 2)
+        self.assertEqual(votes.decide(allow_dn=False), [])
+
+    def test_fused_confidence_fades_without_detections(self):
+        votes = confidence_fusion.ClassVotes(frames=5)
+        votes.update(boxes(card(AS, 0.9)))
+        for _ in range(5):
+            votes.update(EMPTY)
+        self.assertEqual(votes.decide(), [])
+
+    def test_one_frame_window_follows_the_detector(self):
+        votes = confidence_fusion.ClassVotes(frames=1)
+        votes.update(boxes(card(AS, 0.9)))
+        votes.update(boxes(card(KD, 0.5)))
+        self.assertEqual(votes.decide(2), [(KD, 0.5)])
+
+
+if __name__ == "__main__":
+    unittest.main()
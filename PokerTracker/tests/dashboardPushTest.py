@@ -0,0 +1,38 @@
+import sys
+import unittest
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent.absolute()
+PROJECT_ROOT = SCRIPT_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import dashboard
+import game_state
+
+
+class TestStateDiff(unittest.TestCase):
+
+    def test_only_changed_sections_and_keys(self):
+        prev = {"flop_cards": {"0": "AS", "1": "KD"}, "winner": {"winner_id": None}}
+        curr = {"flop_cards": {"0": "AS", "2": "QH"}, "winner": {"winner_id": None}}
+        self.assertEqual(dashboard.state_diff(prev, curr),
+                         {"flop_cards": {"set": {"2": "QH"}, "del": ["1"]}})
+
+    def test_feed_shares_encoded_diff_between_viewers(self):
+        store = game_state.GameStateStore(flop_cards={})
+        feed = dashboard.EventFeed(store)
+        version, state, _ = feed.snapshot_message()
+        store.update(flop_cards={"0": "AS"})
+
+        first = feed.next_message(version, state, timeout=1)
+        second = feed.next_message(version, state, timeout=1)
+        self.assertIs(first[2], second[2])
+        self.assertIn(b"event: diff", first[2])
+
+    def test_feed_times_out_without_changes(self):
+        feed = dashboard.EventFeed(game_state.GameStateStore(flop_cards={}))
+        version, state, _ = feed.snapshot_message()
+        self.assertIsNone(feed.next_message(version, state, timeout=0.01)[2])
+
+if __name__ == "__main__":
+    unittest.main()
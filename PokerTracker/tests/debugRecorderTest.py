@@ -0,0 +1,90 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+SCRIPT_DIR = Path(__file__).parent.absolute()
+PROJECT_ROOT = SCRIPT_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import debug_recorder
+
+
+def crop():
+    return np.full((40, 30, 3), 128, dtype=np.uint8)
+
+
+class TestDebugRecorder(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = os.path.join(self.tmp.name, "debug_crops")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def files(self):
+        return sorted(os.path.relpath(os.path.join(root, n), self.dir)
+                      for root, _, names in os.walk(self.dir) for n in names if n.endswith(".jpg"))
+
+    def test_disabled_by_default(self):
+        recorder = debug_recorder.DebugRecorder(self.dir).start()
+        self.assertFalse(recorder.enabled)
+        self.assertFalse(os.path.exists(self.dir))
+
+    def test_sample_rate_picks_that_fraction_of_frames(self):
+        recorder = debug_recorder.DebugRecorder(self.dir, sample_rate=0.25)
+        picked = [recorder.sample_frame("a") for _ in range(100)]
+        self.assertEqual(sum(picked), 25)
+        self.assertEqual(sum(recorder.sample_frame("b") for _ in range(4)), 1)
+
+    def test_low_confidence_slots_are_wanted(self):
+        recorder = debug_recorder.DebugRecorder(self.dir, low_conf=0.6)
+        self.assertTrue(recorder.wants(False, 0.5))
+        self.assertFalse(recorder.wants(False, 0.9))
+        self.assertFalse(recorder.wants(False, None))
+        self.assertTrue(recorder.wants(True, 0.9))
+
+    def test_files_are_namespaced_and_indexed(self):
+        recorder = debug_recorder.DebugRecorder(self.dir, sample_rate=1.0).start()
+        recorder.record("cam/1", 7, "player_0_1", crop(), 0.42)
+        self.assertTrue(recorder.flush())
+        self.assertEqual(self.files(), [os.path.join("cam_1", "00000007_player_0_1.jpg")])
+        with open(os.path.join(self.dir, debug_recorder.INDEX_FILE)) as f:
+            index = json.load(f)
+        self.assertEqual(index[0]["path"], "debug_crops/cam_1/00000007_player_0_1.jpg")
+        self.assertEqual(index[0]["conf"], 0.42)
+
+    def test_ring_buffer_deletes_oldest(self):
+        recorder = debug_recorder.DebugRecorder(self.dir, sample_rate=1.0, max_files=3).start()
+        for frame_id in range(5):
+            recorder.record("c", frame_id, "flop_0_0", crop())
+        recorder.flush()
+        self.assertEqual(self.files(), [os.path.join("c", f"{i:08d}_flop_0_0.jpg") for i in (2, 3, 4)])
+
+    def test_rewritten_path_is_not_deleted_as_old(self):
+        recorder = debug_recorder.DebugRecorder(self.dir, sample_rate=1.0, max_files=2).start()
+        recorder.record("c", 1, "flop_0_0", crop())
+        recorder.record("c", 2, "flop_0_0", crop())
+        # The client restarted and its frame ids begin again.
+        recorder.record("c", 1, "flop_0_0", crop())
+        recorder.record("c", 3, "flop_0_0", crop())
+        self.assertTrue(recorder.flush())
+        self.assertEqual(self.files(), [os.path.join("c", f"{i:08d}_flop_0_0.jpg") for i in (1, 3)])
+        with open(os.path.join(self.dir, debug_recorder.INDEX_FILE)) as f:
+            paths = [entry["path"] for entry in json.load(f)]
+        self.assertEqual(paths, ["debug_crops/c/00000003_flop_0_0.jpg", "debug_crops/c/00000001_flop_0_0.jpg"])
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        recorder = debug_recorder.DebugRecorder(self.dir, sample_rate=1.0, queue_size=2)
+        for frame_id in range(5):
+            recorder.record("c", frame_id, "flop_0_0", crop())
+        self.assertEqual(recorder.dropped, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import sys
+import time
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+SCRIPT_DIR = Path(__file__).parent.absolute()
+PROJECT_ROOT = SCRIPT_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import card_state
+import deck_solver
+from box_fixtures import EMPTY, boxes
+
+AS = card_state.CLASS_NAMES.index('AS')
+KD = card_state.CLASS_NAMES.index('KD')
+QH = card_state.CLASS_NAMES.index('QH')
+
+
+class TestSolve(unittest.TestCase):
+
+    def test_distinct_cards_are_kept(self):
+        candidates = [(("flop", 0), [("AS", 0.9)]), (("flop", 1), [("KD", 0.8), ("AS", 0.3)])]
+        assignment = deck_solver.solve(candidates)
+        self.assertEqual(assignment, {("flop", 0): ("AS", 0.9), ("flop", 1): ("KD", 0.8)})
+        self.assertEqual(deck_solver.find_conflicts(candidates, assignment), {})
+
+    def test_loser_falls_back_on_its_next_candidate(self):
+        candidates = [(("flop", 2), [("AS", 0.9)]),
+                      (("player", "cam", 0, 0), [("AS", 0.6), ("KD", 0.5)])]
+        assignment = deck_solver.solve(candidates)
+        self.assertEqual(assignment[("player", "cam", 0, 0)], ("KD", 0.5))
+        self.assertEqual(deck_solver.find_conflicts(candidates, assignment),
+                         {"AS": {"claims": ["flop/2", "cam_0/0"], "kept": "flop/2",
+                                 "reassigned": {"cam_0/0": "KD"}}})
+
+    def test_repair_beats_greedy(self):
+        # Greedy gives AS to the first position and leaves the second empty (0.9);
+        # moving the first to KD lets both keep a card (0.8 + 0.85).
+        candidates = [(("flop", 0), [("AS", 0.9), ("KD", 0.8)]),
+                      (("player", "cam", 1, 0), [("AS", 0.85)])]
+        assignment = deck_solver.solve(candidates)
+        self.assertEqual(assignment, {("flop", 0): ("KD", 0.8), ("player", "cam", 1, 0): ("AS", 0.85)})
+
+    def test_ten_players_per_frame(self):
+        rng = np.random.default_rng(0)
+        names = card_state.CLASS_NAMES
+        candidates = [(("player", "cam", p, i), [(names[int(c)], float(rng.uniform(0.3, 1.0)))
+                                                 for c in rng.choice(20, 3, replace=False)])
+                      for p in range(10) for i in range(2)]
+        candidates += [(("flop", c), [(names[int(rng.integers(0, 20))], 0.7)]) for c in range(5)]
+        start = time.perf_counter()
+        for _ in range(20):
+            assignment = deck_solver.solve(candidates)
+        self.assertLess((time.perf_counter() - start) / 20, 0.02)
+        cards = [a[0] for a in assignment.values() if a]
+        self.assertEqual(len(cards), len(set(cards)))
+
+
+class TestResolve(unittest.TestCase):
+
+    def setUp(self):
+        self.table = card_state.CardState()
+        self.slots = [{"rect": [100, 50, 40, 60], "label": "player", "p_idx": 0, "c_idx": 0},
+                      {"rect": [300, 50, 40, 60], "label": "flop", "p_idx": 0, "c_idx": 1}]
+
+    def read_hand_and_board(self):
+        self.table.apply("cam", self.slots, [
+            (boxes([0, 0, 10, 10, 0.5, AS], [10, 0, 20, 10, 0.4, QH], [20, 0, 30, 10, 0.35, KD]), EMPTY, 1),
+            (boxes([0, 0, 10, 10, 0.9, AS]), EMPTY, 1),
+        ], curr_t=1.0)
+
+    def test_card_in_hand_and_on_board(self):
+        self.read_hand_and_board()
+        player_cards, flop_cards, conflicts = deck_solver.resolve(self.table)
+        self.assertEqual(flop_cards[1]['name'], 'AS')
+        self.assertEqual(sorted(c['name'] for c in player_cards["cam"][0].values()), ['KD', 'QH'])
+        self.assertEqual(conflicts, {"AS": {"claims": ["cam_0/0", "flop/1"], "kept": "flop/1",
+                                            "reassigned": {"cam_0/0": "KD"}}})
+        # The table keeps what was read.
+        self.assertEqual(self.table.player_cards["cam"][0][0]['name'], 'AS')
+
+    def test_fallback_taken_by_another_client(self):
+        self.read_hand_and_board()
+        self.table.apply("cam2", self.slots[:1], [(boxes([0, 0, 10, 10, 0.7, KD]), EMPTY, 1)], curr_t=1.0)
+        player_cards, _, conflicts = deck_solver.resolve(self.table)
+        self.assertEqual(player_cards["cam2"][0][0]['name'], 'KD')
+        self.assertEqual([c['name'] for c in player_cards["cam"][0].values()], ['QH'])
+        self.assertEqual(conflicts["AS"]["reassigned"], {"cam_0/0": None})
+
+    def test_client_left_without_cards_is_dropped(self):
+        self.read_hand_and_board()
+        self.table.apply("cam2", self.slots[:1], [(boxes([0, 0, 10, 10, 0.6, AS]), EMPTY, 1)], curr_t=1.0)
+        player_cards, _, conflicts = deck_solver.resolve(self.table)
+        self.assertNotIn("cam2", player_cards)
+        self.assertEqual(conflicts["AS"]["reassigned"]["cam2_0/0"], None)
+
+    def test_card_backs_are_not_deck_cards(self):
+        self.table.apply("cam", self.slots[:1], [(EMPTY, boxes([0, 0, 10, 10, 0.9, 0], [10, 0, 20, 10, 0.9, 0]), 0)],
+                         curr_t=1.0)
+        self.table.apply("cam2", self.slots[:1], [(EMPTY, boxes([0, 0, 10, 10, 0.9, 0]), 0)], curr_t=1.0)
+        player_cards, _, conflicts = deck_solver.resolve(self.table)
+        self.assertEqual(player_cards["cam"][0][1]['name'], 'DN')
+        self.assertEqual(player_cards["cam2"][0][0]['name'], 'DN')
+        self.assertEqual(conflicts, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
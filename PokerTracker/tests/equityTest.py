@@ -0,0 +1,72 @@
+import sys
+import unittest
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent.absolute()
+PROJECT_ROOT = SCRIPT_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import equity
+
+AA_KK = {"a": ("AS", "AD"), "b": ("KS", "KD")}
+
+
+class TestEquityCalculator(unittest.TestCase):
+
+    def setUp(self):
+        self.calc = equity.EquityCalculator(budget_ms=5000, max_samples=5000)
+
+    def test_river_is_decided(self):
+        res = self.calc.compute(["2C", "7H", "9D", "KH", "3S"], AA_KK)
+        self.assertEqual(res["b"]["win"], 100.0)
+        self.assertEqual(res["a"]["win"], 0.0)
+        self.assertTrue(res["a"]["exact"])
+
+    def test_turn_enumerates_every_river(self):
+        res = self.calc.compute(["2C", "7H", "9D", "KH"], AA_KK)
+        self.assertEqual(res["a"]["samples"], 44)
+        # Only the two remaining aces save AA.
+        self.assertAlmostEqual(res["a"]["win"], 100 * 2 / 44, places=1)
+
+    def test_flop_is_exact(self):
+        res = self.calc.compute(["2C", "7H", "9D"], AA_KK)
+        self.assertTrue(res["a"]["exact"])
+        self.assertEqual(res["a"]["samples"], 990)
+        self.assertAlmostEqual(res["a"]["win"] + res["b"]["win"] + res["a"]["tie"], 100.0, delta=0.2)
+
+    def test_preflop_monte_carlo(self):
+        res = self.calc.compute([], AA_KK)
+        self.assertFalse(res["a"]["exact"])
+        self.assertGreaterEqual(res["a"]["samples"], 5000)
+        self.assertAlmostEqual(res["a"]["win"], 81.9, delta=2.5)
+
+    def test_unknown_opponents(self):
+        res = self.calc.compute(["2C", "7H", "9D"], {"a": ("AS", "AD")}, n_unknown=1)
+        self.assertFalse(res["a"]["exact"])
+        self.assertGreater(res["a"]["win"], 75.0)
+
+    def test_refines_across_calls(self):
+        calc = equity.EquityCalculator(budget_ms=0.001, max_samples=5000, chunk=64)
+        first = calc.compute([], AA_KK)["a"]["samples"]
+        second = calc.compute([], AA_KK)["a"]["samples"]
+        self.assertGreater(second, first)
+
+    def test_one_pool_batch_outstanding(self):
+        calc = equity.EquityCalculator(budget_ms=0.001, max_samples=10 ** 6, chunk=2000, workers=2,
+                                       parallel_min_players=2, mp_context="fork")
+        try:
+            for _ in range(20):
+                calc.compute([], AA_KK)
+                self.assertLessEqual(len(calc._pool._cache), 1)
+            calc.budget = 5.0
+            self.assertGreater(calc.compute([], AA_KK)["a"]["samples"], 0)
+        finally:
+            calc.close()
+
+    def test_inconsistent_cards(self):
+        self.assertEqual(self.calc.compute(["AS", "7H", "9D"], AA_KK), {})
+        self.assertEqual(self.calc.compute([], {"a": ("AS", "AD")}), {})
+        self.assertEqual(self.calc.compute([], {"a": ("XX", "AD"), "b": ("KS", "KD")}), {})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import sys
+import unittest
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+SCRIPT_DIR = Path(__file__).parent.absolute()
+PROJECT_ROOT = SCRIPT_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import frame_codec
+
+
+def make_crop(seed, w=120, h=160):
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 255, (h, w, 3), dtype=np.uint8)
+
+
+class TestFrameCodec(unittest.TestCase):
+
+    def test_round_trip(self):
+        crops = [make_crop(i) for i in range(3)]
+        buffers = [cv2.imencode('.png', c)[1] for c in crops]
+        slots = [{"rect": [0, 0, 120, 160], "label": "player", "p_idx": i, "c_idx": 0} for i in range(3)]
+
+        body = frame_codec.encode_frame({"client_id": "abc", "slots": slots}, buffers)
+        header, views = frame_codec.decode_frame(body)
+
+        self.assertEqual(header["client_id"], "abc")
+        self.assertEqual(header["slots"], slots)
+        decoded = frame_codec.decode_crops(views)
+        for original, restored in zip(crops, decoded):
+            self.assertTrue(np.array_equal(original, restored))
+
+    def test_empty_frame(self):
+        body = frame_codec.encode_frame({"client_id": "abc", "slots": []}, [])
+        header, views = frame_codec.decode_frame(body)
+        self.assertEqual(views, [])
+
+    def test_truncated_body_rejected(self):
+        buffers = [cv2.imencode('.jpg', make_crop(0))[1]]
+        body = frame_codec.encode_frame({"client_id": "abc", "slots": [{}]}, buffers)
+        with self.assertRaises(ValueError):
+            frame_codec.decode_frame(body[:-10])
+        with self.assertRaises(ValueError):
+            frame_codec.decode_frame(body[:2])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import socket
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent.absolute()
+PROJECT_ROOT = SCRIPT_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import frame_codec
+import frame_stream
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class TestFrameStream(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.release = threading.Event()
+        cls.release.set()
+
+        def handle(body):
+            header, _ = frame_codec.decode_frame(body)
+            if header.get("fail"):
+                raise ValueError("bad frame")
+            cls.release.wait(5)
+            return {"status": "success", "frame_id": header["frame_id"]}
+
+        cls.port = free_port()
+        threading.Thread(target=frame_stream.serve, args=(handle, cls.port, "127.0.0.1"), daemon=True).start()
+        time.sleep(0.2)
+
+    def wait_for(self, predicate, timeout=5):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if predicate():
+                return True
+            time.sleep(0.01)
+        return False
+
+    def test_pipelined_responses_keyed_by_frame(self):
+        client = frame_stream.FrameStreamClient("127.0.0.1", self.port, max_inflight=3)
+        for frame_id in (1, 2, 3):
+            self.assertTrue(client.submit(frame_id, frame_codec.encode_frame({"frame_id": frame_id}, [])))
+        self.assertTrue(self.wait_for(lambda: client.latest() and client.latest()["frame_id"] == 3))
+        self.assertEqual(client.inflight(), 0)
+        client.close()
+
+    def test_window_full_does_not_block(self):
+        client = frame_stream.FrameStreamClient("127.0.0.1", self.port, max_inflight=1)
+        self.release.clear()
+        try:
+            self.assertTrue(client.submit(1, frame_codec.encode_frame({"frame_id": 1}, [])))
+            self.assertFalse(client.submit(2, frame_codec.encode_frame({"frame_id": 2}, [])))
+        finally:
+            self.release.set()
+        self.assertTrue(self.wait_for(lambda: client.inflight() == 0))
+        client.close()
+
+    def test_wait_for_room_returns_once_response_arrives(self):
+        client = frame_stream.FrameStreamClient("127.0.0.1", self.port, max_inflight=1)
+        self.release.clear()
+        try:
+            self.assertTrue(client.submit(1, frame_codec.encode_frame({"frame_id": 1}, [])))
+            self.assertFalse(client.wait_for_room(0.05))
+        finally:
+            self.release.set()
+        self.assertTrue(client.wait_for_room(5))
+        self.assertTrue(client.submit(2, frame_codec.encode_frame({"frame_id": 2}, [])))
+        client.close()
+
+    def test_error_reply_frees_the_window(self):
+        client = frame_stream.FrameStreamClient("127.0.0.1", self.port, max_inflight=1)
+        self.assertTrue(client.submit(1, frame_codec.encode_frame({"frame_id": 1, "fail": True}, [])))
+        self.assertTrue(self.wait_for(lambda: client.latest() is not None))
+        self.assertEqual(client.latest(), {"status": "error", "error": "bad frame", "frame_id": 1})
+        self.assertEqual(client.inflight(), 0)
+        client.close()
+
+    def test_lost_reply_expires(self):
+        client = frame_stream.FrameStreamClient("127.0.0.1", self.port, max_inflight=1, reply_timeout=0.1)
+        self.release.clear()
+        try:
+            self.assertTrue(client.submit(1, frame_codec.encode_frame({"frame_id": 1}, [])))
+            self.assertFalse(client.submit(2, frame_codec.encode_frame({"frame_id": 2}, [])))
+            self.assertTrue(client.wait_for_room(2))
+            self.assertEqual(client.inflight(), 0)
+        finally:
+            self.release.set()
+        client.close()
+
+    def test_unreachable_server(self):
+        client = frame_stream.FrameStreamClient("127.0.0.1", free_port())
+        self.assertFalse(client.submit(1, b""))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import json
+import sys
+import tempfile
+import time
+import threading
+import unittest
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent.absolute()
+PROJECT_ROOT = SCRIPT_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import game_state
+
+
+class TestGameStateStore(unittest.TestCase):
+
+    def test_update_bumps_version_once(self):
+        store = game_state.GameStateStore(player_cards={}, flop_cards={})
+        self.assertEqual(store.update(player_cards={"a": 1}, flop_cards={"0": 2}), 1)
+        self.assertEqual(store.section_versions(), {"player_cards": 1, "flop_cards": 1})
+        store.update(flop_cards={})
+        self.assertEqual(store.section_versions(), {"player_cards": 1, "flop_cards": 2})
+
+    def test_snapshots_are_isolated_from_caller_mutation(self):
+        store = game_state.GameStateStore()
+        cards = {"c1": {0: {0: {"name": "AS"}}}}
+        store.update(player_cards=cards)
+        _, before = store.snapshot()
+        cards["c1"][0][0]["name"] = "KS"
+        self.assertEqual(before["player_cards"]["c1"][0][0]["name"], "AS")
+        self.assertEqual(store.get("player_cards")["c1"][0][0]["name"], "AS")
+
+    def test_wait_for_change(self):
+        store = game_state.GameStateStore(flop_cards={})
+        threading.Timer(0.05, store.update, kwargs={"flop_cards": {"0": "AS"}}).start()
+        version, state = store.wait_for_change(0, timeout=2)
+        self.assertEqual(version, 1)
+        self.assertEqual(state["flop_cards"], {"0": "AS"})
+
+
+class TestSnapshotWriter(unittest.TestCase):
+
+    def test_writes_changed_sections_atomically(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            files = {"flop_cards": f"{tmp}/flop_cards.json", "winner": f"{tmp}/winner.json"}
+            store = game_state.GameStateStore(flop_cards={}, winner={})
+            writer = game_state.SnapshotWriter(store, files)
+
+            store.update(flop_cards={0: {"name": "AS"}})
+            writer.flush()
+            with open(files["flop_cards"]) as f:
+                self.assertEqual(json.load(f), {"0": {"name": "AS"}})
+
+            mtime = Path(files["winner"]).stat().st_mtime_ns
+            store.update(flop_cards={})
+            writer.flush()
+            self.assertEqual(Path(files["winner"]).stat().st_mtime_ns, mtime)
+            self.assertEqual(sorted(p.name for p in Path(tmp).iterdir()), ["flop_cards.json", "winner.json"])
+
+    def test_atomic_write_is_world_readable(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "winner.json"
+            game_state.write_json_atomic(str(path), {})
+            self.assertEqual(path.stat().st_mode & 0o777, 0o644)
+            path.chmod(0o664)
+            game_state.write_json_atomic(str(path), {"winner_id": 1})
+            self.assertEqual(path.stat().st_mode & 0o777, 0o664)
+
+    def test_background_thread_follows_updates(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = f"{tmp}/flop_cards.json"
+            store = game_state.GameStateStore(flop_cards={})
+            game_state.SnapshotWriter(store, {"flop_cards": path}, interval=0.01).start()
+            store.update(flop_cards={"0": "QH"})
+            deadline = time.time() + 2
+            while time.time() < deadline:
+                if Path(path).exists() and json.loads(Path(path).read_text()) == {"0": "QH"}:
+                    break
+                time.sleep(0.01)
+            self.assertEqual(json.loads(Path(path).read_text()), {"0": "QH"})
+
+if __name__ == "__main__":
+    unittest.main()
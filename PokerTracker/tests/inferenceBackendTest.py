@@ -0,0 +1,60 @@
+import sys
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+SCRIPT_DIR = Path(__file__).parent.absolute()
+PROJECT_ROOT = SCRIPT_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import inference_backend
+
+
+class TestSelection(unittest.TestCase):
+
+    def test_explicit_choices_pass_through(self):
+        self.assertEqual(inference_backend.select_device("cuda:1"), "cuda:1")
+        self.assertEqual(inference_backend.select_backend("openvino", "cpu"), "openvino")
+
+    def test_gpu_device_uses_torch(self):
+        self.assertEqual(inference_backend.select_backend("auto", "cuda"), "torch")
+
+    def test_cpu_prefers_onnx_only_when_installed(self):
+        with mock.patch.dict(sys.modules, {"onnxruntime": None}):
+            self.assertEqual(inference_backend.select_backend("auto", "cpu"), "torch")
+        with mock.patch.dict(sys.modules, {"onnxruntime": mock.MagicMock()}):
+            self.assertEqual(inference_backend.select_backend("auto", "cpu"), "onnx")
+
+    def test_auto_device_without_torch_is_cpu(self):
+        with mock.patch.dict(sys.modules, {"torch": None}):
+            self.assertEqual(inference_backend.select_device("auto"), "cpu")
+
+
+class TestStubDetector(unittest.TestCase):
+
+    def test_load_stub_needs_no_model(self):
+        detector = inference_backend.load_detector("missing.pt", backend="stub")
+        boxes = detector.predict([np.zeros((10, 10, 3), np.uint8)] * 3)
+        self.assertEqual(len(boxes), 3)
+        self.assertEqual(boxes[0].shape, (0, 6))
+
+    def test_stub_latency(self):
+        detector = inference_backend.StubDetector(latency_ms=20, per_image_ms=5)
+        start = time.perf_counter()
+        detector.predict([None] * 4)
+        self.assertGreaterEqual(time.perf_counter() - start, 0.035)
+
+    def test_fake_cards_follow_the_crop(self):
+        detector = inference_backend.load_detector("missing.pt", backend="stub", stub_cards=True)
+        dark, light = np.zeros((40, 30, 3), np.uint8), np.full((40, 30, 3), 200, np.uint8)
+        boxes = detector.predict([dark, light, dark])
+        self.assertEqual(boxes[0].tolist(), [[0, 0, 30, 40, 0.8999999761581421, 0]])
+        self.assertEqual(boxes[0][0, 5], boxes[2][0, 5])
+        self.assertNotEqual(boxes[0][0, 5], boxes[1][0, 5])
+
+
+if __name__ == "__main__":
+    unittest.main()
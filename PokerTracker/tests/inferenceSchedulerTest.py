@@ -0,0 +1,71 @@
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent.absolute()
+PROJECT_ROOT = SCRIPT_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import inference_scheduler
+
+
+class TestInferenceScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.batches = []
+
+    def run_batch(self, items):
+        self.batches.append(list(items))
+        return [item * 10 for item in items]
+
+    def submit_concurrently(self, scheduler, requests):
+        results = [None] * len(requests)
+
+        def worker(i, items):
+            results[i] = scheduler.submit(items)
+
+        threads = [threading.Thread(target=worker, args=(i, r)) for i, r in enumerate(requests)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(5)
+        return results
+
+    def test_results_routed_to_each_request(self):
+        scheduler = inference_scheduler.InferenceScheduler(self.run_batch, max_batch=64, max_wait_ms=50)
+        requests = [[c * 100 + i for i in range(5)] for c in range(4)]
+        results = self.submit_concurrently(scheduler, requests)
+        for items, result in zip(requests, results):
+            self.assertEqual(result, [item * 10 for item in items])
+
+    def test_clients_share_batches(self):
+        scheduler = inference_scheduler.InferenceScheduler(self.run_batch, max_batch=64, max_wait_ms=200)
+        self.submit_concurrently(scheduler, [[1, 2], [3, 4], [5, 6], [7, 8]])
+        self.assertLess(len(self.batches), 4)
+        stats = scheduler.stats()
+        self.assertEqual(stats["queue_wait_ms"]["count"], 4)
+        self.assertEqual(stats["batch_size"]["count"], len(self.batches))
+
+    def test_max_batch_respected(self):
+        scheduler = inference_scheduler.InferenceScheduler(self.run_batch, max_batch=4, max_wait_ms=200)
+        self.submit_concurrently(scheduler, [[i, i] for i in range(6)])
+        self.assertTrue(all(len(b) <= 4 for b in self.batches))
+        self.assertEqual(sum(len(b) for b in self.batches), 12)
+
+    def test_lone_request_dispatched_after_max_wait(self):
+        scheduler = inference_scheduler.InferenceScheduler(self.run_batch, max_batch=64, max_wait_ms=20)
+        start = time.perf_counter()
+        self.assertEqual(scheduler.submit([1]), [10])
+        self.assertLess(time.perf_counter() - start, 1.0)
+
+    def test_errors_propagate(self):
+        def fail(items):
+            raise RuntimeError("model failed")
+        scheduler = inference_scheduler.InferenceScheduler(fail, max_wait_ms=1)
+        with self.assertRaises(RuntimeError):
+            scheduler.submit([1])
+
+if __name__ == "__main__":
+    unittest.main()
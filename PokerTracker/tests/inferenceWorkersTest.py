@@ -0,0 +1,76 @@
+import os
+import sys
+import threading
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+SCRIPT_DIR = Path(__file__).parent.absolute()
+PROJECT_ROOT = SCRIPT_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import inference_scheduler
+import inference_workers
+
+
+def pid_runner():
+    return lambda items: [os.getpid()] * len(items)
+
+
+def broken_runner():
+    raise IOError("weights not found")
+
+
+def crop():
+    return np.zeros((40, 30, 3), dtype=np.uint8)
+
+
+class TestWorkerPool(unittest.TestCase):
+
+    def test_stub_card_models_run_in_workers(self):
+        pool = inference_workers.WorkerPool(2, inference_workers.CardModels, backend="stub").wait_ready(30)
+        try:
+            results = pool.run_batch([(crop(), False), (crop(), True)])
+            self.assertEqual(len(results), 2)
+            face, back, skipped = results[0]
+            self.assertEqual((face.shape, back.shape, skipped), ((0, 6), (0, 6), 0))
+        finally:
+            pool.close()
+
+    def test_scheduler_spreads_batches_over_workers(self):
+        pool = inference_workers.WorkerPool(2, pid_runner).wait_ready(30)
+        scheduler = inference_scheduler.InferenceScheduler(pool.run_batch, max_batch=1, max_wait_ms=0,
+                                                           num_runners=2)
+        pids = []
+        lock = threading.Lock()
+
+        def submit():
+            for _ in range(20):
+                result = scheduler.submit([None])
+                with lock:
+                    pids.extend(result)
+
+        threads = [threading.Thread(target=submit) for _ in range(4)]
+        try:
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join(timeout=30)
+            self.assertEqual(len(pids), 80)
+            self.assertNotIn(os.getpid(), pids)
+            self.assertEqual(len(set(pids)), 2)
+        finally:
+            pool.close()
+
+    def test_failed_worker_start_is_reported(self):
+        pool = inference_workers.WorkerPool(1, broken_runner)
+        try:
+            with self.assertRaises(RuntimeError):
+                pool.wait_ready(30)
+        finally:
+            pool.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
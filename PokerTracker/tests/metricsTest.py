@@ -0,0 +1,88 @@
+import sys
+import unittest
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent.absolute()
+PROJECT_ROOT = SCRIPT_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import metrics
+
+
+class TestHistogram(unittest.TestCase):
+
+    def test_prometheus_buckets_are_cumulative(self):
+        histogram = metrics.Histogram([1, 10])
+        for value in (0.5, 5, 5, 50):
+            histogram.observe(value)
+        lines = histogram.prometheus("latency_ms", stage="parse")
+        self.assertEqual(lines, [
+            'latency_ms_bucket{stage="parse",le="1"} 1',
+            'latency_ms_bucket{stage="parse",le="10"} 3',
+            'latency_ms_bucket{stage="parse",le="+Inf"} 4',
+            'latency_ms_sum{stage="parse"} 60.5',
+            'latency_ms_count{stage="parse"} 4',
+        ])
+
+    def test_label_values_are_escaped(self):
+        self.assertEqual(metrics.format_labels({"client": 'a"b\\c'}), '{client="a\\"b\\\\c"}')
+
+
+class TestStageMetrics(unittest.TestCase):
+
+    def test_histograms_per_stage_and_client(self):
+        stage_metrics = metrics.StageMetrics(buckets=[1, 10])
+        stage_metrics.observe("imdecode", "cam1", 2.0)
+        stage_metrics.observe("imdecode", "cam2", 0.5)
+        with stage_metrics.time("inference", "cam1"):
+            pass
+        text = stage_metrics.prometheus()
+        self.assertIn("# TYPE pokertracker_stage_latency_ms histogram", text)
+        self.assertIn('pokertracker_stage_latency_ms_count{stage="imdecode",client="cam1"} 1', text)
+        self.assertIn('pokertracker_stage_latency_ms_count{stage="imdecode",client="cam2"} 1', text)
+        self.assertIn('pokertracker_stage_latency_ms_count{stage="inference",client="cam1"} 1', text)
+
+    def test_summary_pools_clients(self):
+        stage_metrics = metrics.StageMetrics()
+        stage_metrics.observe_many({"face_model": 4.0, "back_model": 2.0})
+        stage_metrics.observe_many({"face_model": 6.0})
+        summary = stage_metrics.summary()
+        self.assertEqual(summary["face_model"]["count"], 2)
+        self.assertAlmostEqual(summary["face_model"]["mean"], 5.0)
+        self.assertIn('client="shared"', stage_metrics.prometheus())
+
+    def test_client_labels_are_bounded(self):
+        now = [0.0]
+        stage_metrics = metrics.StageMetrics(buckets=[1], max_clients=2, client_timeout=60, clock=lambda: now[0])
+        for client_id in ("cam1", "cam2", "cam3", "cam4"):
+            stage_metrics.observe("parse", client_id, 1.0)
+        stage_metrics.observe("parse", metrics.SHARED, 1.0)
+        text = stage_metrics.prometheus()
+        self.assertIn('pokertracker_stage_latency_ms_count{stage="parse",client="other"} 2', text)
+        self.assertNotIn('client="cam3"', text)
+        self.assertIn('client="shared"', text)
+
+        # Restarted clients come back under new ids; the old ones expire.
+        now[0] = 30.0
+        stage_metrics.observe("parse", "cam1", 1.0)
+        now[0] = 100.0
+        stage_metrics.observe("parse", "cam5", 1.0)
+        text = stage_metrics.prometheus()
+        self.assertIn('client="cam5"', text)
+        self.assertNotIn('client="cam2"', text)
+        now[0] = 1000.0
+        for i in range(100):
+            stage_metrics.observe("parse", f"restart{i}", 1.0)
+            now[0] += 61
+        self.assertLessEqual(len({client for _, client in stage_metrics._histograms}), 4)
+
+    def test_extra_histograms_are_exported(self):
+        histogram = metrics.Histogram([1, 2])
+        histogram.observe(1)
+        text = metrics.StageMetrics().prometheus([("batch_size", "Crops per batch.", histogram)])
+        self.assertIn("# HELP batch_size Crops per batch.", text)
+        self.assertIn("batch_size_count 1", text)
+
+
+if __name__ == "__main__":
+    unittest.main()
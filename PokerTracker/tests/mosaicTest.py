@@ -0,0 +1,72 @@
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+SCRIPT_DIR = Path(__file__).parent.absolute()
+PROJECT_ROOT = SCRIPT_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import mosaic
+
+
+def crop(w, h, value):
+    return np.full((h, w, 3), value, dtype=np.uint8)
+
+
+def find_blocks(canvases):
+    """Fake detector: one box per distinct non-fill value, class = value."""
+    out = []
+    for canvas in canvases:
+        boxes = []
+        for value in np.unique(canvas[:, :, 0]):
+            if value == mosaic.FILL_VALUE:
+                continue
+            ys, xs = np.nonzero(canvas[:, :, 0] == value)
+            boxes.append([xs.min(), ys.min(), xs.max() + 1, ys.max() + 1, 0.9, value])
+        out.append(np.array(boxes, dtype=np.float32).reshape(-1, 6))
+    return out
+
+
+class TestShelfPack(unittest.TestCase):
+
+    def test_placements_fit_and_do_not_overlap(self):
+        sizes = [(142, 180)] * 8 + [(128, 144)] * 5
+        placements, n = mosaic.shelf_pack(sizes, 640, gap=4)
+        self.assertEqual(len(placements), len(sizes))
+        occupied = [np.zeros((640, 640), dtype=bool) for _ in range(n)]
+        for p in placements:
+            self.assertLessEqual(p.x + p.w, 640)
+            self.assertLessEqual(p.y + p.h, 640)
+            self.assertFalse(occupied[p.canvas][p.y:p.y + p.h, p.x:p.x + p.w].any())
+            occupied[p.canvas][p.y:p.y + p.h, p.x:p.x + p.w] = True
+
+    def test_oversized_crop_is_scaled_down(self):
+        placements, n = mosaic.shelf_pack([(1280, 320)], 640)
+        self.assertEqual(n, 1)
+        self.assertEqual((placements[0].w, placements[0].h, placements[0].scale), (640, 160, 0.5))
+
+
+class TestDetect(unittest.TestCase):
+
+    def test_boxes_map_back_to_their_crop(self):
+        crops = [crop(100, 150, 10), crop(120, 80, 20), crop(90, 150, 30), crop(1280, 200, 40)]
+        boxes = mosaic.detect(crops, find_blocks, canvas_size=320)
+        for i, (c, b) in enumerate(zip(crops, boxes)):
+            self.assertEqual(len(b), 1)
+            self.assertEqual(int(b[0, 5]), c[0, 0, 0])
+            np.testing.assert_allclose(b[0, :4], [0, 0, c.shape[1], c.shape[0]], atol=2)
+
+    def test_box_in_gap_is_dropped(self):
+        placements, _ = mosaic.shelf_pack([(100, 100), (100, 100)], 640, gap=20)
+        gap_box = np.array([[101, 10, 119, 20, 0.9, 1]], dtype=np.float32)
+        boxes = mosaic.split_boxes([gap_box], placements)
+        self.assertEqual([len(b) for b in boxes], [0, 0])
+
+    def test_empty_input(self):
+        self.assertEqual(mosaic.detect([], find_blocks), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+SCRIPT_DIR = Path(__file__).parent.absolute()
+PROJECT_ROOT = SCRIPT_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import inference_backend
+import offline
+
+
+def write_video(path, n_frames, size=(160, 120)):
+    """Frame i is filled with gray level 10 * i, so every frame looks different."""
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 10, size)
+    for i in range(n_frames):
+        writer.write(np.full((size[1], size[0], 3), 10 * i, dtype=np.uint8))
+    writer.release()
+
+
+class TestOffline(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.video = os.path.join(self.tmp.name, "clip.avi")
+        write_video(self.video, 12)
+        self.slots = offline.build_slots([[[0, 0, 80, 40]]], [[80, 60, 40, 40]])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_reader_applies_stride_and_limit(self):
+        reader = offline.FrameReader(self.video, stride=3, max_frames=3)
+        reader.start()
+        self.assertEqual([idx for idx, _, _ in reader], [0, 3, 6])
+        reader = offline.FrameReader(self.video, stride=5)
+        reader.start()
+        self.assertEqual([round(t, 2) for _, t, _ in reader], [0.0, 0.5, 1.0])
+
+    def test_hand_history_has_a_line_per_change(self):
+        reader = offline.FrameReader(self.video)
+        reader.start()
+        detector = inference_backend.StubDetector(fake_cards=True)
+        batches = []
+
+        def run_batch(items):
+            batches.append(len(items))
+            return [(face, inference_backend.EMPTY_BOXES, 1)
+                    for face in detector.predict([crop for crop, _ in items])]
+
+        out = io.StringIO()
+        # Every frame shows a different card, so each frame decides on its own; both
+        # slots see the same gray crop, so they read the same card.
+        processed = offline.process_video(reader, self.slots, run_batch, out, batch_frames=4, fusion_frames=1,
+                                          deck_check=False)
+        lines = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(processed, 12)
+        self.assertEqual(batches, [8, 8, 8])
+        self.assertEqual(len(lines), 12)
+        self.assertEqual(len(lines[0]["board"]), 1)
+        self.assertEqual(len(lines[0]["players"]["0"]), 1)
+        self.assertEqual(lines[0]["slots"][0]["cards"][0]["conf"], 0.9)
+
+    def test_duplicate_card_is_reported(self):
+        reader = offline.FrameReader(self.video, max_frames=1)
+        reader.start()
+        detector = inference_backend.StubDetector(fake_cards=True)
+
+        def run_batch(items):
+            return [(face, inference_backend.EMPTY_BOXES, 1) for face in detector.predict([c for c, _ in items])]
+
+        out = io.StringIO()
+        offline.process_video(reader, self.slots, run_batch, out)
+        line = json.loads(out.getvalue())
+        self.assertEqual(len(line["board"]) + len(line["players"]), 1)
+        self.assertEqual(list(line["conflicts"].values())[0]["claims"], ["offline_0/0", "flop/0"])
+
+    def test_unchanged_slots_reuse_results(self):
+        still = os.path.join(self.tmp.name, "still.avi")
+        writer = cv2.VideoWriter(still, cv2.VideoWriter_fourcc(*"MJPG"), 10, (160, 120))
+        for _ in range(8):
+            writer.write(np.full((120, 160, 3), 90, dtype=np.uint8))
+        writer.release()
+        reader = offline.FrameReader(still)
+        reader.start()
+        calls = []
+
+        def run_batch(items):
+            calls.append(len(items))
+            return [(inference_backend.EMPTY_BOXES, inference_backend.EMPTY_BOXES, 0) for _ in items]
+
+        out = io.StringIO()
+        self.assertEqual(offline.process_video(reader, self.slots, run_batch, out, batch_frames=4), 8)
+        self.assertEqual(calls, [2])
+        self.assertEqual(len(out.getvalue().splitlines()), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent.absolute()
+PROJECT_ROOT = SCRIPT_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import pipeline
+
+
+class TestDropOldestQueue(unittest.TestCase):
+
+    def test_full_queue_drops_oldest(self):
+        q = pipeline.DropOldestQueue(2)
+        for i in range(5):
+            q.put(i)
+        self.assertEqual(q.dropped, 3)
+        self.assertEqual([q.get(), q.get()], [3, 4])
+
+    def test_get_times_out_with_none(self):
+        q = pipeline.DropOldestQueue(1)
+        start = time.perf_counter()
+        self.assertIsNone(q.get(timeout=0.05))
+        self.assertGreaterEqual(time.perf_counter() - start, 0.04)
+
+    def test_close_wakes_consumer_after_drain(self):
+        q = pipeline.DropOldestQueue(2)
+        q.put("last")
+        q.close()
+        q.put("ignored")
+        self.assertEqual(q.get(), "last")
+        self.assertIsNone(q.get())
+
+
+class TestStages(unittest.TestCase):
+
+    def test_stage_forwards_results_and_propagates_close(self):
+        inbox, outbox = pipeline.DropOldestQueue(10), pipeline.DropOldestQueue(10)
+        timer = pipeline.StageTimer()
+        thread = pipeline.start_stage("double", inbox, lambda x: x * 2 if x != 3 else None, outbox, timer)
+        for i in range(5):
+            inbox.put(i)
+        inbox.close()
+        thread.join(timeout=2)
+
+        results = []
+        while True:
+            item = outbox.get(timeout=0.1)
+            if item is None:
+                break
+            results.append(item)
+        self.assertEqual(results, [0, 2, 4, 8])
+        self.assertTrue(outbox.closed)
+        self.assertEqual(timer.summary()["double"]["count"], 5)
+
+    def test_stop_event_ends_stage(self):
+        inbox, stop = pipeline.DropOldestQueue(1), threading.Event()
+        thread = pipeline.start_stage("idle", inbox, lambda x: x, stop=stop)
+        stop.set()
+        thread.join(timeout=2)
+        self.assertFalse(thread.is_alive())
+
+    def test_slow_consumer_sees_newest_frame(self):
+        inbox = pipeline.DropOldestQueue(1)
+        seen = []
+
+        def slow(item):
+            seen.append(item)
+            time.sleep(0.05)
+
+        thread = pipeline.start_stage("slow", inbox, slow)
+        for i in range(20):
+            inbox.put(i)
+            time.sleep(0.005)
+        time.sleep(0.1)
+        inbox.close()
+        thread.join(timeout=2)
+        self.assertEqual(seen[-1], 19)
+        self.assertLess(len(seen), 20)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import sys
+import unittest
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+SCRIPT_DIR = Path(__file__).parent.absolute()
+PROJECT_ROOT = SCRIPT_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import preprocess
+
+
+def original_clahe(img):
+    lab = cv2.cvtColor(img, cv2.COLOR_BGR2LAB)
+    l, a, b = cv2.split(lab)
+    clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+    return cv2.cvtColor(cv2.merge((clahe.apply(l), a, b)), cv2.COLOR_LAB2BGR)
+
+
+def frame(seed=0):
+    return np.random.default_rng(seed).integers(0, 256, (360, 640, 3), dtype=np.uint8)
+
+
+class TestClahePreprocessor(unittest.TestCase):
+
+    def setUp(self):
+        self.pre = preprocess.ClahePreprocessor()
+
+    def test_apply_matches_original_per_slot_code(self):
+        crop = frame()[40:220, 100:240]
+        np.testing.assert_array_equal(self.pre.apply(crop), original_clahe(crop))
+
+    def test_apply_regions_returns_views_per_rect(self):
+        img = frame(1)
+        rects = [[10, 200, 100, 140], [120, 200, 100, 140], [500, 20, 90, 120], [700, 0, 50, 50]]
+        crops = self.pre.apply_regions(img, rects)
+        self.assertEqual(crops[0].shape, (140, 100, 3))
+        self.assertEqual(crops[2].shape, (120, 90, 3))
+        self.assertIsNone(crops[3])
+        # Neighbouring slots share one processed region.
+        self.assertIs(crops[0].base, crops[1].base)
+        self.assertIsNot(crops[0].base, crops[2].base)
+
+    def test_group_rects_keeps_distant_slots_apart(self):
+        rects = [[0, 0, 100, 100], [105, 0, 100, 100], [0, 500, 100, 100], [0, 0, 0, 10]]
+        self.assertEqual(sorted(preprocess.group_rects(rects)), [[0, 1], [2]])
+
+    def test_union_rect_clips_to_image(self):
+        self.assertEqual(preprocess.union_rect([[-10, 5, 50, 50], [30, 40, 100, 100]], (100, 100)),
+                         [0, 5, 100, 95])
+        self.assertIsNone(preprocess.union_rect([[200, 200, 10, 10]], (100, 100)))
+
+
+if __name__ == "__main__":
+    unittest.main()
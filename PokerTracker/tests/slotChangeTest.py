@@ -0,0 +1,66 @@
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+SCRIPT_DIR = Path(__file__).parent.absolute()
+PROJECT_ROOT = SCRIPT_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import slot_change
+
+KEY = ("player", 0, 0)
+
+
+def crop(value, noise=0, seed=0):
+    img = np.full((120, 80, 3), value, dtype=np.int16)
+    if noise:
+        img += np.random.default_rng(seed).integers(-noise, noise + 1, img.shape, dtype=np.int16)
+    return np.clip(img, 0, 255).astype(np.uint8)
+
+
+class TestSlotChangeDetector(unittest.TestCase):
+
+    def send(self, detector, img):
+        changed, thumb = detector.check(KEY, img)
+        detector.commit([(KEY, changed, thumb)])
+        return changed
+
+    def test_first_crop_is_always_sent(self):
+        self.assertTrue(self.send(slot_change.SlotChangeDetector(), crop(100)))
+
+    def test_sensor_noise_is_unchanged(self):
+        detector = slot_change.SlotChangeDetector(threshold=4.0)
+        self.send(detector, crop(100, noise=3, seed=1))
+        self.assertFalse(self.send(detector, crop(100, noise=3, seed=2)))
+        self.assertEqual(detector.skip_ratio(), 0.5)
+
+    def test_new_card_is_changed(self):
+        detector = slot_change.SlotChangeDetector(threshold=4.0)
+        self.send(detector, crop(40))
+        self.assertTrue(self.send(detector, crop(200)))
+
+    def test_max_unchanged_forces_refresh(self):
+        detector = slot_change.SlotChangeDetector(threshold=4.0, max_unchanged=2)
+        results = [self.send(detector, crop(100)) for _ in range(4)]
+        self.assertEqual(results, [True, False, False, True])
+
+    def test_uncommitted_frames_do_not_count(self):
+        detector = slot_change.SlotChangeDetector(threshold=4.0)
+        detector.check(KEY, crop(40))
+        self.assertTrue(self.send(detector, crop(40)))
+
+    def test_invalidate(self):
+        detector = slot_change.SlotChangeDetector(threshold=4.0)
+        self.send(detector, crop(100))
+        detector.invalidate(KEY)
+        self.assertTrue(self.send(detector, crop(100)))
+
+    def test_zero_threshold_disables(self):
+        detector = slot_change.SlotChangeDetector(threshold=0)
+        self.send(detector, crop(100))
+        self.assertTrue(self.send(detector, crop(100)))
+
+if __name__ == "__main__":
+    unittest.main()